@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Table, create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.settings import settings
 
@@ -14,3 +14,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def ensure_table(table: Table) -> None:
+    """Create `table` if missing and add any columns/indexes an older schema lacks."""
+    table.create(bind=engine, checkfirst=True)
+    existing = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    missing = [c for c in table.columns if c.name not in existing]
+    if missing:
+        with engine.begin() as conn:
+            for col in missing:
+                ddl = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {ddl}"))
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+def init_db() -> None:
+    import app.db.models  # noqa: F401  (registers the tables on Base)
+    for table in Base.metadata.sorted_tables:
+        ensure_table(table)
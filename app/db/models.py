@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Index, JSON, Text
 from sqlalchemy.orm import relationship
 from app.db.deps import Base
 
@@ -6,6 +6,8 @@ class Venue(Base):
     __tablename__ = "venues"
     id = Column(Integer, primary_key=True, index=True)
     place_id = Column(String, index=True, nullable=True)
+    # merge.merge_key(): upsert conflict target
+    merge_key = Column(String, unique=True, index=True, nullable=True)
     name = Column(String, nullable=False)
     category = Column(String, nullable=True)
     educationality = Column(Float, default=0.0)
@@ -16,7 +18,7 @@ class Venue(Base):
     lat = Column(Float, nullable=True)
     lng = Column(Float, nullable=True)
     distance_miles = Column(Float, nullable=True)
-    website_url = Column(String, nullable=True)
+    website_url = Column(String, index=True, nullable=True)
     booking_url = Column(String, nullable=True)
     phone = Column(String, nullable=True)
     contact_name = Column(String, nullable=True)
@@ -26,17 +28,28 @@ class Venue(Base):
     image_allowed = Column(Boolean, default=True)
     availability_status = Column(String, default="unknown")
     availability_source = Column(String, nullable=True)
-    amenities = Column(JSON, default=dict)
+    # none_as_null: an absent value is SQL NULL, so bulk upserts can coalesce it
+    amenities = Column(JSON(none_as_null=True), default=dict)
     score_total = Column(Float, default=0.0)
-    score_components = Column(JSON, default=dict)
+    score_components = Column(JSON(none_as_null=True), default=dict)
     reason_text = Column(String, nullable=True)
+    # fingerprint of the crawled website pages and when they were last checked
+    content_hash = Column(String, nullable=True)
+    enriched_at = Column(Float, nullable=True)
+    # discovery provenance, so catalog hits look like live Places results
+    types = Column(JSON(none_as_null=True), nullable=True)
+    query_category = Column(String, nullable=True)
+    source = Column(String, nullable=True)
 
     rooms = relationship("Room", back_populates="venue", cascade="all, delete-orphan")
 
+    # bounding-box prefilter for catalog searches
+    __table_args__ = (Index("ix_venues_lat_lng", "lat", "lng"),)
+
 class Room(Base):
     __tablename__ = "rooms"
     id = Column(Integer, primary_key=True, index=True)
-    venue_id = Column(Integer, ForeignKey("venues.id", ondelete="CASCADE"))
+    venue_id = Column(Integer, ForeignKey("venues.id", ondelete="CASCADE"), index=True)
     room_name = Column(String, nullable=True)
     capacity_classroom = Column(Integer, nullable=True)
     capacity_theater = Column(Integer, nullable=True)
@@ -46,3 +59,69 @@ class Room(Base):
     rental_policy_url = Column(String, nullable=True)
 
     venue = relationship("Venue", back_populates="rooms")
+
+class GeocodeCacheEntry(Base):
+    __tablename__ = "geocode_cache"
+    key = Column(String, primary_key=True)
+    found = Column(Boolean, default=True)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    locality = Column(String, nullable=True)
+    postal_code = Column(String, nullable=True)
+    fetched_at = Column(Float, nullable=False)
+
+class PageCacheEntry(Base):
+    __tablename__ = "page_cache"
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    body = Column(Text, nullable=True)
+    # sha1 of body and what extract_fields/interesting_links found in it
+    content_hash = Column(String, nullable=True)
+    parsed = Column(JSON, nullable=True)
+    fetched_at = Column(Float, nullable=False)
+
+class CatalogCoverage(Base):
+    __tablename__ = "catalog_coverage"
+    id = Column(Integer, primary_key=True)
+    target = Column(String, nullable=False)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    radius_miles = Column(Float, nullable=False)
+    # which QUERY_BASES / page depth the live search used
+    queries = Column(String, nullable=False)
+    max_pages = Column(Integer, nullable=False)
+    covered_at = Column(Float, nullable=False)
+
+    __table_args__ = (Index("ix_catalog_coverage_lat_lng", "lat", "lng"),)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False, default="rank")
+    # queued -> running -> done | failed | cancelled
+    status = Column(String, nullable=False, default="queued", index=True)
+    options = Column(JSON, default=dict)
+    total = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)
+
+    items = relationship("JobItem", back_populates="job", cascade="all, delete-orphan", order_by="JobItem.seq")
+
+class JobItem(Base):
+    __tablename__ = "job_items"
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), index=True, nullable=False)
+    seq = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    # queued -> running -> done | failed (running rows are re-queued on restart)
+    status = Column(String, nullable=False, default="queued", index=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(Float, nullable=True)
+    finished_at = Column(Float, nullable=True)
+
+    job = relationship("Job", back_populates="items")
@@ -1,8 +1,46 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routers import discover, details, rank
+from fastapi.responses import PlainTextResponse
+from app.routers import discover, details, jobs, rank
 from app.routers import ui  # <-- add this import
+from app.services import catalog, enrichstore, geocache, httpclient, metrics, replay
+from app.services.compression import CompressionMiddleware
+from app.services.fastjson import FastJSONResponse
+from app.settings import settings
+
+
+def _events(stats):
+    return lambda: {(k,): v for k, v in stats().items() if not k.endswith("_entries")}
+
+
+# cache/store counters kept by the services themselves, read at scrape time
+metrics.callback("venue_geocode_cache_events_total", "Geocode cache lookups by outcome", ("event",), _events(geocache.stats), kind="counter")
+metrics.callback("venue_enrich_store_events_total", "Stored enrichment reuse by outcome", ("event",), _events(enrichstore.stats), kind="counter")
+metrics.callback("venue_catalog_events_total", "Catalog-served vs live anchors and venues", ("event",), _events(catalog.stats), kind="counter")
+metrics.callback("venue_replay_events_total", "Provider fixtures recorded/replayed/missing", ("event",), _events(replay.stats), kind="counter")
 
-app = FastAPI(title="Venue Agent", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # open the pooled provider clients once, close them on shutdown
+    httpclient.startup()
+    # background ranking jobs; unfinished ones from a previous run resume here
+    jobs.queue.start()
+    try:
+        yield
+    finally:
+        jobs.queue.shutdown()
+        httpclient.shutdown()
+
+
+app = FastAPI(title="Venue Agent", version="0.1.0", lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compress_min_size,
+    gzip_level=settings.compress_gzip_level,
+    brotli_quality=settings.compress_brotli_quality,
+)
 
 @app.get("/")
 def root():
@@ -12,6 +50,7 @@ def root():
 app.include_router(discover.router, prefix="/discover", tags=["discover"])
 app.include_router(details.router,  prefix="/details",  tags=["details"])
 app.include_router(rank.router,     prefix="/rank",     tags=["rank"])
+app.include_router(jobs.router,     prefix="/jobs",     tags=["jobs"])
 
 # NEW: register the UI router (no prefix, path = /ui)
 app.include_router(ui.router, tags=["ui"])
@@ -19,3 +58,7 @@ app.include_router(ui.router, tags=["ui"])
 @app.get("/health")
 def health():
     return {"ok": True}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
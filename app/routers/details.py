@@ -6,7 +6,6 @@ router = APIRouter()
 @router.post("/enrich")
 def enrich(details_payload: dict):
     venues = details_payload.get("venues", [])
-    enriched = []
-    for v in venues:
-        enriched.append(extract.enrich(v))
+    # refresh=true re-crawls even venues whose stored enrichment is still fresh
+    enriched = extract.enrich_many(venues, refresh=bool(details_payload.get("refresh", False)))
     return {"count": len(enriched), "venues": enriched}
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.db.deps import get_db, Base, engine
+from app.db.deps import get_db, init_db
 from app.services import places, yelp
 
 router = APIRouter()
 
-# Ensure tables exist (lightweight for MVP)
-Base.metadata.create_all(bind=engine)
+# Ensure tables exist and carry newer columns (lightweight for MVP)
+init_db()
 
 @router.post("/run")
 def run_discover(payload: dict, db: Session = Depends(get_db)):
@@ -0,0 +1,71 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.routers.rank import _ndjson, _sse, run_preview
+from app.services import jobs
+
+router = APIRouter()
+
+
+def _rank_item(payload: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    results, status = run_preview(payload, bypass_cache=bool(options.get("bypass_cache")))
+    return {"count": len(results), "cache": status, "results": results}
+
+
+# one queue per process; app.main starts it (and resumes unfinished jobs) on startup
+queue = jobs.JobQueue(_rank_item)
+
+
+def _found(job: Any, job_id: str) -> Any:
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return job
+
+
+@router.post("", status_code=202)
+def submit(body: dict = Body(...)) -> Dict[str, Any]:
+    """
+    Queue a batch of ranking runs. Body: {"items": [payload, ...]} where each
+    payload is what /rank/preview takes, optionally {"base": {...}} merged
+    under every item, and {"bypass_cache": true}.
+    """
+    items = body.get("items")
+    if not isinstance(items, list) or not all(isinstance(p, dict) for p in items):
+        raise HTTPException(status_code=422, detail='"items" must be a list of ranking payloads')
+    base = body.get("base") if isinstance(body.get("base"), dict) else {}
+    payloads: List[Dict[str, Any]] = [dict(base, **p) for p in items]
+    job_id = queue.submit(payloads, {"bypass_cache": bool(body.get("bypass_cache", False))})
+    return queue.get(job_id)
+
+
+@router.get("")
+def list_jobs(limit: int = Query(50, ge=1, le=500)) -> List[Dict[str, Any]]:
+    return queue.list(limit)
+
+
+@router.get("/{job_id}")
+def status(job_id: str) -> Dict[str, Any]:
+    return _found(queue.get(job_id), job_id)
+
+
+@router.get("/{job_id}/results")
+def results(job_id: str) -> Dict[str, Any]:
+    items = _found(queue.results(job_id), job_id)
+    return {"job": queue.get(job_id), "items": items}
+
+
+@router.get("/{job_id}/events")
+def events(job_id: str, format: str = Query("sse", pattern="^(ndjson|sse)$")) -> StreamingResponse:
+    """Progress stream: a "progress" event on every change, then the final state."""
+    _found(queue.get(job_id), job_id)
+    stream = (("progress", job) for job in queue.events(job_id))
+    if format == "ndjson":
+        return StreamingResponse(_ndjson(stream), media_type="application/x-ndjson")
+    return StreamingResponse(_sse(stream), media_type="text/event-stream")
+
+
+@router.delete("/{job_id}")
+def cancel(job_id: str) -> Dict[str, Any]:
+    return _found(queue.cancel(job_id), job_id)
@@ -1,10 +1,31 @@
-from typing import List, Dict, Any, Iterable
-
-from fastapi import APIRouter, Body
-
-from app.services import places, merge, extract, scoring
+import hashlib
+import json
+import logging
+import os
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services import catalog, places, merge, extract, export, fastjson, metrics, paging, scoring, venuestore
+from app.services.cache import MISSING, TTLCache
+from app.services.candidate import derive
+from app.services.columnar import CandidateTable
+from app.services.fastjson import FastJSONResponse
+from app.services.geography import PAYLOAD_FIELDS, GeographyMatcher
+from app.services.keywords import KeywordMatcher, KeywordRegistry
+from app.settings import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+STAGE_SECONDS = metrics.histogram(
+    "venue_pipeline_stage_seconds", "Ranking pipeline stage latency when computed (filter includes merge)", ("stage",)
+)
+STAGE_TOTAL = metrics.counter("venue_pipeline_stage_total", "Ranking pipeline stages by cache outcome", ("stage", "cache"))
+STAGE_ERRORS = metrics.counter("venue_pipeline_stage_errors_total", "Ranking pipeline stages that raised", ("stage",))
+REQUEST_SECONDS = metrics.histogram("venue_rank_request_seconds", "End-to-end /rank request latency", ("endpoint",))
 
 # ---------------------------------------------------------------------------
 # Blocklist for clearly bad / non-seminar venues
@@ -131,6 +152,12 @@ EXCLUDED_KEYWORDS: List[str] = [
     "cemetery",
 ]
 
+# Compiled once here; tenants add their own terms via EXCLUDED_KEYWORDS_FILE
+# (JSON: {"tenant": ["keyword", ...]}) and pick them with payload "tenant".
+EXCLUSIONS = KeywordRegistry(EXCLUDED_KEYWORDS)
+if settings.excluded_keywords_file:
+    EXCLUSIONS.load(settings.excluded_keywords_file)
+
 # ---------------------------------------------------------------------------
 # Helper utilities
 # ---------------------------------------------------------------------------
@@ -142,46 +169,7 @@ def _normalize_str(value: Any) -> str:
     return str(value).strip().lower()
 
 
-def _normalize_zip_list(raw: Any) -> List[str]:
-    if raw is None:
-        return []
-
-    items: List[str] = []
-
-    if isinstance(raw, str):
-        for part in raw.replace(";", ",").split(","):
-            part = part.strip()
-            if part:
-                items.append(part)
-    elif isinstance(raw, Iterable) and not isinstance(raw, (bytes, bytearray)):
-        for v in raw:
-            if v is None:
-                continue
-            s = str(v)
-            for part in s.replace(";", ",").split(","):
-                part = part.strip()
-                if part:
-                    items.append(part)
-    else:
-        items.append(str(raw).strip())
-
-    zips: List[str] = []
-    for val in items:
-        if not val:
-            continue
-        if "-" in val and len(val) > 5:
-            val = val.split("-", 1)[0]
-        val = val.strip()
-        if len(val) >= 3:
-            zips.append(val.lower())
-    return zips
-
-
-def is_irrelevant_venue(candidate: Dict[str, Any]) -> bool:
-    """
-    Returns True if the candidate clearly represents a non-usable venue
-    based on name/category/type keywords.
-    """
+def _venue_text(candidate: Dict[str, Any]) -> str:
     name = _normalize_str(candidate.get("name"))
     category = _normalize_str(candidate.get("category"))
     vtype = _normalize_str(candidate.get("type"))
@@ -192,71 +180,267 @@ def is_irrelevant_venue(candidate: Dict[str, Any]) -> bool:
     else:
         types_text = " ".join(_normalize_str(t) for t in types)
 
-    haystack = " ".join([name, category, vtype, types_text])
+    return " ".join([name, category, vtype, types_text])
+
+
+def excluded_keyword(
+    candidate: Dict[str, Any], matcher: Optional[KeywordMatcher] = None
+) -> Optional[str]:
+    """
+    Return the blocklist keyword that rules the candidate out (for audit
+    logs), or None if it looks usable.
+    """
+    return (matcher or EXCLUSIONS.default).search(_venue_text(candidate))
 
-    for kw in EXCLUDED_KEYWORDS:
-        if kw in haystack:
-            return True
 
-    return False
+def is_irrelevant_venue(
+    candidate: Dict[str, Any], matcher: Optional[KeywordMatcher] = None
+) -> bool:
+    """
+    Returns True if the candidate clearly represents a non-usable venue
+    based on name/category/type keywords.
+    """
+    return excluded_keyword(candidate, matcher) is not None
 
 
 def matches_geography(candidate: Dict[str, Any], payload: Dict[str, Any]) -> bool:
     """
-    Light textual geography check on top of the strict radius filter
-    already applied inside app.services.places.discover.
+    Light geography check on top of the strict radius filter already
+    applied inside app.services.places.discover. Compiles the payload on
+    every call; use GeographyMatcher.from_payload(payload).filter(...) for
+    a whole list.
     """
-    city_q = _normalize_str(
-        payload.get("city") or payload.get("City") or payload.get("locality")
-    )
-    state_q = _normalize_str(
-        payload.get("state") or payload.get("State") or payload.get("state_code")
+    return GeographyMatcher.from_payload(payload).matches(candidate)
+
+
+# ---------------------------------------------------------------------------
+# Stage cache
+# ---------------------------------------------------------------------------
+
+# Each pipeline stage's output is cached under a hash of the payload fields
+# that can change it, chained to the previous stage's key. Scoring reads only
+# the enriched venues (nothing in scoring.score or score_batch looks at the
+# payload), so the score key is the enrich key's child alone: requests that
+# differ only in attendees or dates share every stage.
+PREVIEW_STAGES = ("discover", "filter", "enrich", "score")
+
+GEOGRAPHY_FIELDS = PAYLOAD_FIELDS
+
+_stage_cache = TTLCache(maxsize=settings.preview_cache_size, ttl=settings.preview_cache_ttl)
+
+
+def _canon(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [_canon(v) for v in value if v not in (None, "")]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _stage_key(stage: str, parent: str, fields: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {k: _canon(v) for k, v in fields.items() if v not in (None, "", [])},
+        sort_keys=True,
+        default=str,
     )
+    return hashlib.sha256(f"{stage}|{parent}|{canonical}".encode()).hexdigest()
+
 
-    zip_raw = (
-        payload.get("zip_codes")
-        or payload.get("zipcodes")
-        or payload.get("zips")
-        or payload.get("postal_codes")
-        or payload.get("zip")
-        or payload.get("zipcode")
+def _stage_keys(payload: Dict[str, Any]) -> Dict[str, str]:
+    targets, radius_miles, _ = places._search_plan(payload)
+    discover_key = _stage_key(
+        "discover", "",
+        {"targets": targets, "radius_miles": radius_miles, "max_pages": places._max_pages(payload)},
     )
-    zips_q = _normalize_zip_list(zip_raw)
-
-    addr_bits: List[str] = []
-    for key in (
-        "formatted_address",
-        "address",
-        "vicinity",
-        "city",
-        "locality",
-        "state",
-        "state_code",
-        "region",
-        "postal_code",
-        "zipcode",
-        "zip",
-    ):
-        val = candidate.get(key)
-        if val:
-            addr_bits.append(str(val))
-
-    address = _normalize_str(" ".join(addr_bits))
-
-    if state_q:
-        if state_q not in address:
-            return False
-
-    if zips_q:
-        zip_match = any(z in address for z in zips_q)
-        if not zip_match:
-            if city_q and city_q not in address:
-                return False
-    else:
-        if city_q and city_q not in address:
-            return False
+    filter_key = _stage_key("filter", discover_key, {f: payload.get(f) for f in GEOGRAPHY_FIELDS + ("tenant",)})
+    enrich_key = _stage_key("enrich", filter_key, {})
+    score_key = _stage_key("score", enrich_key, {})
+    return {"discover": discover_key, "filter": filter_key, "enrich": enrich_key, "score": score_key}
+
+
+def cache_header(status: Dict[str, str]) -> str:
+    values = set(status.values())
+    if values == {"hit"}:
+        return "HIT"
+    if values == {"bypass"}:
+        return "BYPASS"
+    if "hit" in values:
+        return "PARTIAL"
+    return "MISS"
+
+
+# ---------------------------------------------------------------------------
+# Pipeline stages
+# ---------------------------------------------------------------------------
+
+
+def _discover_stage(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Stored catalog where a fresh search covered the area, Google (strict radius) elsewhere
+    return catalog.discover(payload)
+
+
+def _filter_stage(google_list: List[Dict[str, Any]], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Merge candidates – Yelp not wired yet
+    with metrics.timed(STAGE_SECONDS, "merge", errors=STAGE_ERRORS, timing="merge"):
+        merged, merge_report = merge.merge_candidates_with_report(google_list, [])
+    for cluster in merge_report:
+        logger.debug("merged %r into %r", cluster["merged"], cluster["kept"])
+
+    # Apply geography + blocklist filters
+    matcher = EXCLUSIONS.matcher_for(payload.get("tenant"))
+    geography = GeographyMatcher.from_payload(payload)
+    if settings.rank_columnar:
+        # enrich and score below continue on the table
+        table, excluded = CandidateTable.from_records(merged).filter(geography, matcher)
+        for cand, kw in excluded:
+            logger.debug("excluded %r: matched %r", cand.get("name"), kw)
+        return table
+
+    filtered: List[Dict[str, Any]] = []
+    for cand in geography.filter(merged):
+        kw = excluded_keyword(cand, matcher)
+        if kw is not None:
+            logger.debug("excluded %r: matched %r", cand.get("name"), kw)
+            continue
+        filtered.append(cand)
+    return filtered
+
+
+# id(filter output record) -> (that record, its enrich output); holding the
+# record keeps the id from being reused while the map is alive
+Enriched = Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]]
+
+
+def _enriched_pairs(filtered: Any, enriched: Any) -> Enriched:
+    """What _enrich_stage(filtered) produced, for reuse= on a later run."""
+    if isinstance(filtered, CandidateTable):
+        filtered, enriched = filtered.records, enriched.records
+    return {id(f): (f, e) for f, e in zip(filtered, enriched)}
 
-    return True
+
+def _enrich_stage(
+    filtered: List[Dict[str, Any]], payload: Dict[str, Any], reuse: Optional[Enriched] = None
+) -> List[Dict[str, Any]]:
+    """Enrich (crawl + defaults); records found in `reuse` are taken from it instead of crawled again."""
+    if isinstance(filtered, CandidateTable):
+        return filtered.enrich(reuse=reuse)
+    if reuse:
+        todo = [v for v in filtered if id(v) not in reuse]
+        done = iter(extract.enrich_many([derive(v) for v in todo]))
+        return [reuse[id(v)][1] if id(v) in reuse else next(done) for v in filtered]
+    # filter output may be cached; enrich writes into a layer over each venue
+    return extract.enrich_many([derive(v) for v in filtered])
+
+
+def _score_one(v: Dict[str, Any]) -> Tuple[float, str, Dict[str, Any]]:
+    try:
+        return scoring.score(v)
+    except Exception:
+        return 0.0, "", {}
+
+
+def _score_stage(enriched: List[Dict[str, Any]], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if isinstance(enriched, CandidateTable):
+        try:
+            return enriched.ranked()
+        except Exception:
+            # malformed rows: score the records below
+            enriched = enriched.enriched_records()
+    if not enriched:
+        return []
+    try:
+        # one set of output fields per distinct score, picked per venue by index
+        inverse, combos = scoring.score_combos(enriched)
+        fields = scoring.output_fields(combos)
+    except Exception:
+        # malformed rows: fall back to scoring one venue at a time
+        inverse = np.arange(len(enriched))
+        fields = scoring.output_fields([_score_one(v) for v in enriched])
+
+    # Sort by score descending (stable, as sorted(..., reverse=True) was)
+    totals = np.array([f["score"] for f in fields], dtype=float)[inverse]
+    order = np.argsort(-totals, kind="stable").tolist()
+    picks = inverse[order].tolist()
+    # enrich output may be cached; never mutate it in place
+    if all(type(v) is dict for v in enriched):
+        return [{**enriched[i], **fields[j]} for i, j in zip(order, picks)]
+    scored: List[Dict[str, Any]] = []
+    for i, j in zip(order, picks):
+        v_scored = derive(enriched[i])
+        v_scored.update(fields[j])
+        scored.append(v_scored)
+    return scored
+
+
+_STAGE_FUNCS = {
+    "filter": _filter_stage,
+    "enrich": _enrich_stage,
+    "score": _score_stage,
+}
+
+
+def run_preview(
+    payload: Dict[str, Any],
+    bypass_cache: bool = False,
+    discovered: Optional[List[Dict[str, Any]]] = None,
+    enriched: Optional[Enriched] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Run discover -> filter -> enrich -> score, reusing cached stage output.
+
+    Returns the ranked venues and a {stage: "hit"|"miss"|"bypass"} map.
+    Resumes from the latest cached stage; with bypass_cache every stage is
+    recomputed (and the cache refreshed). `discovered` supplies discovery
+    output that was already fetched, and `enriched` the enrich output of
+    records already run through filter -> enrich, which are not crawled
+    again (the streaming endpoint does both).
+
+    When the score stage runs, the new scores are written onto the venues'
+    stored rows in the background (PERSIST_ENABLED).
+    """
+    keys = _stage_keys(payload)
+    status: Dict[str, str] = {}
+
+    start = 0
+    data: Optional[List[Dict[str, Any]]] = discovered
+    if discovered is not None:
+        start = 1
+        status["discover"] = "bypass" if bypass_cache else "miss"
+        if discovered:
+            _stage_cache.set(keys["discover"], discovered)
+    elif not bypass_cache:
+        for i in range(len(PREVIEW_STAGES) - 1, -1, -1):
+            cached = _stage_cache.get(keys[PREVIEW_STAGES[i]])
+            if cached is not MISSING:
+                data, start = cached, i + 1
+                break
+
+    for i, stage in enumerate(PREVIEW_STAGES):
+        if i < start:
+            status.setdefault(stage, "hit")
+            STAGE_TOTAL.inc(stage, status[stage])
+            metrics.record_timing(stage, 0.0, status[stage])
+            continue
+        with metrics.timed(STAGE_SECONDS, stage, errors=STAGE_ERRORS, timing=stage):
+            if stage == "discover":
+                data = _discover_stage(payload)
+            elif stage == "enrich" and enriched:
+                data = _enrich_stage(data or [], payload, reuse=enriched)
+            else:
+                data = _STAGE_FUNCS[stage](data or [], payload)
+        status[stage] = "bypass" if bypass_cache else "miss"
+        STAGE_TOTAL.inc(stage, status[stage])
+        # an empty discovery is more likely a provider hiccup than a real answer
+        if stage != "discover" or data:
+            _stage_cache.set(keys[stage], data)
+
+    # fresh scores go onto the catalog rows; cache hits were persisted already
+    if data and status.get("score") != "hit" and settings.persist_enabled:
+        venuestore.persist_scores_in_background(data)
+
+    return data or [], status
 
 
 # ---------------------------------------------------------------------------
@@ -264,10 +448,51 @@ def matches_geography(candidate: Dict[str, Any], payload: Dict[str, Any]) -> boo
 # ---------------------------------------------------------------------------
 
 
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated venue fields to return (or a field set: "
+    + ", ".join(fastjson.FIELD_SETS)
+    + "); default every field",
+)
+
+
+def _page(
+    results: List[Dict[str, Any]],
+    payload: Dict[str, Any],
+    sort: str,
+    order: str,
+    limit: int,
+    cursor: Optional[str],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Dict[str, Any]:
+    try:
+        body = paging.page(results, _stage_keys(payload)["score"], sort, order, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    body["results"] = fastjson.project(body["results"], fields)
+    return body
+
+
 @router.post("/preview")
-def preview(payload: dict = Body(...)) -> Dict[str, Any]:
+def preview(
+    payload: dict = Body(...),
+    bypass_cache: bool = Query(False, description="Recompute every stage, ignoring cached results"),
+    limit: int = Query(paging.DEFAULT_LIMIT, ge=1, le=paging.MAX_LIMIT, description="Venues per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    sort: str = Query("score", description="A results-table column: " + ", ".join(paging.SORT_KEYS)),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = FIELDS_QUERY,
+) -> FastJSONResponse:
     """
-    Preview ranked venue candidates.
+    Preview ranked venue candidates, one page at a time.
+
+    Returns the first `limit` venues under `sort`/`order` with the total
+    count and a `next_cursor` for the following page (null on the last);
+    `fields` trims each venue to the columns the client renders.
+    Stage results are cached, so later pages and other sort orders reuse
+    the ranking; the X-Cache (HIT/PARTIAL/MISS/BYPASS) and X-Cache-Stages
+    headers report what was reused, and Server-Timing gives each stage's
+    duration.
     """
     if isinstance(payload, dict):
         payload_dict: Dict[str, Any] = payload
@@ -277,52 +502,155 @@ def preview(payload: dict = Body(...)) -> Dict[str, Any]:
         except Exception:
             payload_dict = {}
 
-    # 1) Discover from Google with strict radius
-    google_list = places.discover(payload_dict)
-
-    # 2) Merge candidates – Yelp not wired yet
-    merged = merge.merge_candidates(google_list, [])
-
-    # 3) Apply geography + blocklist filters
-    filtered: List[Dict[str, Any]] = []
-    for cand in merged:
-        if not matches_geography(cand, payload_dict):
-            continue
-        if is_irrelevant_venue(cand):
-            continue
-        filtered.append(cand)
-
-    # 4) Enrich & score
-    enriched: List[Dict[str, Any]] = []
-    for v in filtered:
-        v_enriched = extract.enrich(dict(v))
-        try:
-            total, reason, comps = scoring.score(v_enriched)
-        except Exception:
-            total, reason, comps = 0.0, "", {}
-
-        v_enriched["score"] = total
-        v_enriched["score_reason"] = reason
+    with metrics.collect_timings() as timings:
+        with metrics.timed(REQUEST_SECONDS, "preview", timing="total"):
+            enriched_sorted, status = run_preview(payload_dict, bypass_cache=bypass_cache)
+            with metrics.timed(STAGE_SECONDS, "page", timing="page"):
+                body = _page(
+                    enriched_sorted, payload_dict, sort, order, limit, cursor, fastjson.parse_fields(fields)
+                )
+
+    # returned as a response so FastAPI does not walk every venue with jsonable_encoder
+    return FastJSONResponse(
+        body,
+        headers={
+            "Server-Timing": metrics.server_timing(timings),
+            "X-Cache": cache_header(status),
+            "X-Cache-Stages": ", ".join(f"{k}={v}" for k, v in status.items()),
+        },
+    )
 
-        # Normalize component names for the UI columns
-        v_enriched["educationality"] = comps.get("educationality")
-        v_enriched["availability_score"] = comps.get("availability")
-        v_enriched["capacity_score"] = comps.get("capacity_fit")
-        v_enriched["amenities_score"] = comps.get("amenities")
-        v_enriched["logistics_score"] = comps.get("logistics")
 
-        enriched.append(v_enriched)
+# ---------------------------------------------------------------------------
+# Exports
+# ---------------------------------------------------------------------------
 
-    # 5) Sort by score descending
-    enriched_sorted = sorted(
-        enriched, key=lambda x: x.get("score", 0.0), reverse=True
-    )
 
-    # 6) Return plain dict (JSON)
-    return {
-        "results": enriched_sorted,
-        "candidates": enriched_sorted,
+@router.post("/run")
+def run(
+    payload: dict = Body(...),
+    bypass_cache: bool = Query(False, description="Recompute every stage, ignoring cached results"),
+    fields: Optional[str] = FIELDS_QUERY,
+) -> FastJSONResponse:
+    """
+    Rank venues and write exports/venues_ranked.csv and .xlsx (and .parquet
+    when pyarrow is installed). The exports always hold every field;
+    `fields` only trims the venues in the response.
+    """
+    with metrics.collect_timings() as timings:
+        with metrics.timed(REQUEST_SECONDS, "run", timing="total"):
+            results, _status = run_preview(payload, bypass_cache=bypass_cache)
+            exports = {}
+            for fmt in export.default_formats():
+                with metrics.timed(STAGE_SECONDS, f"export_{fmt}", errors=STAGE_ERRORS, timing=f"export_{fmt}"):
+                    path = os.path.join(settings.export_dir, export.filename(fmt))
+                    exports[fmt] = export.write(fmt, results, path)
+    body = {"count": len(results), "results": fastjson.project(results, fastjson.parse_fields(fields)), "exports": exports}
+    return FastJSONResponse(body, headers={"Server-Timing": metrics.server_timing(timings)})
+
+
+@router.post("/export")
+def export_ranked(
+    payload: dict = Body(...),
+    format: str = Query("csv", pattern="^(csv|xlsx|parquet)$", description="csv, xlsx or parquet"),
+    bypass_cache: bool = Query(False, description="Recompute every stage, ignoring cached results"),
+) -> StreamingResponse:
+    """Ranked venues as a downloadable file, streamed rather than written to exports/."""
+    if format == "parquet" and not export.parquet_available():
+        raise HTTPException(status_code=501, detail="parquet export needs pyarrow installed")
+    with metrics.collect_timings() as timings:
+        results, status = run_preview(payload, bypass_cache=bypass_cache)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export.filename(format)}"',
+        "X-Cache": cache_header(status),
+        "Server-Timing": metrics.server_timing(timings),
     }
+    return StreamingResponse(export.stream(format, results), media_type=export.media_type(format), headers=headers)
 
 
+# ---------------------------------------------------------------------------
+# Streaming endpoint
+# ---------------------------------------------------------------------------
+
 
+def _preview_events(
+    payload: Dict[str, Any],
+    bypass_cache: bool,
+    sort: str = "score",
+    order: str = "desc",
+    limit: int = paging.DEFAULT_LIMIT,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    """
+    (event, data) pairs: a "venue" event for every scored venue as soon as
+    its (anchor, query) batch is back, then one "summary" with the first
+    page of the merged and re-ranked list (as /rank/preview returns it).
+    """
+    cached = MISSING if bypass_cache else _stage_cache.get(_stage_keys(payload)["score"])
+    if cached is not MISSING:
+        for v in cached:
+            yield "venue", fastjson.project_one(v, fields)
+        summary = _page(cached, payload, sort, order, limit, None, fields)
+        yield "summary", dict(summary, cache={s: "hit" for s in PREVIEW_STAGES})
+        return
+
+    discovered: List[Dict[str, Any]] = []
+    enriched: Enriched = {}
+    seen = set()
+    for _target, _query, batch in catalog.iter_discover(payload):
+        fresh = []
+        for cand in batch:
+            k = merge._key(cand)
+            if k not in seen:
+                seen.add(k)
+                fresh.append(cand)
+        if not fresh:
+            continue
+        # later copies of a key are left out, so the summary ranks the
+        # records that were streamed (and enriched) above
+        discovered.extend(fresh)
+        filtered = _filter_stage(fresh, payload)
+        batch_enriched = _enrich_stage(filtered, payload)
+        enriched.update(_enriched_pairs(filtered, batch_enriched))
+        for v in _score_stage(batch_enriched, payload):
+            yield "venue", fastjson.project_one(v, fields)
+
+    # the summary re-merges and re-ranks; only venues merged across batches are enriched anew
+    results, status = run_preview(payload, bypass_cache=bypass_cache, discovered=discovered, enriched=enriched)
+    yield "summary", dict(_page(results, payload, sort, order, limit, None, fields), cache=status)
+
+
+def _ndjson(events: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterable[bytes]:
+    for event, data in events:
+        yield fastjson.dumps({"event": event, "data": data}) + b"\n"
+
+
+def _sse(events: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterable[bytes]:
+    for event, data in events:
+        yield b"event: " + event.encode() + b"\ndata: " + fastjson.dumps(data) + b"\n\n"
+
+
+@router.post("/preview/stream")
+def preview_stream(
+    payload: dict = Body(...),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    bypass_cache: bool = Query(False),
+    limit: int = Query(paging.DEFAULT_LIMIT, ge=1, le=paging.MAX_LIMIT),
+    sort: str = Query("score"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = FIELDS_QUERY,
+) -> StreamingResponse:
+    """
+    Streaming /rank/preview: venues are sent as each provider batch is
+    scored (NDJSON lines or Server-Sent Events), followed by a final
+    "summary" event holding the first page of the merged, deduplicated
+    ranking with its next_cursor for /rank/preview.
+    """
+    if sort not in paging.SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"unknown sort key {sort!r}")
+    events = _preview_events(
+        payload if isinstance(payload, dict) else {}, bypass_cache, sort, order, limit, fastjson.parse_fields(fields)
+    )
+    if format == "sse":
+        return StreamingResponse(_sse(events), media_type="text/event-stream")
+    return StreamingResponse(_ndjson(events), media_type="application/x-ndjson")
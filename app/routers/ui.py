@@ -236,6 +236,9 @@ HTML_PAGE = """
         </thead>
         <tbody id="results-body"></tbody>
       </table>
+      <div class="actions">
+        <button id="load-more" type="button" style="display:none;">Load more</button>
+      </div>
     </div>
 
     <div id="no-results" class="no-results" style="display:none;">
@@ -253,9 +256,16 @@ HTML_PAGE = """
     const noResultsEl = document.getElementById("no-results");
     const jsonDebug = document.getElementById("json-debug");
     const table = document.getElementById("results-table");
+    const loadMoreBtn = document.getElementById("load-more");
+    const PAGE_SIZE = 25;
+    // Rows arrive already sorted and paged by the server (sort/order/cursor
+    // on /rank/preview); the table only displays them.
     let currentRows = [];
     let currentSortKey = "score";
     let currentSortDir = "desc";
+    let currentPayload = null;
+    let nextCursor = null;
+    let totalRows = 0;
 
     function parseList(value, maxCount) {
       if (!value) return [];
@@ -336,31 +346,7 @@ HTML_PAGE = """
       noResultsEl.style.display = "none";
       resultsContainer.style.display = "block";
 
-      const sorted = [...currentRows].sort((a, b) => {
-        const key = currentSortKey;
-        const av = a[key];
-        const bv = b[key];
-
-        if (av == null && bv == null) return 0;
-        if (av == null) return 1;
-        if (bv == null) return -1;
-
-        // numeric sort when both look like numbers
-        const aNum = Number(av);
-        const bNum = Number(bv);
-        const bothNumeric = !Number.isNaN(aNum) && !Number.isNaN(bNum);
-
-        let cmp;
-        if (bothNumeric) {
-          cmp = aNum - bNum;
-        } else {
-          cmp = String(av).localeCompare(String(bv));
-        }
-
-        return currentSortDir === "asc" ? cmp : -cmp;
-      });
-
-      sorted.forEach((row, idx) => {
+      currentRows.forEach((row, idx) => {
         const tr = document.createElement("tr");
 
         const fields = {
@@ -413,9 +399,46 @@ HTML_PAGE = """
         resultsBody.appendChild(tr);
       });
 
+      loadMoreBtn.style.display = nextCursor ? "inline-block" : "none";
       applySortIndicator();
     }
 
+    function applyPage(page, append) {
+      const rows = Array.isArray(page.results) ? page.results : [];
+      currentRows = append ? currentRows.concat(rows) : rows;
+      nextCursor = page.next_cursor || null;
+      totalRows = page.total != null ? page.total : currentRows.length;
+      statusEl.textContent = `${totalRows} venue(s) found` +
+        (currentRows.length < totalRows ? `, showing ${currentRows.length}.` : ".");
+      renderRows();
+    }
+
+    async function fetchPage(append) {
+      if (!currentPayload) return;
+      const params = new URLSearchParams({
+        limit: String(PAGE_SIZE),
+        sort: currentSortKey,
+        order: currentSortDir,
+        fields: "table",
+      });
+      if (append && nextCursor) params.set("cursor", nextCursor);
+      try {
+        const res = await fetch("/rank/preview?" + params.toString(), {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify(currentPayload),
+        });
+        if (!res.ok) {
+          statusEl.textContent = "Error: " + res.status + " " + res.statusText;
+          return;
+        }
+        applyPage(await res.json(), append);
+      } catch (err) {
+        console.error(err);
+        statusEl.textContent = "Error loading venues.";
+      }
+    }
+
     form.addEventListener("submit", async (event) => {
       event.preventDefault();
       statusEl.textContent = "Searching venues…";
@@ -424,9 +447,21 @@ HTML_PAGE = """
       jsonDebug.style.display = "none";
 
       const payload = buildPayload();
+      currentPayload = payload;
+      nextCursor = null;
 
       try {
-        const res = await fetch("/rank/preview", {
+        // NDJSON stream: one {"event": "venue"} line per venue as provider
+        // batches finish, then {"event": "summary"} with the first page of
+        // the final ranking.
+        const params = new URLSearchParams({
+          format: "ndjson",
+          limit: String(PAGE_SIZE),
+          sort: currentSortKey,
+          order: currentSortDir,
+          fields: "table",
+        });
+        const res = await fetch("/rank/preview/stream?" + params.toString(), {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify(payload),
@@ -437,14 +472,50 @@ HTML_PAGE = """
           return;
         }
 
-        const data = await res.json();
-        // Expect { results: [...], candidates: [...] }
-        const results = Array.isArray(data.results) ? data.results : [];
+        currentRows = [];
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let renderQueued = false;
+        let streamed = 0;
+
+        function queueRender() {
+          if (renderQueued) return;
+          renderQueued = true;
+          requestAnimationFrame(() => {
+            renderQueued = false;
+            renderRows();
+          });
+        }
+
+        function handleLine(line) {
+          if (!line.trim()) return;
+          const msg = JSON.parse(line);
+          if (msg.event === "venue") {
+            // unranked until the summary arrives; show the first page's worth
+            if (currentRows.length < PAGE_SIZE) currentRows.push(msg.data);
+            streamed += 1;
+            statusEl.textContent = `Searching venues… ${streamed} so far`;
+            queueRender();
+          } else if (msg.event === "summary") {
+            // hidden debug: everything but the rows, which the table already shows
+            const { results: _rows, ...meta } = msg.data;
+            jsonDebug.textContent = JSON.stringify(meta, null, 2);
+            applyPage(msg.data, false);
+          }
+        }
 
-        currentRows = results;
-        statusEl.textContent = `${results.length} venue(s) found.`;
-        jsonDebug.textContent = JSON.stringify(data, null, 2);  // keep as hidden debug
-        renderRows();
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let nl;
+          while ((nl = buffer.indexOf("\\n")) >= 0) {
+            handleLine(buffer.slice(0, nl));
+            buffer = buffer.slice(nl + 1);
+          }
+        }
+        handleLine(buffer);
       } catch (err) {
         console.error(err);
         statusEl.textContent = "Error performing search.";
@@ -462,10 +533,13 @@ HTML_PAGE = """
           currentSortKey = key;
           currentSortDir = key === "index" ? "asc" : "desc";
         }
-        renderRows();
+        applySortIndicator();
+        fetchPage(false);
       });
     });
 
+    loadMoreBtn.addEventListener("click", () => fetchPage(true));
+
     // Initial sort indicator
     applySortIndicator();
   </script>
@@ -478,7 +552,7 @@ HTML_PAGE = """
 def ui() -> HTMLResponse:
     """
     Simple HTML UI for venue search that posts to /rank/preview
-    and renders a sortable table of results.
+    and renders a server-sorted, paged table of results.
     """
     return HTMLResponse(content=HTML_PAGE)
 
@@ -0,0 +1,137 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU with a per-entry expiry.
+
+    get() returns MISSING (not None) on a miss so that None can be cached
+    as a legitimate negative result.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires, value = entry
+            if expires < time.time():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _LeaderGone(Exception):
+    """The call being waited on was cancelled; a follower should try again."""
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller (the
+    leader) runs the work, later callers wait for its result instead of
+    repeating it. Waiters may be threads (do) or asyncio tasks (ado) in any
+    mix, since the shared handle is a concurrent.futures.Future.
+
+    Results are shared, not copied, so callers must not mutate them. A
+    leader's exception is raised in every waiter; if the leader is
+    cancelled, one waiter takes over and runs the call itself.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "concurrent.futures.Future[Any]"] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> Tuple["concurrent.futures.Future[Any]", bool]:
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                return fut, False
+            fut = self._calls[key] = concurrent.futures.Future()
+            return fut, True
+
+    def _finish(self, key: Hashable, fut: "concurrent.futures.Future[Any]", result: Any = None, exc: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is fut:
+                del self._calls[key]
+        if exc is None:
+            fut.set_result(result)
+        else:
+            fut.set_exception(exc)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(result, shared): run fn() or wait for the identical call already running."""
+        while True:
+            fut, leader = self._join(key)
+            if not leader:
+                try:
+                    return fut.result(), True
+                except _LeaderGone:
+                    continue
+            try:
+                result = fn()
+            except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
+                self._finish(key, fut, exc=_LeaderGone())
+                raise
+            except BaseException as e:
+                self._finish(key, fut, exc=e)
+                raise
+            self._finish(key, fut, result)
+            return result, False
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async do(); `fn` returns the coroutine to await when this task leads."""
+        while True:
+            fut, leader = self._join(key)
+            if not leader:
+                try:
+                    # shield: a cancelled waiter must not cancel the shared future
+                    return await asyncio.shield(asyncio.wrap_future(fut)), True
+                except _LeaderGone:
+                    continue
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self._finish(key, fut, exc=_LeaderGone())
+                raise
+            except BaseException as e:
+                self._finish(key, fut, exc=e)
+                raise
+            self._finish(key, fut, result)
+            return result, False
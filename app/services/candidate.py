@@ -0,0 +1,237 @@
+"""
+Candidate: a compact venue record for discovery, merge, enrich and score,
+opt-in with CANDIDATE_RECORDS (discovery builds records with record()).
+
+A Candidate behaves like the dicts the pipeline always passed around
+(get, [], in, setdefault, items, ...), so every stage keeps reading it the
+same way, but it is a two-slot object:
+
+- `_values`, one list entry per name in FIELDS (the keys discovery,
+  enrichment and scoring write), with _UNSET for a field the record does
+  not have; no per-venue hash table and no per-venue copy of the keys
+- `_extra`, a dict for any other key, usually None
+
+derive() replaces the dict(v) copies that stages over cached input
+(merge, enrich over filter output, score over enrich output) used to take
+so they never mutate the cache: it copies the value list, a flat C-level
+pointer copy that does not rehash a single key. Nested values (rooms,
+amenities, types) are shared, exactly as with the shallow dict copies.
+
+Candidates hold about a third less memory than dicts, but every field
+access runs in Python, so building, enriching, scoring and encoding them
+is slower than with dicts (benchmarks/bench_candidate.py). Plain dicts
+stay the default. Turn Candidates on when holding many large result sets
+matters more than stage time.
+
+Iteration, items(), values() and to_dict() read the slots directly.
+Candidates become plain dicts only at the API boundary (to_dict(), which
+app.services.fastjson applies when encoding). columns() and present() read
+fields of many records at once for the vectorized scorer and the columnar
+pipeline (app.services.columnar).
+"""
+from collections.abc import ItemsView, KeysView, Mapping, MutableMapping, ValuesView
+from itertools import chain, compress, repeat
+from operator import is_not, itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.settings import settings
+
+FIELDS = (
+    # discovery (places._candidates_from_results, catalog.query)
+    "name", "address", "place_id", "yelp_id", "lat", "lng", "city", "state", "zip",
+    "category", "types", "query_category", "website_url", "booking_url", "phone",
+    "availability_status", "educationality", "distance_miles", "source",
+    # enrichment (extract.enrich, crawler)
+    "amenities", "rooms", "contact_name", "contact_email", "parking_notes",
+    "disclosure_needed", "image_allowed",
+    # scoring (rank._score_stage)
+    "score", "score_reason", "availability_score", "capacity_score", "amenities_score", "logistics_score",
+)
+_INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+
+class _Unset:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<unset>"
+
+
+_UNSET: Any = _Unset()
+_EMPTY = [_UNSET] * len(FIELDS)
+
+
+def _set(values: List[Any]) -> Iterator[bool]:
+    """Whether each slot holds a value, evaluated in C."""
+    return map(is_not, values, _EMPTY)
+
+
+class _Keys(KeysView):
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._mapping)
+
+
+class _Items(ItemsView):
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        m = self._mapping
+        pairs = compress(zip(FIELDS, m._values), _set(m._values))
+        return chain(pairs, m._extra.items()) if m._extra else pairs
+
+
+class _Values(ValuesView):
+    def __iter__(self) -> Iterator[Any]:
+        m = self._mapping
+        values = compress(m._values, _set(m._values))
+        return chain(values, m._extra.values()) if m._extra else values
+
+
+class Candidate(MutableMapping):
+    __slots__ = ("_values", "_extra")
+
+    def __init__(self, data: Optional[Mapping] = None, **fields: Any):
+        if fields:
+            data = {**data, **fields} if data else fields
+        if not data:
+            self._values = _EMPTY.copy()
+            self._extra = None
+            return
+        # one C-level lookup per field; other keys only when some are left over
+        values = list(map(data.get, FIELDS, _EMPTY))
+        extra = None
+        if len(data) > len(values) - values.count(_UNSET):
+            extra = {k: v for k, v in data.items() if k not in _INDEX} or None
+        self._values = values
+        self._extra = extra
+
+    def derive(self) -> "Candidate":
+        """An independent record with the same fields (nested values shared)."""
+        out = Candidate.__new__(Candidate)
+        out._values = self._values.copy()
+        out._extra = dict(self._extra) if self._extra else None
+        return out
+
+    # -- mapping protocol ---------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = _INDEX.get(key)
+        if i is not None:
+            v = self._values[i]
+            return default if v is _UNSET else v
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        v = self.get(key, _UNSET)
+        if v is _UNSET:
+            raise KeyError(key)
+        return v
+
+    def __contains__(self, key: object) -> bool:
+        i = _INDEX.get(key)  # type: ignore[arg-type]
+        if i is not None:
+            return self._values[i] is not _UNSET
+        return self._extra is not None and key in self._extra
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        i = _INDEX.get(key)
+        if i is not None:
+            self._values[i] = value
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        i = _INDEX.get(key)
+        if i is not None and self._values[i] is not _UNSET:
+            self._values[i] = _UNSET
+        elif i is None and self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        i = _INDEX.get(key)
+        if i is None:
+            if self._extra is None:
+                self._extra = {}
+            return self._extra.setdefault(key, default)
+        v = self._values[i]
+        if v is _UNSET:
+            self._values[i] = v = default
+        return v
+
+    def __iter__(self) -> Iterator[str]:
+        keys = compress(FIELDS, _set(self._values))
+        return chain(keys, self._extra) if self._extra else keys
+
+    def __len__(self) -> int:
+        return len(self._values) - self._values.count(_UNSET) + len(self._extra or ())
+
+    def keys(self) -> KeysView:
+        return _Keys(self)
+
+    def items(self) -> ItemsView:
+        return _Items(self)
+
+    def values(self) -> ValuesView:
+        return _Values(self)
+
+    def __repr__(self) -> str:
+        return f"Candidate({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return Candidate, (self.to_dict(),)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the fields that are set, in FIELDS order, then any others."""
+        out = {k: v for k, v in zip(FIELDS, self._values) if v is not _UNSET}
+        if self._extra:
+            out.update(self._extra)
+        return out
+
+
+def record(data: Optional[Mapping] = None, **fields: Any) -> MutableMapping:
+    """A new discovery record: a Candidate with CANDIDATE_RECORDS on, else a plain dict."""
+    if settings.candidate_records:
+        return Candidate(data, **fields)
+    return {**data, **fields} if data else fields
+
+
+def derive(v: Mapping) -> MutableMapping:
+    """A writable record with `v`'s fields that leaves `v` untouched."""
+    if isinstance(v, Candidate):
+        return v.derive()
+    return dict(v)
+
+
+def columns(records: Sequence[Mapping], names: Sequence[str]) -> Dict[str, List[Any]]:
+    """{name: [each record's value or None]}; Candidates are read by list index, dicts with dict.get."""
+    if all(type(r) is Candidate for r in records):
+        rows = [r._values for r in records]
+        out = {}
+        for n in names:
+            if n in _INDEX:
+                out[n] = [None if v is _UNSET else v for v in map(itemgetter(_INDEX[n]), rows)]
+            else:
+                out[n] = [r.get(n) for r in records]
+        return out
+    if all(type(r) is dict for r in records):
+        return {n: list(map(dict.get, records, repeat(n))) for n in names}
+    return {n: [r.get(n) for r in records] for n in names}
+
+
+def present(records: Sequence[Mapping], name: str) -> List[bool]:
+    """Whether each record has `name` at all (a None value counts as present)."""
+    i = _INDEX.get(name)
+    if i is not None and all(type(r) is Candidate for r in records):
+        return [v is not _UNSET for v in map(itemgetter(i), (r._values for r in records))]
+    return [name in r for r in records]
+
+
+def to_plain(value: Any) -> Any:
+    """JSON `default` hook: Candidates become dicts."""
+    if isinstance(value, Candidate):
+        return value.to_dict()
+    return str(value)
@@ -0,0 +1,292 @@
+"""
+Catalog-backed discovery: answer searches from the venues table.
+
+Every live Places search's candidates are upserted into venues, and each
+anchor whose searches all completed is remembered in catalog_coverage
+(anchor, radius, the queries that ran, page depth). A later
+search anchor is *covered* when a fresh coverage circle contains its whole
+search circle. Covered anchors are served by a bounding-box query on
+ix_venues_lat_lng followed by an exact haversine check; only the anchors
+that are stale or not yet covered go to places.discover().
+
+Output has the same shape as places.discover(), so the rank pipeline does
+not care which side a candidate came from.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional
+
+import numpy as np
+from sqlalchemy import and_, insert, or_, select
+
+from app.db.deps import engine, ensure_table
+from app.db.models import CatalogCoverage, Venue
+from app.services import places, venuestore
+from app.services.candidate import record
+from app.services.geo import bounding_box, haversine_miles, nearest_anchor
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+VENUES = Venue.__table__
+COVERAGE = CatalogCoverage.__table__
+# coverage rows farther than this from an anchor cannot contain its search circle
+MAX_COVERAGE_MILES = 50.0
+CANDIDATE_COLUMNS = [
+    "name",
+    "address",
+    "place_id",
+    "lat",
+    "lng",
+    "category",
+    "types",
+    "query_category",
+    "website_url",
+    "phone",
+    "availability_status",
+    "educationality",
+    "source",
+]
+
+Resolved = places.Resolved
+
+_counters: Dict[str, int] = {"catalog_anchors": 0, "live_anchors": 0, "catalog_venues": 0}
+_lock = threading.Lock()
+_tables_ready = False
+
+
+def _ensure_tables() -> bool:
+    global _tables_ready
+    if _tables_ready:
+        return True
+    with _lock:
+        if not _tables_ready:
+            try:
+                ensure_table(VENUES)
+                ensure_table(COVERAGE)
+                _tables_ready = True
+            except Exception as e:
+                logger.warning("tables unavailable: %s", e)
+    return _tables_ready
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] += n
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def query_signature(queries: Optional[List[str]] = None) -> str:
+    """Fingerprint of a query set (default: all of QUERY_BASES, what is_covered() asks for)."""
+    return hashlib.sha1("|".join(places.QUERY_BASES if queries is None else queries).encode()).hexdigest()[:12]
+
+
+# ---------------------------------------------------------------------------
+# Coverage
+# ---------------------------------------------------------------------------
+
+
+def is_covered(anchor: Dict[str, Any], radius_miles: float, max_pages: int, now: Optional[float] = None) -> bool:
+    """A fresh live search with the same queries contains this search circle."""
+    if not _ensure_tables():
+        return False
+    now = time.time() if now is None else now
+    min_lat, max_lat, min_lng, max_lng = bounding_box(anchor["lat"], anchor["lng"], MAX_COVERAGE_MILES)
+    stmt = select(COVERAGE.c.lat, COVERAGE.c.lng, COVERAGE.c.radius_miles).where(
+        COVERAGE.c.lat.between(min_lat, max_lat),
+        COVERAGE.c.lng.between(min_lng, max_lng),
+        COVERAGE.c.queries == query_signature(),
+        COVERAGE.c.max_pages >= max_pages,
+        COVERAGE.c.radius_miles >= radius_miles,
+        COVERAGE.c.covered_at >= now - settings.catalog_ttl,
+    )
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(stmt).all()
+    except Exception as e:
+        logger.warning("coverage read failed: %s", e)
+        return False
+    return any(haversine_miles(anchor["lat"], anchor["lng"], lat, lng) + radius_miles <= r for lat, lng, r in rows)
+
+
+def _completed_queries(target: str, searches: places.Searches) -> List[str]:
+    """
+    The queries that ran for `target`, in QUERY_BASES order, or [] when any
+    of them was cut short (budget rejection, failed call or error status).
+    """
+    ran = [q for q in places.QUERY_BASES if (target, q) in searches]
+    if not all(searches[(target, q)] for q in ran):
+        return []
+    return ran
+
+
+def remember(
+    resolved: Resolved,
+    radius_miles: float,
+    max_pages: int,
+    candidates: List[Dict[str, Any]],
+    searches: places.Searches,
+) -> None:
+    """
+    Store a live search's candidates, then mark as covered the anchors
+    whose searches all completed. The signature names the queries that
+    really ran, so an anchor searched with a budget-trimmed query set never
+    satisfies is_covered() for the full set.
+    """
+    if not _ensure_tables():
+        return
+    if candidates:
+        venuestore.upsert_venues(candidates)
+    now = time.time()
+    rows = []
+    for target, anchor in resolved:
+        ran = _completed_queries(target, searches)
+        if not ran:
+            continue
+        rows.append({
+            "target": target,
+            "lat": anchor["lat"],
+            "lng": anchor["lng"],
+            "radius_miles": float(radius_miles),
+            "queries": query_signature(ran),
+            "max_pages": max_pages,
+            "covered_at": now,
+        })
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(insert(COVERAGE), rows)
+
+
+def _remember_logged(*args: Any) -> None:
+    try:
+        remember(*args)
+    except Exception as e:
+        logger.warning("write failed: %s", e)
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+
+def query(covered: Resolved, anchors: List[Dict[str, Any]], radius_miles: float) -> List[MutableMapping[str, Any]]:
+    """
+    Stored venues within `radius_miles` of a covered anchor, nearest first.
+
+    distance_miles is measured to the nearest of *all* search anchors, like
+    places._candidates_from_results().
+    """
+    if not covered or not _ensure_tables():
+        return []
+    boxes = []
+    for _, a in covered:
+        min_lat, max_lat, min_lng, max_lng = bounding_box(a["lat"], a["lng"], radius_miles)
+        boxes.append(and_(VENUES.c.lat.between(min_lat, max_lat), VENUES.c.lng.between(min_lng, max_lng)))
+    stmt = select(*(VENUES.c[c] for c in CANDIDATE_COLUMNS)).where(or_(*boxes))
+    try:
+        with engine.connect() as conn:
+            rows = [dict(r._mapping) for r in conn.execute(stmt)]
+    except Exception as e:
+        logger.warning("read failed: %s", e)
+        return []
+    if not rows:
+        return []
+
+    lats = np.fromiter((r["lat"] for r in rows), dtype=float, count=len(rows))
+    lngs = np.fromiter((r["lng"] for r in rows), dtype=float, count=len(rows))
+    near_covered, which = nearest_anchor(lats, lngs, [a for _, a in covered])
+    dist, _ = nearest_anchor(lats, lngs, anchors)
+    keep = np.flatnonzero(near_covered <= radius_miles)
+
+    out = []
+    for i in keep.tolist():
+        cand = record(rows[i])
+        cand["city"] = covered[which[i]][0]
+        cand["distance_miles"] = round(float(dist[i]), 2)
+        cand["types"] = cand["types"] or []
+        out.append(cand)
+    out.sort(key=lambda c: (c["distance_miles"], c["name"] or ""))
+    return out
+
+
+def _redistance(candidates: List[Dict[str, Any]], anchors: List[Dict[str, Any]]) -> None:
+    # live results only measured against the anchors they were searched from
+    if not candidates:
+        return
+    lats = [c.get("lat") if c.get("lat") is not None else float("nan") for c in candidates]
+    lngs = [c.get("lng") if c.get("lng") is not None else float("nan") for c in candidates]
+    dist, _ = nearest_anchor(lats, lngs, anchors)
+    for c, d in zip(candidates, dist.tolist()):
+        if d == d:
+            c["distance_miles"] = round(min(d, c.get("distance_miles") or d), 2)
+
+
+# ---------------------------------------------------------------------------
+# Discovery provider
+# ---------------------------------------------------------------------------
+
+
+def _split(payload: Dict[str, Any]):
+    targets, radius_miles, _ = places._search_plan(payload)
+    max_pages = places._max_pages(payload)
+    resolved = places.resolve(targets)
+    now = time.time()
+    covered: Resolved = []
+    live: Resolved = []
+    for target, anchor in resolved:
+        (covered if is_covered(anchor, radius_miles, max_pages, now) else live).append((target, anchor))
+    _count("catalog_anchors", len(covered))
+    _count("live_anchors", len(live))
+    return covered, live, [a for _, a in resolved], radius_miles, max_pages
+
+
+def discover(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Drop-in for places.discover(): covered anchors come from the catalog,
+    the rest from a live search whose results are then stored (in the
+    background) for next time.
+    """
+    if not settings.catalog_enabled:
+        return places.discover(payload)
+    covered, live, anchors, radius_miles, max_pages = _split(payload)
+    searches: places.Searches = {}
+    if not covered:
+        found = places.discover(payload, resolved=live, searches=searches)
+        venuestore.submit(_remember_logged, live, radius_miles, max_pages, found, searches)
+        return found
+
+    out = query(covered, anchors, radius_miles)
+    _count("catalog_venues", len(out))
+    if live:
+        found = places.discover(payload, resolved=live, searches=searches)
+        _redistance(found, anchors)
+        venuestore.submit(_remember_logged, live, radius_miles, max_pages, found, searches)
+        out.extend(found)
+    return out
+
+
+def iter_discover(payload: Dict[str, Any]) -> Iterator[places.Batch]:
+    """Like places.iter_discover(); the catalog part comes back as one first batch."""
+    if not settings.catalog_enabled:
+        yield from places.iter_discover(payload)
+        return
+    covered, live, anchors, radius_miles, max_pages = _split(payload)
+    if covered:
+        batch = query(covered, anchors, radius_miles)
+        _count("catalog_venues", len(batch))
+        yield ", ".join(t for t, _ in covered), "catalog", batch
+    if not live:
+        return
+    found: List[Dict[str, Any]] = []
+    searches: places.Searches = {}
+    for target, q, batch in places.iter_discover(payload, resolved=live, searches=searches):
+        _redistance(batch, anchors)
+        found.extend(batch)
+        yield target, q, batch
+    venuestore.submit(_remember_logged, live, radius_miles, max_pages, found, searches)
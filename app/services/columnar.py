@@ -0,0 +1,240 @@
+"""
+Columnar candidate table for the ranking pipeline (RANK_COLUMNAR).
+
+CandidateTable keeps a stage's candidates as one pandas frame of the
+columns the pipeline reads, next to the records themselves: name, lat,
+lng, distance, category and types, the address fields the geography
+filter parses, and what the scorer uses (educationality, availability,
+amenities, rooms, parking). Filter, enrich and score then run as column
+operations. Nothing loops over venue dicts until the ranked list is built.
+
+- filter: geography is a boolean mask. Each address column is factorized
+  and only its distinct values are parsed. The per-field flags are OR-ed
+  and combined with the same rule as GeographyMatcher._match. The
+  blocklist searches each distinct venue text once.
+- enrich: only rows with a website_url are copied and crawled. Default
+  rooms are filled in the rooms column with a presence mask.
+- score: scoring.score_columns() over the frame, then a stable argsort on
+  descending score.
+
+ranked() is the only step that writes records. The enrich defaults a row
+lacks and its score fields form one tail dict per distinct (missing
+defaults, score) pair, and each ranked record is a single
+{**record, **tail}. The output equals the row-wise stages', venue for
+venue and key for key (see benchmarks/bench_columnar.py).
+
+Merge (clustering) and the blocklist search over each distinct venue text
+stay per row and dominate the filter stage. Expect the gain in enrich and
+score, with filter about even with the row-wise path.
+"""
+from typing import Any, Dict, List, MutableMapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services import extract, scoring
+from app.services.candidate import columns, derive, present
+from app.services.geography import CANDIDATE_FIELDS, GeographyMatcher, parse_field
+from app.services.keywords import KeywordMatcher
+from app.settings import settings
+
+TEXT_COLUMNS = ("name", "category", "type", "types", "categories")
+COLUMNS = tuple(dict.fromkeys(
+    ("name", "lat", "lng", "distance_miles", "website_url")
+    + TEXT_COLUMNS
+    + tuple(scoring.INPUT_COLUMNS)
+    + CANDIDATE_FIELDS
+))
+# frame columns a crawl can fill (extract.apply_crawl)
+CRAWL_COLUMNS = tuple(c for c in extract.CRAWLED_FIELDS + ["rooms"] if c in COLUMNS)
+
+
+def _objects(values: Sequence[Any]) -> np.ndarray:
+    """1-d object array (lists stay elements, NumPy would make them a dimension)."""
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _normalize_str(value: Any) -> str:
+    # as rank._normalize_str
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+def _normalized(col: pd.Series) -> np.ndarray:
+    """Each value as rank's venue text has it, normalized once per distinct value."""
+    try:
+        codes, uniques = pd.factorize(col)
+    except TypeError:  # unhashable values
+        return _objects([_normalize_str(v) for v in col.tolist()])
+    return _objects([_normalize_str(u) for u in uniques] + [""])[codes]
+
+
+def _types_text(types: Sequence[Any], categories: Sequence[Any]) -> np.ndarray:
+    seen: Dict[Any, str] = {}
+    out = []
+    for t, c in zip(types, categories):
+        t = t or c or []
+        key = t if isinstance(t, str) else tuple(t)
+        text = seen.get(key)
+        if text is None:
+            text = _normalize_str(t) if isinstance(t, str) else " ".join(_normalize_str(x) for x in t)
+            seen[key] = text
+        out.append(text)
+    return _objects(out)
+
+
+class CandidateTable:
+    """A stage's candidates: `records` in order and `frame`, their COLUMNS."""
+
+    __slots__ = ("records", "frame")
+
+    def __init__(self, records: List[MutableMapping], frame: pd.DataFrame):
+        self.records = records
+        self.frame = frame
+
+    @classmethod
+    def from_records(cls, records: Sequence[MutableMapping]) -> "CandidateTable":
+        cols = columns(records, COLUMNS)
+        return cls(list(records), pd.DataFrame({c: _objects(cols[c]) for c in COLUMNS}))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def take(self, rows: np.ndarray) -> "CandidateTable":
+        """The rows a boolean mask (or index array) selects, in order."""
+        idx = np.flatnonzero(rows) if rows.dtype == bool else rows
+        records = self.records
+        return CandidateTable([records[i] for i in idx.tolist()], self.frame.take(idx).reset_index(drop=True))
+
+    # -- filter ---------------------------------------------------------------
+
+    def geography_mask(self, matcher: GeographyMatcher) -> np.ndarray:
+        n = len(self)
+        if matcher.unconstrained:
+            return np.ones(n, dtype=bool)
+        # has state, state hit, ZIP hit, has city, city hit; OR-ed over fields
+        flags = np.zeros((5, n), dtype=bool)
+        for key in CANDIDATE_FIELDS:
+            try:
+                codes, uniques = pd.factorize(self.frame[key])
+            except TypeError:  # unhashable values: ask the matcher row by row
+                return np.fromiter((matcher.matches(r) for r in self.records), dtype=bool, count=n)
+            if not len(uniques):
+                continue
+            # one extra column for missing values (code -1)
+            per_value = np.zeros((5, len(uniques) + 1), dtype=bool)
+            for u, value in enumerate(uniques.tolist()):
+                per_value[:, u] = matcher.part_flags(parse_field(key, value))
+            flags |= per_value[:, codes]
+        has_state, state_hit, zip_hit, has_city, city_hit = flags
+        # GeographyMatcher._match, column-wise
+        ok = ~(has_state & ~state_hit) if matcher.state else np.ones(n, dtype=bool)
+        if matcher.cities:
+            ok &= zip_hit | ~(has_city & ~city_hit)
+        return ok
+
+    def keyword_hits(self, matcher: KeywordMatcher) -> np.ndarray:
+        """The blocklist keyword each row matches (rank._venue_text), or None."""
+        if not len(self):
+            return _objects([])
+        f = self.frame
+        text = (
+            _normalized(f["name"]) + " " + _normalized(f["category"]) + " " + _normalized(f["type"])
+            + " " + _types_text(f["types"].tolist(), f["categories"].tolist())
+        )
+        codes, uniques = pd.factorize(text)
+        return _objects([matcher.search(t) for t in uniques])[codes]
+
+    def filter(
+        self, geography: GeographyMatcher, keywords: KeywordMatcher
+    ) -> Tuple["CandidateTable", List[Tuple[MutableMapping, str]]]:
+        """Rows inside the geography and off the blocklist, plus (record, keyword) for each blocked one."""
+        inside = self.take(self.geography_mask(geography))
+        hits = inside.keyword_hits(keywords)
+        blocked = np.fromiter((h is not None for h in hits.tolist()), dtype=bool, count=len(hits))
+        excluded = [(inside.records[i], hits[i]) for i in np.flatnonzero(blocked).tolist()]
+        return inside.take(~blocked), excluded
+
+    # -- enrich ---------------------------------------------------------------
+
+    def enrich(self, refresh: bool = False, reuse: Optional[Dict[int, Tuple[Any, Any]]] = None) -> "CandidateTable":
+        """
+        extract.enrich_many() as columns: venues with a website_url are
+        crawled (copies; this table may be cached) and rows without rooms
+        get the default room for scoring. The other defaults only matter
+        on output and are applied by ranked(). A record found in `reuse`
+        (id(record) -> (record, enriched), see rank._enriched_pairs) takes
+        the enriched one instead of a new crawl.
+        """
+        records = list(self.records)
+        frame = self.frame.copy()
+        if settings.crawl_enabled and len(frame):
+            rows = np.flatnonzero(frame["website_url"].fillna("").astype(bool).to_numpy())
+            if len(rows):
+                reuse = reuse or {}
+                todo = [i for i in rows.tolist() if id(records[i]) not in reuse]
+                crawled = [derive(records[i]) for i in todo]
+                extract.crawl_venues(crawled, refresh=refresh)
+                for i, v in zip(todo, crawled):
+                    records[i] = v
+                for i in rows.tolist():
+                    if id(records[i]) in reuse:
+                        records[i] = reuse[id(records[i])][1]
+                for name, values in columns([records[i] for i in rows.tolist()], CRAWL_COLUMNS).items():
+                    col = frame[name].to_numpy(dtype=object, copy=True)
+                    col[rows] = _objects(values)
+                    frame[name] = col
+        missing = ~np.array(present(records, "rooms"), dtype=bool)
+        if missing.any():
+            rooms = frame["rooms"].to_numpy(dtype=object, copy=True)
+            rooms[missing] = _objects([extract.default_rooms()])[0:1]
+            frame["rooms"] = rooms
+        return CandidateTable(records, frame)
+
+    def enriched_records(self) -> List[MutableMapping]:
+        """New records with the enrich defaults applied, in table order."""
+        return [extract.enrich(derive(v)) for v in self.records]
+
+    # -- score ----------------------------------------------------------------
+
+    def ranked(self) -> List[MutableMapping]:
+        """Scored records in descending score order (ties keep table order), as rank's score stage returns them."""
+        if not len(self):
+            return []
+        inverse, combos = scoring.score_columns(self.frame[scoring.INPUT_COLUMNS])
+        totals = np.array([total for total, _, _ in combos], dtype=float)[inverse]
+        order = np.argsort(-totals, kind="stable")
+        # the fields the score stage writes, once per distinct score
+        scored = scoring.output_fields(combos)
+        records = self.records
+        if not all(type(r) is dict for r in records):
+            out: List[MutableMapping] = []
+            for i, j in zip(order.tolist(), inverse[order].tolist()):
+                v = extract.enrich(derive(records[i]))
+                v.update(scored[j])
+                out.append(v)
+            return out
+
+        # Which enrich defaults each row lacks, as bits (rooms last). The
+        # pattern and the score pick one tail dict, and each output record
+        # is a single {**record, **tail}: keys the record has keep their
+        # place, new ones follow in enrich-then-score order.
+        names = list(extract.DEFAULTS) + ["rooms"]
+        pattern = np.zeros(len(self), dtype=np.int64)
+        for bit, name in enumerate(names):
+            pattern |= (~np.array(present(records, name), dtype=bool)).astype(np.int64) << bit
+        keys, tail_of = np.unique(pattern * len(combos) + inverse, return_inverse=True)
+        tails = []
+        for key in keys.tolist():
+            p, j = divmod(key, len(combos))
+            # rooms is a placeholder here; each row gets its own default_rooms() below
+            tail = {name: extract.DEFAULTS.get(name) for bit, name in enumerate(names) if p >> bit & 1}
+            tail.update(scored[j])
+            tails.append(tail)
+
+        out = [{**records[i], **tails[t]} for i, t in zip(order.tolist(), tail_of[order].tolist())]
+        no_rooms = pattern[order] >> (len(names) - 1) & 1
+        for k in np.flatnonzero(no_rooms).tolist():
+            out[k]["rooms"] = extract.default_rooms()
+        return out
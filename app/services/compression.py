@@ -0,0 +1,105 @@
+"""
+Response compression (gzip, or brotli when the `brotli` package is
+installed) as ASGI middleware.
+
+Only complete bodies are compressed: a response sent in one piece, at
+least `minimum_size` bytes, of a text-like content type, and not already
+encoded. Streamed responses (NDJSON/SSE previews, job events, file
+exports) pass through untouched, so events are never held back waiting
+for a compressor to flush. Bodies over THREAD_THRESHOLD bytes are
+compressed in a worker thread to keep the event loop free.
+"""
+import gzip
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/", "application/javascript")
+THREAD_THRESHOLD = 256 * 1024
+
+Message = Dict[str, Any]
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' or 'gzip' from an Accept-Encoding header (brotli preferred), or None."""
+    offered = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        offered.add(name)
+    if brotli is not None and ("br" in offered or "*" in offered):
+        return "br"
+    if "gzip" in offered or "*" in offered:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 5, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: Callable, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable[[Message], Awaitable[None]]) -> None:
+        encoding = None
+        if scope["type"] == "http" and self.minimum_size > 0:
+            encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending: List[Message] = []  # the held http.response.start
+
+        async def send_compressed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                pending.append(message)
+                return
+            if message["type"] != "http.response.body" or not pending:
+                await send(message)
+                return
+
+            start = pending.pop()
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) > THREAD_THRESHOLD:
+                data = await anyio.to_thread.run_sync(compress, body, encoding, self.gzip_level, self.brotli_quality)
+            else:
+                data = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(data))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": data, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,442 @@
+"""
+Async website crawler behind extract.enrich_many().
+
+For each venue with a website_url it fetches the home page plus a few
+same-site pages that look useful (contact, rentals, rooms, parking) and
+extracts contact email, phone, parking notes and room capacities.
+
+- A bounded worker pool (CRAWL_WORKERS) crawls venues concurrently.
+- Per-domain politeness: at most CRAWL_PER_DOMAIN requests in flight and
+  CRAWL_DOMAIN_DELAY seconds between requests (or robots.txt Crawl-delay).
+- robots.txt is fetched once per host and cached.
+- Pages are revalidated with ETag/Last-Modified against the page_cache
+  table, so unchanged pages cost a 304 instead of a download. The table
+  also keeps each page's sha1 and parse result, so a page whose content
+  has not changed is never parsed twice.
+- crawl_venue() reports a content_hash over all pages it visited; callers
+  compare it with the stored one to tell whether anything changed.
+- Every venue gets CRAWL_VENUE_BUDGET seconds; whatever was extracted by
+  then is kept and the slow site is abandoned.
+"""
+import asyncio
+import hashlib
+import html
+import logging
+import re
+import threading
+import time
+import urllib.robotparser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from app.db.deps import SessionLocal, ensure_table
+from app.db.models import PageCacheEntry
+from app.services import httpclient
+from app.services.cache import MISSING, TTLCache
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# links kept per parsed page; Crawler.max_pages decides how many are followed
+LINK_LIMIT = 16
+LINK_HINTS = ("contact", "rent", "room", "meeting", "facilit", "space", "parking", "reserv", "about")
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_MAILTO_RE = re.compile(r"mailto:([^\"'?>\s]+)", re.I)
+_PHONE_RE = re.compile(r"(?:\+?1[\s.-]?)?\(?\b(\d{3})\)?[\s.-]?(\d{3})[\s.-](\d{4})\b")
+_HREF_RE = re.compile(r"<a\s[^>]*href=[\"']([^\"'#]+)[\"'][^>]*>(.*?)</a>", re.I | re.S)
+_SCRIPT_RE = re.compile(r"<(script|style|noscript)\b.*?</\1>", re.I | re.S)
+_TAG_RE = re.compile(r"<[^>]+>")
+_BLOCK_RE = re.compile(r"</?(?:p|div|h[1-6]|li|ul|ol|br|tr|td|th|section|article|header|footer|nav|table)\b[^>]*>", re.I)
+_ROOM_RE = re.compile(
+    r"((?:[A-Z][\w'&-]*[ \t]){0,4}(?:Room|Hall|Auditorium|Suite|Lab|Classroom))\b([^.;\n]{0,120})"
+)
+_CAPACITY_RE = re.compile(
+    r"(\d{1,4})\s*(?:people|persons|guests|seats|seated)?\s*(classroom|theater|theatre)?", re.I
+)
+_STYLE_FIRST_RE = re.compile(r"(classroom|theater|theatre)[^\d]{0,20}(\d{1,4})", re.I)
+
+_page_lock = threading.Lock()
+_page_table_ready = False
+
+
+# ---------------------------------------------------------------------------
+# Extraction
+# ---------------------------------------------------------------------------
+
+
+def page_text(body: str) -> str:
+    """Visible text, one line per block element."""
+    text = _BLOCK_RE.sub("\n", _SCRIPT_RE.sub(" ", body or ""))
+    text = html.unescape(_TAG_RE.sub(" ", text))
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _prose(body: str) -> str:
+    # link labels are navigation, not statements about the venue
+    return page_text(_HREF_RE.sub(" ", body or ""))
+
+
+def _room_capacities(context: str) -> Tuple[Optional[int], Optional[int]]:
+    classroom = theater = None
+    # "30 theater", "20 classroom" first; then "classroom: 20"
+    for n, style in _CAPACITY_RE.findall(context):
+        style = style.lower()
+        if style == "classroom":
+            classroom = classroom or int(n)
+        elif style:
+            theater = theater or int(n)
+    for style, n in _STYLE_FIRST_RE.findall(context):
+        if style.lower() == "classroom":
+            classroom = classroom or int(n)
+        else:
+            theater = theater or int(n)
+    if classroom is None and theater is None and re.search(r"seat|capacity|holds|up to|people", context, re.I):
+        plain = re.search(r"\d{1,4}", context)
+        if plain:
+            theater = int(plain.group())
+    return classroom, theater
+
+
+def extract_fields(body: str) -> Dict[str, Any]:
+    """Pull contact email, phone, parking notes and rooms out of one HTML page."""
+    out: Dict[str, Any] = {}
+    text = page_text(body)
+    prose = _prose(body)
+
+    emails = [m for m in _MAILTO_RE.findall(body or "")] + _EMAIL_RE.findall(text)
+    emails = [e for e in emails if not e.lower().endswith((".png", ".jpg", ".gif", ".svg", ".webp"))]
+    if emails:
+        out["contact_email"] = emails[0]
+
+    phone = _PHONE_RE.search(text)
+    if phone:
+        out["phone"] = "({}) {}-{}".format(*phone.groups())
+
+    for sentence in re.split(r"(?<=[.!?])\s+|\n", prose):
+        if "parking" in sentence.lower() and len(sentence.split()) >= 4:
+            out["parking_notes"] = sentence[:300]
+            break
+
+    rooms = []
+    seen = set()
+    for name, context in _ROOM_RE.findall(prose):
+        name = name.strip()
+        classroom, theater = _room_capacities(context)
+        if (classroom is None and theater is None) or name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        rooms.append(
+            {
+                "room_name": name,
+                "capacity_classroom": classroom,
+                "capacity_theater": theater,
+                "fees_hour": None,
+                "fees_day": None,
+                "deposit": None,
+                "rental_policy_url": None,
+            }
+        )
+    if rooms:
+        out["rooms"] = rooms
+    return out
+
+
+def _merge_fields(into: Dict[str, Any], found: Dict[str, Any]) -> None:
+    for k, v in found.items():
+        if k == "rooms":
+            names = {r["room_name"].lower() for r in into.get("rooms", [])}
+            into.setdefault("rooms", []).extend(r for r in v if r["room_name"].lower() not in names)
+        elif into.get(k) is None:
+            into[k] = v
+
+
+def fingerprint(body: str) -> str:
+    return hashlib.sha1((body or "").encode("utf-8", "replace")).hexdigest()
+
+
+def parse_page(body: str, url: str) -> Dict[str, Any]:
+    return {"fields": extract_fields(body), "links": interesting_links(body, url, LINK_LIMIT)}
+
+
+def interesting_links(body: str, base_url: str, limit: int) -> List[str]:
+    host = urlsplit(base_url).netloc
+    out: List[str] = []
+    for href, label in _HREF_RE.findall(body or ""):
+        url = urljoin(base_url, href.strip())
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or parts.netloc != host:
+            continue
+        hay = (href + " " + page_text(label)).lower()
+        if any(h in hay for h in LINK_HINTS) and url not in out and url != base_url:
+            out.append(url)
+        if len(out) >= limit:
+            break
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Page cache (conditional GET)
+# ---------------------------------------------------------------------------
+
+
+def _ensure_page_table() -> bool:
+    global _page_table_ready
+    if _page_table_ready:
+        return True
+    with _page_lock:
+        if not _page_table_ready:
+            try:
+                ensure_table(PageCacheEntry.__table__)
+                _page_table_ready = True
+            except Exception as e:
+                logger.warning("page cache unavailable: %s", e)
+    return _page_table_ready
+
+
+def load_page(url: str) -> Optional[PageCacheEntry]:
+    if not _ensure_page_table():
+        return None
+    try:
+        with SessionLocal() as db:
+            row = db.get(PageCacheEntry, url)
+            if row is not None:
+                db.expunge(row)
+            return row
+    except Exception as e:
+        logger.warning("page cache read failed: %s", e)
+        return None
+
+
+def store_page(
+    url: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    body: str,
+    content_hash: Optional[str] = None,
+    parsed: Optional[Dict[str, Any]] = None,
+) -> None:
+    if not _ensure_page_table():
+        return
+    try:
+        with SessionLocal() as db:
+            db.merge(
+                PageCacheEntry(
+                    url=url,
+                    etag=etag,
+                    last_modified=last_modified,
+                    body=body,
+                    content_hash=content_hash,
+                    parsed=parsed,
+                    fetched_at=time.time(),
+                )
+            )
+            db.commit()
+    except Exception as e:
+        logger.warning("page cache write failed: %s", e)
+
+
+# ---------------------------------------------------------------------------
+# Crawler
+# ---------------------------------------------------------------------------
+
+
+class _Domain:
+    """Politeness state for one host."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.sem = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+        self.delay = delay
+        self.next_at = 0.0
+
+    async def wait_turn(self) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            if self.next_at > now:
+                await asyncio.sleep(self.next_at - now)
+            self.next_at = max(now, self.next_at) + self.delay
+
+
+class Crawler:
+    """One crawl run; create per batch on the loop that will run it."""
+
+    # robots.txt answers are shared across runs
+    _robots = TTLCache(maxsize=4096, ttl=24 * 3600)
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        workers: Optional[int] = None,
+        per_domain: Optional[int] = None,
+        domain_delay: Optional[float] = None,
+        venue_budget: Optional[float] = None,
+        max_pages: Optional[int] = None,
+    ):
+        self.client = client
+        self.workers = workers or settings.crawl_workers
+        self.per_domain = per_domain or settings.crawl_per_domain
+        self.domain_delay = settings.crawl_domain_delay if domain_delay is None else domain_delay
+        self.venue_budget = venue_budget or settings.crawl_venue_budget
+        self.max_pages = max_pages or settings.crawl_max_pages
+        self.user_agent = settings.crawl_user_agent
+        self._domains: Dict[str, _Domain] = {}
+        self.stats = {
+            "fetched": 0,
+            "not_modified": 0,
+            "parsed": 0,
+            "parse_skipped": 0,
+            "robots_blocked": 0,
+            "timeouts": 0,
+            "errors": 0,
+        }
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        headers = dict(headers or {}, **{"User-Agent": self.user_agent})
+        return await httpclient.aget(url, client=self.client, headers=headers, follow_redirects=True, op="crawl")
+
+    async def _robots_for(self, url: str) -> Optional[urllib.robotparser.RobotFileParser]:
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        rp = self._robots.get(key)
+        if rp is not MISSING:
+            return rp
+        rp = None
+        try:
+            r = await self._get(f"{key}/robots.txt")
+            if r.status_code == 200:
+                rp = urllib.robotparser.RobotFileParser()
+                rp.parse(r.text.splitlines())
+            elif r.status_code in (401, 403):
+                rp = urllib.robotparser.RobotFileParser()
+                rp.disallow_all = True
+        except Exception:
+            rp = None  # unreachable robots.txt: treat as allow-all
+        self._robots.set(key, rp)
+        return rp
+
+    def _domain(self, host: str, delay: float) -> _Domain:
+        d = self._domains.get(host)
+        if d is None:
+            d = self._domains[host] = _Domain(self.per_domain, delay)
+        return d
+
+    def _reuse(self, cached: PageCacheEntry, url: str) -> Tuple[str, Dict[str, Any]]:
+        if cached.content_hash and cached.parsed is not None:
+            self.stats["parse_skipped"] += 1
+            return cached.content_hash, cached.parsed
+        # row written before pages were fingerprinted
+        self.stats["parsed"] += 1
+        return fingerprint(cached.body), parse_page(cached.body, url)
+
+    async def fetch(self, url: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Polite, robots-aware, conditional GET. Returns (content_hash, parsed)
+        where parsed holds the page's extracted fields and candidate links;
+        unchanged pages reuse the stored parse.
+        """
+        rp = await self._robots_for(url)
+        if rp is not None and not rp.can_fetch(self.user_agent, url):
+            self.stats["robots_blocked"] += 1
+            return None
+        delay = self.domain_delay
+        if rp is not None and rp.crawl_delay(self.user_agent):
+            delay = max(delay, float(rp.crawl_delay(self.user_agent)))
+
+        cached = await asyncio.to_thread(load_page, url)
+        headers: Dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        domain = self._domain(urlsplit(url).netloc, delay)
+        async with domain.sem:
+            await domain.wait_turn()
+            try:
+                r = await self._get(url, headers)
+            except Exception:
+                self.stats["errors"] += 1
+                return self._reuse(cached, url) if cached is not None else None
+
+        if r.status_code == 304 and cached is not None:
+            self.stats["not_modified"] += 1
+            page = self._reuse(cached, url)
+            if cached.parsed is None:
+                await asyncio.to_thread(
+                    store_page, url, cached.etag, cached.last_modified, cached.body, page[0], page[1]
+                )
+            return page
+        if r.status_code != 200 or "html" not in r.headers.get("content-type", "html"):
+            self.stats["errors"] += 1
+            return None
+        self.stats["fetched"] += 1
+        body = r.text
+        content_hash = fingerprint(body)
+        if cached is not None and cached.content_hash == content_hash and cached.parsed is not None:
+            # server ignored the validators but the content is the same
+            self.stats["parse_skipped"] += 1
+            parsed = cached.parsed
+        else:
+            self.stats["parsed"] += 1
+            parsed = parse_page(body, url)
+        await asyncio.to_thread(
+            store_page, url, r.headers.get("etag"), r.headers.get("last-modified"), body, content_hash, parsed
+        )
+        return content_hash, parsed
+
+    async def _crawl_venue(self, url: str, found: Dict[str, Any], pages: List[Tuple[str, str]]) -> None:
+        home = await self.fetch(url)
+        if home is None:
+            return
+        pages.append((url, home[0]))
+        _merge_fields(found, home[1]["fields"])
+        for link in home[1]["links"][: self.max_pages - 1]:
+            page = await self.fetch(link)
+            if page is not None:
+                pages.append((link, page[0]))
+                _merge_fields(found, page[1]["fields"])
+
+    async def crawl_venue(self, url: str) -> Dict[str, Any]:
+        """
+        Extracted fields for one site, cut off after the venue budget. A
+        crawl that finished also carries content_hash, a fingerprint of every
+        page visited; partial crawls leave it out.
+        """
+        found: Dict[str, Any] = {}
+        pages: List[Tuple[str, str]] = []
+        try:
+            await asyncio.wait_for(self._crawl_venue(url, found, pages), self.venue_budget)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            return found
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("crawl of %s failed: %s", url, e)
+            return found
+        if pages:
+            found["content_hash"] = fingerprint("\n".join(f"{u} {h}" for u, h in sorted(pages)))
+        return found
+
+    async def crawl_many(self, urls: List[Optional[str]]) -> List[Dict[str, Any]]:
+        """Crawl every url (None entries are skipped) with at most `workers` venues at once."""
+        results: List[Dict[str, Any]] = [{} for _ in urls]
+        pending: "asyncio.Queue[int]" = asyncio.Queue()
+        for i, url in enumerate(urls):
+            if url:
+                pending.put_nowait(i)
+
+        async def _worker() -> None:
+            while True:
+                try:
+                    i = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[i] = await self.crawl_venue(urls[i])  # type: ignore[arg-type]
+
+        await asyncio.gather(*(_worker() for _ in range(min(self.workers, pending.qsize()))))
+        return results
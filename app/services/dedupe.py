@@ -0,0 +1,178 @@
+"""
+Fuzzy near-duplicate detection for merged venue candidates.
+
+Three parts, all linear-ish in the number of candidates:
+
+1. Blocking: each candidate is filed under (grid cell, name token) keys, so
+   only candidates that are close together *and* share a distinctive word
+   are ever compared.
+2. Scoring: weighted token Jaccard on normalized names (abbreviations
+   expanded, filler words dropped), gated by a distance limit.
+3. Clustering: union-find over every matched pair, across all providers.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.geo import grid_cell, haversine_miles, neighbor_cells
+
+BLOCK_CELL_MILES = 0.1     # ~160 m blocking cells
+MAX_DISTANCE_MILES = 0.1   # never merge venues farther apart than this
+MIN_SIMILARITY = 0.8
+
+ABBREVIATIONS = {
+    "co": "county", "cnty": "county", "pub": "public", "lib": "library",
+    "libr": "library", "ctr": "center", "cntr": "center", "centre": "center",
+    "comm": "community", "cmty": "community", "coll": "college",
+    "univ": "university", "mem": "memorial", "twp": "township",
+    "hts": "heights", "mt": "mount", "ft": "fort", "intl": "international",
+}
+STOPWORDS = {"the", "of", "and", "at", "inc", "llc", "corp", "public"}
+# Common venue words: they count for less in similarity and are only used
+# for blocking when a name has nothing more distinctive.
+GENERIC_TOKENS = {
+    "library", "center", "community", "county", "college", "school", "church",
+    "hall", "branch", "senior", "technical", "university", "city", "regional",
+    "memorial", "building", "room",
+}
+GENERIC_WEIGHT = 0.5
+
+
+def name_tokens(name: Optional[str]) -> Tuple[str, ...]:
+    s = (name or "").lower().replace("&", " and ")
+    s = re.sub(r"[^a-z0-9 ]+", " ", s)
+    out = []
+    for tok in s.split():
+        tok = ABBREVIATIONS.get(tok, tok)
+        if tok not in STOPWORDS and tok not in out:
+            out.append(tok)
+    return tuple(out)
+
+
+def _weight(tok: str) -> float:
+    return GENERIC_WEIGHT if tok in GENERIC_TOKENS else 1.0
+
+
+def similarity(a: Sequence[str], b: Sequence[str]) -> float:
+    """Weighted Jaccard of two token sets (generic words count half)."""
+    sa, sb = set(a), set(b)
+    if not sa or not sb:
+        return 0.0
+    inter = sum(_weight(t) for t in sa & sb)
+    union = sum(_weight(t) for t in sa | sb)
+    return inter / union
+
+
+def _blocking_tokens(tokens: Sequence[str]) -> List[str]:
+    distinctive = [t for t in tokens if t not in GENERIC_TOKENS]
+    return distinctive or list(tokens)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # keep the lower index as root so the earliest record is canonical
+            if rj < ri:
+                ri, rj = rj, ri
+            self.parent[rj] = ri
+
+
+def find_clusters(records: Sequence[dict]) -> Tuple[List[List[int]], Dict[int, float]]:
+    """
+    Group near-duplicate records.
+
+    Returns (clusters, scores): clusters are lists of record indices in
+    input order (singletons included); scores maps each record that joined
+    an earlier one to the lowest similarity it was matched with.
+    """
+    uf = _UnionFind(len(records))
+    blocks: Dict[Tuple[str, int, int], List[int]] = {}
+    tokens: List[Tuple[str, ...]] = []
+    scores: Dict[int, float] = {}
+    by_place_id: Dict[str, int] = {}
+
+    for i, r in enumerate(records):
+        toks = name_tokens(r.get("name"))
+        tokens.append(toks)
+
+        pid = r.get("place_id")
+        if pid:
+            j = by_place_id.setdefault(pid, i)
+            if j != i:
+                uf.union(j, i)
+                scores[i] = 1.0
+
+        lat, lng = r.get("lat"), r.get("lng")
+        if lat is None or lng is None or not toks:
+            continue
+
+        block_toks = _blocking_tokens(toks)
+        seen = set()
+        for row, col in neighbor_cells(lat, lng, MAX_DISTANCE_MILES, BLOCK_CELL_MILES):
+            for tok in block_toks:
+                for j in blocks.get((tok, row, col), ()):
+                    if j in seen:
+                        continue
+                    seen.add(j)
+                    if uf.find(j) == uf.find(i):
+                        continue
+                    other = records[j]
+                    if haversine_miles(lat, lng, other["lat"], other["lng"]) > MAX_DISTANCE_MILES:
+                        continue
+                    sim = similarity(toks, tokens[j])
+                    if sim >= MIN_SIMILARITY:
+                        uf.union(j, i)
+                        scores[i] = min(sim, scores.get(i, 1.0))
+
+        row, col = grid_cell(lat, lng, BLOCK_CELL_MILES)
+        for tok in block_toks:
+            blocks.setdefault((tok, row, col), []).append(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(records)):
+        groups.setdefault(uf.find(i), []).append(i)
+    return list(groups.values()), scores
+
+
+def dedupe(
+    records: Sequence[dict], merge_fn: Callable[[dict, dict], dict]
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Collapse near-duplicates with `merge_fn(kept, other)`, folding each
+    cluster into its earliest record.
+
+    Returns (records, report); the report lists every multi-record cluster
+    as {"kept": ..., "merged": [...], "similarity": lowest pair score}.
+    """
+    clusters, scores = find_clusters(records)
+    out: List[dict] = []
+    report: List[dict] = []
+    for members in clusters:
+        kept = records[members[0]]
+        for j in members[1:]:
+            kept = merge_fn(kept, records[j])
+        out.append(kept)
+        if len(members) > 1:
+            pair_scores = [scores[j] for j in members if j in scores]
+            report.append(
+                {
+                    "kept": _label(records[members[0]]),
+                    "merged": [_label(records[j]) for j in members[1:]],
+                    "similarity": round(min(pair_scores), 3) if pair_scores else None,
+                }
+            )
+    return out, report
+
+
+def _label(r: dict) -> dict:
+    return {k: r.get(k) for k in ("name", "address", "place_id", "yelp_id", "source") if r.get(k) is not None}
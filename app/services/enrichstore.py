@@ -0,0 +1,147 @@
+"""
+Stored website enrichment, kept on the Venue/Room rows.
+
+Every crawled venue is saved with the content_hash the crawler computed
+over the pages it visited and the time it was last checked (enriched_at).
+extract.enrich_many() uses that to
+
+- reuse the stored fields outright while they are younger than ENRICH_TTL,
+- only bump enriched_at when a re-crawl finds the same content_hash,
+- rewrite the venue and its rooms only when the content changed.
+
+Venues are matched on merge.merge_key(), the same key venuestore upserts on.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import selectinload
+
+from app.db.deps import SessionLocal, ensure_table
+from app.db.models import Room, Venue
+from app.services.merge import merge_key
+
+logger = logging.getLogger(__name__)
+
+# candidate keys copied onto a new/updated Venue row
+IDENTITY_FIELDS = ["place_id", "name", "category", "address", "city", "state", "zip", "lat", "lng", "website_url", "booking_url"]
+CRAWLED_FIELDS = ["contact_email", "phone", "parking_notes"]
+ROOM_FIELDS = ["room_name", "capacity_classroom", "capacity_theater", "fees_hour", "fees_day", "deposit", "rental_policy_url"]
+CHUNK = 500
+
+_counters: Dict[str, int] = {"fresh": 0, "unchanged": 0, "changed": 0}
+_lock = threading.Lock()
+_tables_ready = False
+
+
+def _ensure_tables() -> bool:
+    global _tables_ready
+    if _tables_ready:
+        return True
+    with _lock:
+        if not _tables_ready:
+            try:
+                ensure_table(Venue.__table__)
+                ensure_table(Room.__table__)
+                _tables_ready = True
+            except Exception as e:
+                logger.warning("tables unavailable: %s", e)
+    return _tables_ready
+
+
+def count(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] += n
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def _chunks(items: List[Any]) -> Iterable[List[Any]]:
+    for i in range(0, len(items), CHUNK):
+        yield items[i : i + CHUNK]
+
+
+def _find_rows(db, venues: List[dict]) -> List[Optional[Venue]]:
+    keys = [merge_key(v) for v in venues]
+    rows: Dict[str, Venue] = {}
+    for key_chunk in _chunks(sorted(set(keys))):
+        for row in db.query(Venue).options(selectinload(Venue.rooms)).filter(Venue.merge_key.in_(key_chunk)):
+            rows[row.merge_key] = row
+    return [rows.get(k) for k in keys]
+
+
+def _stored(row: Venue) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {k: getattr(row, k) for k in CRAWLED_FIELDS}
+    if row.rooms:
+        fields["rooms"] = [{k: getattr(r, k) for k in ROOM_FIELDS} for r in row.rooms]
+    return {
+        "id": row.id,
+        "website_url": row.website_url,
+        "content_hash": row.content_hash,
+        "enriched_at": row.enriched_at,
+        "fields": fields,
+    }
+
+
+def load(venues: List[dict]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Stored enrichment for each venue (None when never crawled): id,
+    website_url, content_hash, enriched_at and the crawled fields.
+    """
+    if not venues or not _ensure_tables():
+        return [None] * len(venues)
+    try:
+        with SessionLocal() as db:
+            return [_stored(row) if row is not None and row.content_hash else None for row in _find_rows(db, venues)]
+    except Exception as e:
+        logger.warning("read failed: %s", e)
+        return [None] * len(venues)
+
+
+def touch(ids: List[int], when: Optional[float] = None) -> None:
+    """Mark venues as re-checked without rewriting them."""
+    if not ids or not _ensure_tables():
+        return
+    when = time.time() if when is None else when
+    try:
+        with SessionLocal() as db:
+            for id_chunk in _chunks(sorted(ids)):
+                db.execute(update(Venue).where(Venue.id.in_(id_chunk)).values(enriched_at=when))
+            db.commit()
+        count("unchanged", len(ids))
+    except Exception as e:
+        logger.warning("touch failed: %s", e)
+
+
+def save(entries: List[Tuple[dict, Dict[str, Any]]], when: Optional[float] = None) -> None:
+    """Upsert (venue, crawler output) pairs; rooms are replaced by the crawled ones."""
+    if not entries or not _ensure_tables():
+        return
+    when = time.time() if when is None else when
+    try:
+        with SessionLocal() as db:
+            rows = _find_rows(db, [v for v, _ in entries])
+            added: Dict[str, Venue] = {}
+            for (v, found), row in zip(entries, rows):
+                key = merge_key(v)
+                row = row or added.get(key)
+                if row is None:
+                    row = added[key] = Venue(name=v.get("name") or v.get("website_url") or "", merge_key=key)
+                    db.add(row)
+                for k in IDENTITY_FIELDS:
+                    if v.get(k) is not None:
+                        setattr(row, k, v[k])
+                for k in CRAWLED_FIELDS:
+                    setattr(row, k, found.get(k))
+                row.rooms = [Room(**{k: r.get(k) for k in ROOM_FIELDS}) for r in found.get("rooms", [])]
+                row.content_hash = found.get("content_hash")
+                row.enriched_at = when
+            db.commit()
+        count("changed", len(entries))
+    except Exception as e:
+        logger.warning("write failed: %s", e)
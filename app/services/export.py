@@ -0,0 +1,271 @@
+"""
+Ranked-venue exports: CSV, XLSX and (optionally) Parquet.
+
+Rows follow the header of exports/venues_ranked.csv: one row per room, or
+one row for a venue without rooms, numbered by the venue's rank. Every
+writer consumes an iterable of venues row by row, so a 100k-row ranking
+never becomes a DataFrame or a list of rows:
+
+- CSV is produced as text chunks and can be streamed straight to a client.
+- XLSX uses openpyxl's write-only workbook. Parquet is written in row
+  groups with pyarrow, which is imported lazily and is optional. Both
+  formats keep their index at the end of the file, so for HTTP they are
+  written to a spooled temp file and streamed from there.
+"""
+import csv
+import io
+import os
+import tempfile
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from app.services.scoring import AMENITY_KEYS
+
+# header of exports/venues_ranked.csv, with the type each column is written as
+COLUMN_TYPES: List[Tuple[str, str]] = [
+    ("rank", "int"),
+    ("venue_name", "str"),
+    ("category", "str"),
+    ("educationality", "float"),
+    ("address", "str"),
+    ("city", "str"),
+    ("state", "str"),
+    ("zip", "str"),
+    ("distance_miles", "float"),
+    ("website_url", "str"),
+    ("booking_url", "str"),
+    ("phone", "str"),
+    ("contact_name", "str"),
+    ("contact_email", "str"),
+    ("room_name", "str"),
+    ("capacity_classroom", "int"),
+    ("capacity_theater", "int"),
+    ("fees_hour", "float"),
+    ("fees_day", "float"),
+    ("deposit", "float"),
+    ("rental_policy_url", "str"),
+    ("availability_status", "str"),
+    ("availability_source", "str"),
+    ("amenities_projector", "bool"),
+    ("amenities_screen_tv", "bool"),
+    ("amenities_wifi", "bool"),
+    ("amenities_tables_chairs", "bool"),
+    ("parking_notes", "str"),
+    ("disclosure_needed", "bool"),
+    ("image_allowed", "bool"),
+    ("score_total", "float"),
+    ("reason_text", "str"),
+]
+EXPORT_COLUMNS = [name for name, _ in COLUMN_TYPES]
+ROOM_COLUMNS = ["room_name", "capacity_classroom", "capacity_theater", "fees_hour", "fees_day", "deposit", "rental_policy_url"]
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+CSV_CHUNK_ROWS = 1000
+PARQUET_ROW_GROUP = 10_000
+SPOOL_BYTES = 8 * 1024 * 1024
+READ_CHUNK = 64 * 1024
+
+
+class ExportUnavailable(RuntimeError):
+    """The requested format needs an optional dependency that is missing."""
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Rows
+# ---------------------------------------------------------------------------
+
+
+def _venue_fields(rank: int, v: Dict[str, Any]) -> Dict[str, Any]:
+    amenities = v.get("amenities") or {}
+    row = {
+        "rank": rank,
+        "venue_name": v.get("name") or v.get("venue_name"),
+        "score_total": v.get("score_total", v.get("score")),
+        "reason_text": v.get("reason_text", v.get("score_reason")),
+    }
+    for k in AMENITY_KEYS:
+        row[f"amenities_{k}"] = amenities.get(k)
+    for name in EXPORT_COLUMNS:
+        if name not in row:
+            row[name] = v.get(name)
+    return row
+
+
+def iter_rows(venues: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Export rows for venues already in rank order (one per room)."""
+    for rank, v in enumerate(venues, start=1):
+        base = _venue_fields(rank, v)
+        rooms = v.get("rooms") or []
+        if not rooms:
+            yield base
+            continue
+        for room in rooms:
+            row = dict(base)
+            for k in ROOM_COLUMNS:
+                row[k] = room.get(k)
+            yield row
+
+
+def _cell(value: Any) -> Any:
+    # nested values (lists, dicts) would not fit a spreadsheet cell as-is
+    if isinstance(value, (list, dict, tuple, set)):
+        return str(value)
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+
+def iter_csv(venues: Iterable[Dict[str, Any]], chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    """CSV text in chunks of `chunk_rows` rows, header first."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    for row in iter_rows(venues):
+        writer.writerow([_cell(row[c]) for c in EXPORT_COLUMNS])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def write_csv(venues: Iterable[Dict[str, Any]], out: io.TextIOBase) -> None:
+    for chunk in iter_csv(venues):
+        out.write(chunk)
+
+
+def write_xlsx(venues: Iterable[Dict[str, Any]], out: BinaryIO) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(EXPORT_COLUMNS)
+    for row in iter_rows(venues):
+        ws.append([_cell(row[c]) for c in EXPORT_COLUMNS])
+    wb.save(out)
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "bool": pa.bool_()}
+    return pa.schema([(name, types[kind]) for name, kind in COLUMN_TYPES])
+
+
+def _coerce(kind: str, value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    try:
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        if kind == "bool":
+            return bool(value)
+    except (TypeError, ValueError):
+        return None
+    return str(_cell(value))
+
+
+def write_parquet(venues: Iterable[Dict[str, Any]], out: BinaryIO, row_group: int = PARQUET_ROW_GROUP) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportUnavailable("parquet export needs pyarrow (pip install pyarrow)") from e
+
+    schema = _arrow_schema()
+    with pq.ParquetWriter(out, schema) as writer:
+        columns: Dict[str, List[Any]] = {name: [] for name in EXPORT_COLUMNS}
+        pending = groups = 0
+        for row in iter_rows(venues):
+            for name, kind in COLUMN_TYPES:
+                columns[name].append(_coerce(kind, row[name]))
+            pending += 1
+            if pending >= row_group:
+                writer.write_table(pa.table(columns, schema=schema))
+                columns = {name: [] for name in EXPORT_COLUMNS}
+                pending = 0
+                groups += 1
+        if pending or not groups:
+            writer.write_table(pa.table(columns, schema=schema))
+
+
+def write(fmt: str, venues: Iterable[Dict[str, Any]], path: str) -> str:
+    """
+    Write `venues` to `path` in `fmt`; returns the path. The file is built
+    next to `path` and renamed into place, so readers never see half of it.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.part"
+    try:
+        if fmt == "csv":
+            with open(tmp, "w", newline="", encoding="utf-8") as fh:
+                write_csv(venues, fh)
+        else:
+            with open(tmp, "wb") as fh:
+                (write_xlsx if fmt == "xlsx" else write_parquet)(venues, fh)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def stream(fmt: str, venues: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Export bytes for an HTTP response. CSV is produced as it goes; XLSX and
+    Parquet are built in a spooled temp file first (memory up to
+    SPOOL_BYTES, then disk) and read back in chunks.
+    """
+    if fmt == "csv":
+        for chunk in iter_csv(venues):
+            yield chunk.encode("utf-8")
+        return
+    if fmt == "parquet" and not parquet_available():
+        raise ExportUnavailable("parquet export needs pyarrow (pip install pyarrow)")
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}")
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as tmp:
+        if fmt == "xlsx":
+            write_xlsx(venues, tmp)
+        else:
+            write_parquet(venues, tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(READ_CHUNK)
+            if not chunk:
+                break
+            yield chunk
+
+
+def filename(fmt: str, stem: str = "venues_ranked") -> str:
+    return f"{stem}.{FORMATS[fmt][1]}"
+
+
+def media_type(fmt: str) -> str:
+    return FORMATS[fmt][0]
+
+
+def default_formats() -> List[str]:
+    return ["csv", "xlsx"] + (["parquet"] if parquet_available() else [])
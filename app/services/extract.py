@@ -1,15 +1,99 @@
-# Stub enrichment that would normally use Playwright to crawl the venue website
-# For MVP we just pass through and ensure fields exist.
+# Enrichment: crawl each venue's website (app.services.crawler) when it has one,
+# then make sure every field the scorer and exports expect exists. Results are
+# persisted (app.services.enrichstore) so repeat runs only redo changed sites.
+
+import time
+from typing import List, Optional
+
+from app.services import crawler, enrichstore, httpclient
+from app.settings import settings
+
+CRAWLED_FIELDS = enrichstore.CRAWLED_FIELDS
+# what enrich() sets when a venue lacks it (rooms get default_rooms())
+DEFAULTS = {
+    "contact_name": None,
+    "contact_email": None,
+    "parking_notes": None,
+    "disclosure_needed": False,
+    "image_allowed": True,
+}
+
+
+def default_rooms() -> List[dict]:
+    return [
+        {"room_name": "Main Meeting Room", "capacity_classroom": 24, "capacity_theater": 40, "fees_hour": 50.0, "fees_day": 300.0, "deposit": 0.0, "rental_policy_url": None}
+    ]
+
 
 def enrich(v: dict) -> dict:
-    v.setdefault("contact_name", None)
-    v.setdefault("contact_email", None)
-    v.setdefault("parking_notes", None)
-    v.setdefault("disclosure_needed", False)
-    v.setdefault("image_allowed", True)
+    for k, default in DEFAULTS.items():
+        v.setdefault(k, default)
     # Add sample room info if missing
     if "rooms" not in v:
-        v["rooms"] = [
-            {"room_name": "Main Meeting Room", "capacity_classroom": 24, "capacity_theater": 40, "fees_hour": 50.0, "fees_day": 300.0, "deposit": 0.0, "rental_policy_url": None}
-        ]
+        v["rooms"] = default_rooms()
     return v
+
+
+def apply_crawl(v: dict, found: dict) -> dict:
+    """Fill blanks in `v` from crawler output; never overwrite provider data."""
+    for k in CRAWLED_FIELDS:
+        if not v.get(k) and found.get(k):
+            v[k] = found[k]
+    if found.get("rooms") and not v.get("rooms"):
+        v["rooms"] = found["rooms"]
+    return v
+
+
+def enrich_many(venues: List[dict], refresh: bool = False, crawl: Optional[crawler.Crawler] = None) -> List[dict]:
+    """
+    Enrich a batch in place: venues with a website_url are crawled
+    concurrently (see app.services.crawler), then defaults are applied.
+
+    Stored enrichment younger than ENRICH_TTL is reused without crawling
+    (unless `refresh`). Older venues are re-crawled with conditional GETs;
+    when the pages' content_hash is unchanged only enriched_at is bumped,
+    otherwise the venue and its rooms are rewritten.
+    """
+    crawl_venues(venues, refresh=refresh, crawl=crawl)
+    return [enrich(v) for v in venues]
+
+
+def crawl_venues(venues: List[dict], refresh: bool = False, crawl: Optional[crawler.Crawler] = None) -> None:
+    """The crawl half of enrich_many(): fill venues in place, no defaults."""
+    urls = [v.get("website_url") for v in venues]
+    if settings.crawl_enabled and any(urls):
+        stored = enrichstore.load(venues)
+        now = time.time()
+        todo: List[Optional[str]] = [None] * len(venues)
+        fresh = 0
+        for i, (url, s) in enumerate(zip(urls, stored)):
+            if not url:
+                continue
+            if (
+                not refresh
+                and s is not None
+                and s["website_url"] == url
+                and now - (s["enriched_at"] or 0) < settings.enrich_ttl
+            ):
+                apply_crawl(venues[i], s["fields"])
+                fresh += 1
+            else:
+                todo[i] = url
+        enrichstore.count("fresh", fresh)
+
+        if any(todo):
+            found = httpclient.run((crawl or crawler.Crawler()).crawl_many(todo))
+            unchanged, changed = [], []
+            for i, f in enumerate(found):
+                if not todo[i]:
+                    continue
+                apply_crawl(venues[i], f)
+                s = stored[i]
+                if not f.get("content_hash"):
+                    continue  # partial crawl: keep what is stored
+                if s is not None and s["content_hash"] == f["content_hash"] and s["website_url"] == todo[i]:
+                    unchanged.append(s["id"])
+                else:
+                    changed.append((venues[i], f))
+            enrichstore.touch(unchanged)
+            enrichstore.save(changed)
@@ -0,0 +1,77 @@
+"""
+Fast JSON for ranking responses.
+
+- dumps() encodes with orjson when it is installed and falls back to the
+  standard library (compact separators) otherwise, or for values orjson
+  rejects such as integers beyond 64 bits. Candidate records become
+  plain dicts here, at the boundary.
+- FastJSONResponse renders with dumps(). Endpoints that return it directly
+  also skip FastAPI's jsonable_encoder pass over every venue dict.
+- project() keeps only the venue fields a client asks for (?fields=...),
+  so a table view does not receive raw `types`, `rooms` or crawl output.
+"""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+
+from app.services.candidate import to_plain
+from app.services.paging import SORT_KEYS
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+# named field sets for ?fields=; "table" is what the /ui results table renders
+FIELD_SETS: Dict[str, Tuple[str, ...]] = {
+    "table": tuple(k for k in SORT_KEYS if k != "index"),
+}
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def available() -> bool:
+    return orjson is not None
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=to_plain, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+    return json.dumps(value, default=to_plain, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """'name,score' or a FIELD_SETS name ('table') -> field names; None/'' -> every field."""
+    if not raw:
+        return None
+    fields: List[str] = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        for f in FIELD_SETS.get(part, (part,)):
+            if f not in fields:
+                fields.append(f)
+    return tuple(fields) or None
+
+
+def project_one(venue: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return venue
+    return {f: venue[f] for f in fields if f in venue}
+
+
+def project(venues: List[Dict[str, Any]], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    """New dicts with only `fields` (absent ones are left out); the input is not touched."""
+    if fields is None:
+        return venues
+    return [{f: v[f] for f in fields if f in v} for v in venues]
@@ -1,24 +1,17 @@
-import math, os, requests
+import asyncio, math, os
+from typing import Optional
 
-GOOGLE_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+import httpx
+import numpy as np
 
-def geocode(target: str):
-    """
-    Return {'lat': float, 'lng': float, 'locality': str | None, 'postal_code': str | None}
-    Uses Google PLACES Text Search instead of the Geocoding API so we only need one API enabled.
-    """
-    if not GOOGLE_KEY or not target:
-        return None
+from app.services import geocache, quota, replay
 
-    # Use Places Text Search to find a central point for the city or ZIP
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    try:
-        r = requests.get(url, params={"query": target, "key": GOOGLE_KEY}, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-    except Exception:
-        return None
+GOOGLE_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+TEXTSEARCH_URL = os.getenv(
+    "GOOGLE_PLACES_URL", "https://maps.googleapis.com/maps/api/place/textsearch/json"
+)
 
+def _anchor_from_response(data: dict):
     results = data.get("results") or []
     if not results:
         return None
@@ -38,6 +31,58 @@ def geocode(target: str):
         "postal_code": None,
     }
 
+def _cacheable(data: dict, anchor) -> bool:
+    # "no match" only when Google says so; REQUEST_DENIED, INVALID_REQUEST
+    # and UNKNOWN_ERROR (a bad key, a hiccup) must not be remembered
+    return anchor is not None or data.get("status") == "ZERO_RESULTS"
+
+def geocode(target: str, budget: Optional[quota.Budget] = None):
+    """
+    Return {'lat': float, 'lng': float, 'locality': str | None, 'postal_code': str | None}
+    Uses Google PLACES Text Search instead of the Geocoding API so we only need one API enabled.
+    Answers (including a ZERO_RESULTS "no match") are served from geocache when fresh; a
+    live lookup goes through the Places quota (app.services.quota) and
+    draws on `budget` when given.
+    """
+    if not (GOOGLE_KEY or replay.offline()) or not target:
+        return None
+
+    hit, anchor = geocache.get(target)
+    if hit:
+        return anchor
+
+    # Use Places Text Search to find a central point for the city or ZIP
+    data = quota.get_json(TEXTSEARCH_URL, {"query": target, "key": GOOGLE_KEY}, budget=budget, op="geocode")
+    if data is None:
+        return None
+
+    anchor = _anchor_from_response(data)
+    if _cacheable(data, anchor):
+        geocache.put(target, anchor)
+    return anchor
+
+async def geocode_async(
+    target: str, client: Optional[httpx.AsyncClient] = None, budget: Optional[quota.Budget] = None
+):
+    """Async twin of geocode() for the concurrent discovery engine."""
+    if not (GOOGLE_KEY or replay.offline()) or not target:
+        return None
+
+    hit, anchor = await asyncio.to_thread(geocache.get, target)
+    if hit:
+        return anchor
+
+    data = await quota.aget_json(
+        TEXTSEARCH_URL, {"query": target, "key": GOOGLE_KEY}, client=client, budget=budget, op="geocode"
+    )
+    if data is None:
+        return None
+
+    anchor = _anchor_from_response(data)
+    if _cacheable(data, anchor):
+        await asyncio.to_thread(geocache.put, target, anchor)
+    return anchor
+
 def haversine_miles(lat1, lon1, lat2, lon2):
     R = 3958.7613
     p = math.pi / 180.0
@@ -47,3 +92,160 @@ def haversine_miles(lat1, lon1, lat2, lon2):
     )
     return 2 * R * math.asin(math.sqrt(a))
 
+# ---------------------------------------------------------------------------
+# Spatial indexing
+# ---------------------------------------------------------------------------
+
+EARTH_RADIUS_MILES = 3958.7613
+MILES_PER_DEG_LAT = 2 * math.pi * EARTH_RADIUS_MILES / 360.0
+
+
+def haversine_miles_np(lat1, lon1, lat2, lon2):
+    """Vectorized haversine_miles(); arguments broadcast like NumPy arrays."""
+    p = math.pi / 180.0
+    lat1, lon1, lat2, lon2 = (np.asarray(x, dtype=float) for x in (lat1, lon1, lat2, lon2))
+    a = (
+        0.5 - np.cos((lat2 - lat1) * p) / 2
+        + np.cos(lat1 * p) * np.cos(lat2 * p) * (1 - np.cos((lon2 - lon1) * p)) / 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _anchor_arrays(anchors):
+    if not anchors:
+        return np.empty(0), np.empty(0)
+    if isinstance(anchors[0], dict):
+        return (
+            np.array([a["lat"] for a in anchors], dtype=float),
+            np.array([a["lng"] for a in anchors], dtype=float),
+        )
+    arr = np.asarray(anchors, dtype=float).reshape(-1, 2)
+    return arr[:, 0], arr[:, 1]
+
+
+def nearest_anchor(lats, lngs, anchors):
+    """
+    Distance (miles) from each point to its nearest anchor, and that
+    anchor's index, in one (points x anchors) pass. Anchors are dicts with
+    lat/lng or (lat, lng) pairs. Points without coordinates (NaN) get NaN
+    distance and index -1.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    a_lat, a_lng = _anchor_arrays(anchors)
+    if not len(a_lat) or not len(lats):
+        return np.full(lats.shape, np.nan), np.full(lats.shape, -1, dtype=np.int64)
+    d = haversine_miles_np(lats[:, None], lngs[:, None], a_lat[None, :], a_lng[None, :])
+    missing = np.isnan(d).all(axis=1)
+    idx = np.where(missing, -1, np.argmin(np.nan_to_num(d, nan=np.inf), axis=1))
+    dist = np.where(missing, np.nan, d[np.arange(len(lats)), np.maximum(idx, 0)])
+    return dist, idx
+
+
+def within_radius(lats, lngs, anchors, miles):
+    """Boolean mask: point lies within `miles` of at least one anchor."""
+    dist, _ = nearest_anchor(lats, lngs, anchors)
+    return np.nan_to_num(dist, nan=np.inf) <= miles
+
+
+def bounding_box(lat, lng, miles):
+    """
+    (min_lat, max_lat, min_lng, max_lng) containing every point within
+    `miles` of (lat, lng); the longitude span uses the pole-ward edge so
+    it never undershoots. Use as an index prefilter before haversine.
+    """
+    dlat = miles / MILES_PER_DEG_LAT
+    edge = min(abs(lat) + dlat, 89.0)
+    dlng = miles / (MILES_PER_DEG_LAT * max(math.cos(math.radians(edge)), 1e-6))
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def grid_cell(lat, lng, cell_miles):
+    """
+    (row, col) of the equal-area-ish grid cell holding a point. Rows are
+    `cell_miles` tall; each row's columns are widened by 1/cos(latitude) so
+    a cell is roughly cell_miles across everywhere.
+    """
+    dlat = cell_miles / MILES_PER_DEG_LAT
+    row = math.floor(lat / dlat)
+    return row, math.floor(lng / _row_dlng(row, dlat, cell_miles))
+
+
+def _row_dlng(row, dlat, cell_miles):
+    # use the row edge closest to the pole so cells never shrink below cell_miles
+    edge = max(abs(row * dlat), abs((row + 1) * dlat))
+    return cell_miles / (MILES_PER_DEG_LAT * max(math.cos(math.radians(min(edge, 89.0))), 1e-6))
+
+
+def neighbor_cells(lat, lng, miles, cell_miles):
+    """Every grid cell that may contain a point within `miles` of (lat, lng)."""
+    dlat = cell_miles / MILES_PER_DEG_LAT
+    span = miles / MILES_PER_DEG_LAT
+    for row in range(math.floor((lat - span) / dlat), math.floor((lat + span) / dlat) + 1):
+        dlng = _row_dlng(row, dlat, cell_miles)
+        lng_span = dlng * miles / cell_miles
+        for col in range(math.floor((lng - lng_span) / dlng), math.floor((lng + lng_span) / dlng) + 1):
+            yield row, col
+
+
+class GridIndex:
+    """
+    Fixed-grid spatial index over many points.
+
+    Radius queries only visit the cells overlapping the search circle and
+    then run one vectorized haversine pass over the points found there, so
+    cost grows with the local density rather than with the catalog size.
+    """
+
+    def __init__(self, lats, lngs, cell_miles: float = 1.0):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lngs = np.asarray(lngs, dtype=float)
+        self.cell_miles = cell_miles
+        # Cell ids for every point at once, then group indices by cell
+        valid = np.nonzero(~(np.isnan(self.lats) | np.isnan(self.lngs)))[0]
+        dlat = cell_miles / MILES_PER_DEG_LAT
+        rows = np.floor(self.lats[valid] / dlat).astype(np.int64)
+        edge = np.maximum(np.abs(rows * dlat), np.abs((rows + 1) * dlat))
+        dlng = cell_miles / (MILES_PER_DEG_LAT * np.maximum(np.cos(np.radians(np.minimum(edge, 89.0))), 1e-6))
+        cols = np.floor(self.lngs[valid] / dlng).astype(np.int64)
+
+        self._cells = {}
+        if len(valid):
+            order = np.lexsort((cols, rows))
+            rows, cols, valid = rows[order], cols[order], valid[order]
+            breaks = np.nonzero((np.diff(rows) != 0) | (np.diff(cols) != 0))[0] + 1
+            for chunk_rows, chunk_cols, chunk in zip(
+                np.split(rows, breaks), np.split(cols, breaks), np.split(valid, breaks)
+            ):
+                self._cells[(int(chunk_rows[0]), int(chunk_cols[0]))] = chunk
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _candidates(self, lat, lng, miles):
+        hits = [self._cells[c] for c in neighbor_cells(lat, lng, miles, self.cell_miles) if c in self._cells]
+        return np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+
+    def query_radius(self, lat, lng, miles):
+        """Indices of indexed points within `miles` of (lat, lng), and their distances."""
+        idx = self._candidates(lat, lng, miles)
+        if not len(idx):
+            return idx, np.empty(0)
+        d = haversine_miles_np(lat, lng, self.lats[idx], self.lngs[idx])
+        keep = d <= miles
+        return idx[keep], d[keep]
+
+    def within_any(self, anchors, miles):
+        """
+        Boolean mask over the indexed points: within `miles` of any anchor,
+        plus each point's distance to the nearest anchor (NaN when none is
+        in range).
+        """
+        mask = np.zeros(len(self.lats), dtype=bool)
+        dist = np.full(len(self.lats), np.inf)
+        a_lat, a_lng = _anchor_arrays(anchors)
+        for lat, lng in zip(a_lat.tolist(), a_lng.tolist()):
+            idx, d = self.query_radius(lat, lng, miles)
+            mask[idx] = True
+            np.minimum.at(dist, idx, d)
+        return mask, np.where(mask, dist, np.nan)
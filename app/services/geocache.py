@@ -0,0 +1,132 @@
+"""
+Two-level cache for geo.geocode: an in-process LRU in front of the
+`geocode_cache` table, so anchors survive restarts and are shared by workers.
+
+Negative answers (the provider had no match) are cached too, with their own
+shorter TTL. Transport errors are never cached.
+"""
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db.deps import SessionLocal, engine
+from app.db.models import GeocodeCacheEntry
+from app.services.cache import MISSING, TTLCache
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_memory = TTLCache(maxsize=settings.geocode_cache_size, ttl=settings.geocode_cache_ttl)
+_counters: Dict[str, int] = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+_lock = threading.Lock()
+_table_ready = False
+
+
+def normalize_key(target: str) -> str:
+    """'  Greenville ,NC ' -> 'greenville, nc'; '27834-1234' -> '27834'."""
+    s = re.sub(r"\s+", " ", (target or "").strip().lower())
+    s = re.sub(r"\s*,\s*", ", ", s).strip(" ,")
+    m = re.fullmatch(r"(\d{5})-\d{4}", s)
+    if m:
+        return m.group(1)
+    return s
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def _ensure_table() -> bool:
+    global _table_ready
+    if _table_ready:
+        return True
+    with _lock:
+        if not _table_ready:
+            try:
+                GeocodeCacheEntry.__table__.create(bind=engine, checkfirst=True)
+                _table_ready = True
+            except Exception as e:
+                logger.warning("table unavailable: %s", e)
+    return _table_ready
+
+
+def _ttl_for(value: Optional[Dict[str, Any]]) -> int:
+    return settings.geocode_cache_ttl if value else settings.geocode_negative_ttl
+
+
+def get(target: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Return (hit, anchor). A hit with anchor=None is a cached negative result.
+    """
+    key = normalize_key(target)
+    value = _memory.get(key)
+    if value is not MISSING:
+        _count("memory_hits")
+        return True, value
+
+    if _ensure_table():
+        try:
+            with SessionLocal() as db:
+                row = db.get(GeocodeCacheEntry, key)
+        except Exception as e:
+            logger.warning("read failed: %s", e)
+            row = None
+        if row is not None:
+            value = None
+            if row.found:
+                value = {"lat": row.lat, "lng": row.lng, "locality": row.locality, "postal_code": row.postal_code}
+            remaining = row.fetched_at + _ttl_for(value) - time.time()
+            if remaining > 0:
+                _memory.set(key, value, ttl=remaining)
+                _count("db_hits")
+                return True, value
+
+    _count("misses")
+    return False, None
+
+
+def put(target: str, value: Optional[Dict[str, Any]]) -> None:
+    key = normalize_key(target)
+    _memory.set(key, value, ttl=_ttl_for(value))
+    _count("stores")
+    if not _ensure_table():
+        return
+    row = dict(
+        key=key,
+        found=value is not None,
+        lat=(value or {}).get("lat"),
+        lng=(value or {}).get("lng"),
+        locality=(value or {}).get("locality"),
+        postal_code=(value or {}).get("postal_code"),
+        fetched_at=time.time(),
+    )
+    # concurrent lookups of one target (shared by quota's single-flight)
+    # may both insert; the loser retries and merges onto the winner's row
+    for attempt in range(2):
+        try:
+            with SessionLocal() as db:
+                db.merge(GeocodeCacheEntry(**row))
+                db.commit()
+            return
+        except IntegrityError:
+            if attempt:
+                logger.warning("write failed for %r: duplicate key", key)
+        except Exception as e:
+            logger.warning("write failed: %s", e)
+            return
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        out = dict(_counters)
+    out["memory_entries"] = len(_memory)
+    return out
+
+
+def clear_memory() -> None:
+    _memory.clear()
@@ -0,0 +1,334 @@
+"""
+Geography predicate for ranked candidates, compiled once per request.
+
+GeographyMatcher reads the payload's city, state and ZIP constraints once
+and normalizes them: cities become token tuples, states become two-letter
+codes, and ZIPs become prefixes. Each candidate's address fields are
+parsed once into structured parts: city names, state codes and ZIP codes.
+Parsing is memoized per address string. Matching then compares exact
+values:
+
+- state: the candidate's state code equals the requested one ("nc" no
+  longer matches "Lincoln"; "North Carolina" and "NC" are the same)
+- ZIP: a candidate ZIP starts with a requested prefix (a street number
+  such as "2780 Main St" is not a ZIP)
+- city: a candidate city equals a requested one, token for token
+  ("St. Louis" == "Saint Louis", "Winston-Salem" == "Winston Salem")
+
+The rules are the same as the old substring check. The state must match.
+ZIPs, when given, match OR the city matches. Otherwise the city must match.
+Every entry of the payload's `cities` list is accepted alongside `city`,
+because the UI only copies the first city into `city`. A part the
+candidate's address does not reveal (no state, no city) does not reject
+it, since the radius filter in discovery already bounds it. A requested
+state that is not a US state is ignored.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# payload keys the predicate reads (rank's filter-stage cache key uses these)
+CITY_FIELDS = ("city", "City", "locality")
+STATE_FIELDS = ("state", "State", "state_code")
+ZIP_FIELDS = ("zip_codes", "zipcodes", "zips", "postal_codes", "zip", "zipcode")
+PAYLOAD_FIELDS = CITY_FIELDS + STATE_FIELDS + ZIP_FIELDS + ("cities",)
+
+# candidate keys holding address text
+ADDRESS_FIELDS = ("formatted_address", "address", "vicinity")
+CANDIDATE_CITY_FIELDS = ("city", "locality")
+CANDIDATE_STATE_FIELDS = ("state", "state_code", "region")
+CANDIDATE_ZIP_FIELDS = ("postal_code", "zipcode", "zip")
+
+US_STATES = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas", "ca": "california",
+    "co": "colorado", "ct": "connecticut", "de": "delaware", "fl": "florida", "ga": "georgia",
+    "hi": "hawaii", "id": "idaho", "il": "illinois", "in": "indiana", "ia": "iowa",
+    "ks": "kansas", "ky": "kentucky", "la": "louisiana", "me": "maine", "md": "maryland",
+    "ma": "massachusetts", "mi": "michigan", "mn": "minnesota", "ms": "mississippi", "mo": "missouri",
+    "mt": "montana", "ne": "nebraska", "nv": "nevada", "nh": "new hampshire", "nj": "new jersey",
+    "nm": "new mexico", "ny": "new york", "nc": "north carolina", "nd": "north dakota", "oh": "ohio",
+    "ok": "oklahoma", "or": "oregon", "pa": "pennsylvania", "ri": "rhode island", "sc": "south carolina",
+    "sd": "south dakota", "tn": "tennessee", "tx": "texas", "ut": "utah", "vt": "vermont",
+    "va": "virginia", "wa": "washington", "wv": "west virginia", "wi": "wisconsin", "wy": "wyoming",
+    "dc": "district of columbia", "pr": "puerto rico",
+}
+_STATE_CODES = {name: code for code, name in US_STATES.items()}
+_STATE_CODES.update({code: code for code in US_STATES})
+_COUNTRIES = {"usa", "us", "united states", "united states of america"}
+# abbreviations spelled out so either form matches
+_CITY_WORDS = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STATE_ZIP_RE = re.compile(r"^(?P<state>[a-z][a-z .]*?)\s*(?P<zip>\d{5})(?:-\d{4})?$")
+_ZIP_RE = re.compile(r"^\d{5}(?:-\d{4})?$")
+
+CityKey = Tuple[str, ...]
+
+
+def _tokens(value: str) -> List[str]:
+    return _TOKEN_RE.findall(value.lower())
+
+
+def city_key(value: Any) -> CityKey:
+    """'St. Louis' -> ('saint', 'louis')."""
+    return tuple(_CITY_WORDS.get(t, t) for t in _tokens(str(value or "")))
+
+
+def state_code(value: Any) -> Optional[str]:
+    """'NC', 'N.C.' or 'North Carolina' -> 'nc'; None if it is not a US state."""
+    tokens = _tokens(str(value or ""))
+    return _STATE_CODES.get(" ".join(tokens)) or _STATE_CODES.get("".join(tokens))
+
+
+def normalize_zip_list(raw: Any) -> List[str]:
+    """ZIP prefixes (3+ chars, ZIP+4 cut to 5) from a string or an iterable of strings."""
+    if raw is None:
+        return []
+    if isinstance(raw, str) or not isinstance(raw, Iterable) or isinstance(raw, (bytes, bytearray)):
+        raw = [raw]
+    zips: List[str] = []
+    for v in raw:
+        if v is None:
+            continue
+        for part in str(v).replace(";", ",").split(","):
+            part = part.strip()
+            if "-" in part and len(part) > 5:
+                part = part.split("-", 1)[0].strip()
+            if len(part) >= 3:
+                zips.append(part.lower())
+    return zips
+
+
+# ---------------------------------------------------------------------------
+# Candidate side
+# ---------------------------------------------------------------------------
+
+
+class AddressParts:
+    __slots__ = ("cities", "states", "zips")
+
+    def __init__(self, cities: FrozenSet[CityKey], states: FrozenSet[str], zips: FrozenSet[str]):
+        self.cities = cities
+        self.states = states
+        self.zips = zips
+
+
+def _components(text: str) -> List[str]:
+    parts = [p.strip().lower() for p in text.split(",")]
+    return [p for p in parts if p and p not in _COUNTRIES]
+
+
+def _scan(parts: List[Optional[str]]) -> Tuple[set, set, set, bool]:
+    """
+    Cities, states and ZIPs in comma-separated components, plus whether the
+    first component is a city. parts[0] may be None when the caller keeps
+    the first component to itself.
+    """
+    cities, states, zips = set(), set(), set()
+    first_is_city = False
+    for i, part in enumerate(parts):
+        if part is None:
+            continue
+        m = _STATE_ZIP_RE.match(part)
+        code = state_code(m.group("state")) if m else None
+        if code:
+            zips.add(m.group("zip"))
+        elif _ZIP_RE.match(part):
+            zips.add(part[:5])
+            continue
+        else:
+            # 'Greenville, NC' / 'Greenville, North Carolina[, 27834]'; a
+            # state name earlier on is a city ('Washington, NC')
+            last = i + 1 == len(parts) or bool(_ZIP_RE.match(parts[i + 1]))
+            code = state_code(part) if last and i > 0 else None
+            if not code:
+                continue
+        states.add(code)
+        if i == 1:
+            first_is_city = True
+        elif i > 1:
+            cities.add(city_key(parts[i - 1]))
+    if len(parts) == 1 and not (states or zips):
+        # a bare place label such as a search target 'Greenville'
+        first_is_city = True
+    return cities, states, zips, first_is_city
+
+
+def _frozen(cities: set, states: set, zips: set) -> Tuple[FrozenSet[CityKey], FrozenSet[str], FrozenSet[str]]:
+    cities.discard(())
+    return frozenset(cities), frozenset(states), frozenset(zips)
+
+
+@lru_cache(maxsize=8192)
+def _parse_full(text: str) -> Tuple[FrozenSet[CityKey], FrozenSet[str], FrozenSet[str]]:
+    parts = _components(text)
+    cities, states, zips, first_is_city = _scan(parts)
+    if first_is_city:
+        cities.add(city_key(parts[0]))
+    return _frozen(cities, states, zips)
+
+
+@lru_cache(maxsize=8192)
+def _parse_tail(rest: str) -> Tuple[Tuple[FrozenSet[CityKey], FrozenSet[str], FrozenSet[str]], bool]:
+    cities, states, zips, first_is_city = _scan([None] + _components(rest))
+    return _frozen(cities, states, zips), first_is_city
+
+
+@lru_cache(maxsize=65536)
+def _parse_address(text: Any) -> Tuple[FrozenSet[CityKey], FrozenSet[str], FrozenSet[str]]:
+    """
+    Structured parts of one comma-separated address or place label:
+    '100 Main St, Greenville, NC 27834, USA', 'Greenville, NC', '27834'.
+
+    The first component of a street address is unique to the venue while
+    the rest ('Greenville, NC 27834, USA') repeats across a search, so the
+    rest is parsed and cached on its own. A first component that could be
+    a ZIP, or that is itself the city, sends the whole text through the
+    full parse. The whole text is cached as well: the same venues come
+    back in every search over an area.
+    """
+    if not isinstance(text, str):
+        text = str(text)
+    head, sep, rest = text.partition(",")
+    if not sep or head[-1:].isdigit():
+        return _parse_full(text)
+    parts, first_is_city = _parse_tail(rest)
+    # 'Greenville, NC': the first component is the city, and such short
+    # labels repeat, so the full parse is cached too
+    return _parse_full(text) if first_is_city else parts
+
+
+_EMPTY: FrozenSet[Any] = frozenset()
+
+
+def _parse_zip(val: Any) -> Tuple[FrozenSet[CityKey], FrozenSet[str], FrozenSet[str]]:
+    z = str(val).strip()[:5]
+    return _EMPTY, _EMPTY, frozenset((z,) if z.isdigit() else ())
+
+
+def _parse_state(val: Any) -> Tuple[FrozenSet[CityKey], FrozenSet[str], FrozenSet[str]]:
+    code = state_code(val)
+    return _EMPTY, frozenset((code,) if code else ()), _EMPTY
+
+
+_PARSERS = {key: _parse_address for key in ADDRESS_FIELDS + CANDIDATE_CITY_FIELDS}
+_PARSERS.update({key: _parse_state for key in CANDIDATE_STATE_FIELDS})
+_PARSERS.update({key: _parse_zip for key in CANDIDATE_ZIP_FIELDS})
+_FIELDS = frozenset(_PARSERS)
+# every candidate key the predicate reads
+CANDIDATE_FIELDS = tuple(_PARSERS)
+
+
+def _candidate_parts(candidate: Dict[str, Any]) -> Tuple[FrozenSet[CityKey], FrozenSet[str], FrozenSet[str]]:
+    cities = states = zips = _EMPTY
+    # only the address keys a dict has (usually two of the eleven); a
+    # Candidate answers absent fields from its slots without a dict view
+    keys = candidate.keys() & _FIELDS if isinstance(candidate, dict) else _FIELDS
+    for key in keys:
+        val = candidate.get(key)
+        if val:
+            c, s, z = _PARSERS[key](val)
+            # usually one field says it all (vicinity has no state or ZIP)
+            if c:
+                cities = cities | c if cities else c
+            if s:
+                states = states | s if states else s
+            if z:
+                zips = zips | z if zips else z
+    return cities, states, zips
+
+
+def parse_candidate(candidate: Dict[str, Any]) -> AddressParts:
+    return AddressParts(*_candidate_parts(candidate))
+
+
+def parse_field(key: str, value: Any) -> AddressParts:
+    """The parts one candidate field (a CANDIDATE_FIELDS key) reveals on its own."""
+    if not value:
+        return AddressParts(_EMPTY, _EMPTY, _EMPTY)
+    return AddressParts(*_PARSERS[key](value))
+
+
+# ---------------------------------------------------------------------------
+# Compiled predicate
+# ---------------------------------------------------------------------------
+
+
+def _first(payload: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for k in keys:
+        if payload.get(k):
+            return payload[k]
+    return None
+
+
+class GeographyMatcher:
+    """Compiled city/state/ZIP constraints of one payload."""
+
+    __slots__ = ("cities", "state", "zip_prefixes", "_zip_lengths")
+
+    def __init__(self, cities: Iterable[CityKey] = (), state: Optional[str] = None, zip_prefixes: Iterable[str] = ()):
+        self.cities = frozenset(c for c in cities if c)
+        self.state = state
+        self.zip_prefixes = frozenset(zip_prefixes)
+        self._zip_lengths = sorted({len(z) for z in self.zip_prefixes})
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "GeographyMatcher":
+        city_raw = _first(payload, CITY_FIELDS)
+        state_raw = _first(payload, STATE_FIELDS)
+        cities: List[CityKey] = []
+        if city_raw:
+            cities.append(city_key(city_raw))
+            for entry in payload.get("cities") or []:
+                # 'Greenville, NC' -> city part only
+                cities.append(city_key(str(entry).split(",", 1)[0]))
+        # a state we cannot read (not a US state) constrains nothing
+        state = state_code(state_raw) if state_raw else None
+        return cls(cities, state, normalize_zip_list(_first(payload, ZIP_FIELDS)))
+
+    @property
+    def unconstrained(self) -> bool:
+        return not (self.cities or self.state)
+
+    def _zip_match(self, zips: FrozenSet[str]) -> bool:
+        prefixes = self.zip_prefixes
+        return any(z[:n] in prefixes for z in zips for n in self._zip_lengths)
+
+    def matches_parts(self, parts: AddressParts) -> bool:
+        return self._match(parts.cities, parts.states, parts.zips)
+
+    def _match(self, cities: FrozenSet[CityKey], states: FrozenSet[str], zips: FrozenSet[str]) -> bool:
+        # a part the candidate does not tell us about cannot rule it out
+        if self.state and states and self.state not in states:
+            return False
+        if self.zip_prefixes and self._zip_match(zips):
+            return True
+        if self.cities and cities and self.cities.isdisjoint(cities):
+            return False
+        return True
+
+    def part_flags(self, parts: AddressParts) -> Tuple[bool, bool, bool, bool, bool]:
+        """
+        (has state, state matches, ZIP matches, has city, city matches) for
+        one field's parts. A candidate's flags are the OR over its fields;
+        app.services.columnar evaluates _match() on them column-wise.
+        """
+        return (
+            bool(parts.states),
+            self.state in parts.states,
+            bool(self.zip_prefixes) and self._zip_match(parts.zips),
+            bool(parts.cities),
+            not self.cities.isdisjoint(parts.cities),
+        )
+
+    def matches(self, candidate: Dict[str, Any]) -> bool:
+        if self.unconstrained:
+            return True
+        return self._match(*_candidate_parts(candidate))
+
+    def filter(self, candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The candidates that match, in order, in one pass."""
+        if self.unconstrained:
+            return list(candidates)
+        match = self._match
+        return [c for c in candidates if match(*_candidate_parts(c))]
@@ -0,0 +1,260 @@
+"""
+Shared, pooled HTTP clients for every outbound provider call.
+
+One keep-alive httpx.Client serves blocking callers; one httpx.AsyncClient
+lives on a dedicated background event loop so its connection pool survives
+across requests (an AsyncClient is bound to the loop that created it, and
+FastAPI runs sync endpoints on worker threads without a loop).
+
+- startup()/shutdown() are wired to the app lifespan in app/main.py;
+  clients are also created lazily for scripts and benchmarks.
+- get()/aget() add per-host concurrency limits and retry-with-backoff on
+  transport errors, 429 and 5xx (Google calls leave 429 to app.services.quota).
+- run(coro)/submit(coro) execute a coroutine on the I/O loop from sync code.
+- Every call is timed and counted by `op` and outcome (app.services.metrics).
+- HTTP/2 is negotiated when the optional `h2` package is installed.
+- PROVIDER_MODE=record|replay swaps in the fixture transports from
+  app.services.replay; call shutdown() after changing it at runtime.
+"""
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from typing import Any, Collection, Coroutine, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services import metrics, replay
+from app.settings import settings
+
+T = TypeVar("T")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+OUTBOUND_SECONDS = metrics.histogram(
+    "venue_outbound_request_seconds", "Outbound provider call latency, retries included", ("op",)
+)
+OUTBOUND_TOTAL = metrics.counter(
+    "venue_outbound_requests_total", "Outbound provider calls by final outcome (2xx..5xx, error)", ("op", "outcome")
+)
+OUTBOUND_RETRIES = metrics.counter("venue_outbound_retries_total", "Outbound attempts beyond the first", ("op",))
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_host_limits: Dict[str, threading.BoundedSemaphore] = {}
+_async_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_kwargs(is_async: bool = False) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "http2": _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+        "headers": {"User-Agent": "venue-agent/0.1"},
+    }
+    transport = replay.transport(is_async, http2=kwargs["http2"], limits=kwargs["limits"])
+    if transport is not None:
+        kwargs["transport"] = transport
+    return kwargs
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def startup() -> None:
+    """Create the shared clients and the I/O loop (idempotent)."""
+    global _client, _async_client, _loop, _loop_thread
+    with _lock:
+        if _client is None:
+            _client = httpx.Client(**_client_kwargs())
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_run_loop, args=(_loop,), name="provider-io", daemon=True)
+            _loop_thread.start()
+        if _async_client is None:
+            async def _make() -> httpx.AsyncClient:
+                return new_async_client()
+
+            _async_client = asyncio.run_coroutine_threadsafe(_make(), _loop).result()
+
+
+def shutdown() -> None:
+    """Close pooled connections and stop the I/O loop."""
+    global _client, _async_client, _loop, _loop_thread
+    with _lock:
+        if _async_client is not None and _loop is not None:
+            asyncio.run_coroutine_threadsafe(_async_client.aclose(), _loop).result()
+        if _client is not None:
+            _client.close()
+        if _loop is not None:
+            _loop.call_soon_threadsafe(_loop.stop)
+            if _loop_thread is not None:
+                _loop_thread.join(timeout=5)
+            _loop.close()
+        _client = _async_client = _loop = _loop_thread = None
+        _host_limits.clear()
+        _async_host_limits.clear()
+
+
+def client() -> httpx.Client:
+    if _client is None:
+        startup()
+    return _client  # type: ignore[return-value]
+
+
+def async_client() -> httpx.AsyncClient:
+    """The shared AsyncClient; only usable from coroutines running on the I/O loop."""
+    if _async_client is None:
+        startup()
+    return _async_client  # type: ignore[return-value]
+
+
+def new_async_client() -> httpx.AsyncClient:
+    """A private AsyncClient with the shared tuning, for code running on another loop."""
+    return httpx.AsyncClient(**_client_kwargs(is_async=True))
+
+
+def on_io_loop() -> bool:
+    try:
+        return _loop is not None and asyncio.get_running_loop() is _loop
+    except RuntimeError:
+        return False
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+    """Schedule `coro` on the shared I/O loop; returns a thread-safe future."""
+    if _loop is None:
+        startup()
+    return asyncio.run_coroutine_threadsafe(coro, _loop)  # type: ignore[arg-type]
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run `coro` on the shared I/O loop and block until it finishes."""
+    return submit(coro).result()
+
+
+def _backoff(attempt: int) -> float:
+    base = settings.http_backoff * (2 ** attempt)
+    return base + random.uniform(0, base / 2)
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _sync_limit(host: str) -> threading.BoundedSemaphore:
+    with _lock:
+        sem = _host_limits.get(host)
+        if sem is None:
+            sem = _host_limits[host] = threading.BoundedSemaphore(settings.http_per_host_limit)
+        return sem
+
+
+def _async_limit(host: str) -> asyncio.Semaphore:
+    # only touched from the I/O loop thread, so no lock needed
+    sem = _async_host_limits.get(host)
+    if sem is None:
+        sem = _async_host_limits[host] = asyncio.Semaphore(settings.http_per_host_limit)
+    return sem
+
+
+def _outcome(r: Optional[httpx.Response]) -> str:
+    return f"{r.status_code // 100}xx" if r is not None else "error"
+
+
+def _observe(op: str, started: float, r: Optional[httpx.Response], attempts: int) -> None:
+    OUTBOUND_SECONDS.observe(time.perf_counter() - started, op)
+    OUTBOUND_TOTAL.inc(op, _outcome(r))
+    if attempts > 1:
+        OUTBOUND_RETRIES.inc(op, amount=attempts - 1)
+
+
+def get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    op: str = "other",
+    retry_statuses: Collection[int] = RETRY_STATUSES,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Blocking GET through the shared pool, retried with backoff on transport
+    errors and `retry_statuses`. `op` labels the call in the outbound
+    metrics (geocode, textsearch, crawl, ...).
+    """
+    c = client()
+    sem = _sync_limit(_host(url))
+    attempts = settings.http_retries + 1
+    started = time.perf_counter()
+    r: Optional[httpx.Response] = None
+    attempt = 0
+    try:
+        for attempt in range(attempts):
+            try:
+                with sem:
+                    r = c.get(url, params=params, **kwargs)
+            except httpx.TransportError:
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                if r.status_code not in retry_statuses or attempt + 1 >= attempts:
+                    return r
+            r = None
+            time.sleep(_backoff(attempt))
+        raise RuntimeError("unreachable")
+    finally:
+        _observe(op, started, r, attempt + 1)
+
+
+async def aget(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    op: str = "other",
+    retry_statuses: Collection[int] = RETRY_STATUSES,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Async GET through the shared pool (or `client`), retried with backoff."""
+    c = client or async_client()
+    sem = _async_limit(_host(url)) if on_io_loop() else None
+    attempts = settings.http_retries + 1
+    started = time.perf_counter()
+    r: Optional[httpx.Response] = None
+    attempt = 0
+    try:
+        for attempt in range(attempts):
+            try:
+                if sem is None:
+                    r = await c.get(url, params=params, **kwargs)
+                else:
+                    async with sem:
+                        r = await c.get(url, params=params, **kwargs)
+            except httpx.TransportError:
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                if r.status_code not in retry_statuses or attempt + 1 >= attempts:
+                    return r
+            r = None
+            await asyncio.sleep(_backoff(attempt))
+        raise RuntimeError("unreachable")
+    finally:
+        _observe(op, started, r, attempt + 1)
@@ -0,0 +1,261 @@
+"""
+Background jobs: a batch of ranking payloads (e.g. 40 metros) runs item by
+item on a local thread pool, with all state in the jobs/job_items tables on
+the app's SQLAlchemy engine. No broker is involved.
+
+- submit() stores the job and its items, queues every item and returns
+  the job id right away.
+- Each worker claims one queued item, runs the handler, stores the result,
+  and bumps the job's done/failed counters in the same transaction. The
+  job finishes when every item has been counted.
+- On startup resume() re-queues the unfinished items of unfinished jobs.
+  Items left "running" by a crash or restart count as unfinished.
+- events() yields a job's progress whenever it changes, so clients can
+  stream progress instead of polling.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import select, update
+
+from app.db.deps import SessionLocal, ensure_table
+from app.db.models import Job, JobItem
+from app.services.candidate import Candidate
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL = ("done", "failed", "cancelled")
+
+# handler(payload, job options) -> JSON-serializable result
+Handler = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+
+def _jsonable(value: Any) -> Any:
+    # numpy scalars and other odd leaves from the pipeline
+    def _default(o: Any) -> Any:
+        if isinstance(o, Candidate):
+            return o.to_dict()
+        item = getattr(o, "item", None)
+        return item() if callable(item) else str(o)
+
+    return json.loads(json.dumps(value, default=_default))
+
+
+def summary(job: Job) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "done": job.done,
+        "failed": job.failed,
+        "progress": round((job.done + job.failed) / job.total, 4) if job.total else 1.0,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+class JobQueue:
+    """Persistent job queue for one handler; call start() once per process."""
+
+    def __init__(self, handler: Handler, workers: Optional[int] = None, kind: str = "rank"):
+        self.handler = handler
+        self.kind = kind
+        self.workers = workers or settings.jobs_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._version = 0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self, resume: Optional[bool] = None) -> int:
+        """Create tables and the worker pool; returns how many items were resumed."""
+        ensure_table(Job.__table__)
+        ensure_table(JobItem.__table__)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"jobs-{self.kind}")
+        if settings.jobs_resume if resume is None else resume:
+            return self.resume()
+        return 0
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop taking work; unfinished items stay queued/running and resume next start."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def resume(self) -> int:
+        with SessionLocal() as db:
+            open_jobs = select(Job.id).where(Job.kind == self.kind, Job.status.not_in(TERMINAL))
+            db.execute(
+                update(JobItem)
+                .where(JobItem.job_id.in_(open_jobs), JobItem.status == "running")
+                .values(status="queued", started_at=None)
+            )
+            db.commit()
+            ids = db.execute(
+                select(JobItem.id)
+                .join(Job, Job.id == JobItem.job_id)
+                .where(Job.kind == self.kind, Job.status.not_in(TERMINAL), JobItem.status == "queued")
+                .order_by(Job.created_at, JobItem.seq)
+            ).scalars().all()
+        self._enqueue(ids)
+        return len(ids)
+
+    # -- producer side -----------------------------------------------------
+
+    def submit(self, payloads: List[Dict[str, Any]], options: Optional[Dict[str, Any]] = None) -> str:
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=self.kind,
+            status="queued" if payloads else "done",
+            options=options or {},
+            total=len(payloads),
+            created_at=now,
+            updated_at=now,
+        )
+        job.items = [JobItem(seq=i, payload=p, status="queued") for i, p in enumerate(payloads)]
+        with SessionLocal() as db:
+            db.add(job)
+            db.commit()
+            job_id = job.id
+            ids = [item.id for item in job.items]
+        self._enqueue(ids)
+        self._notify()
+        return job_id
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a job; items already running finish, queued ones are skipped."""
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            if job is None:
+                return None
+            if job.status not in TERMINAL:
+                job.status = "cancelled"
+                job.updated_at = time.time()
+                db.commit()
+            out = summary(job)
+        self._notify()
+        return out
+
+    # -- queries -----------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            return summary(job) if job is not None else None
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with SessionLocal() as db:
+            rows = db.query(Job).filter(Job.kind == self.kind).order_by(Job.created_at.desc()).limit(limit)
+            return [summary(j) for j in rows]
+
+    def results(self, job_id: str) -> Optional[List[Dict[str, Any]]]:
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            if job is None:
+                return None
+            return [
+                {"seq": i.seq, "status": i.status, "payload": i.payload, "result": i.result, "error": i.error}
+                for i in job.items
+            ]
+
+    def events(self, job_id: str, poll: float = 1.0) -> Iterator[Dict[str, Any]]:
+        """Job summaries, one per change, ending with the terminal state."""
+        last = None
+        while True:
+            version = self._version
+            current = self.get(job_id)
+            if current is None:
+                return
+            if current != last:
+                yield current
+                last = current
+            if current["status"] in TERMINAL:
+                return
+            with self._changed:
+                # another process may be running the job: re-read on a timer too
+                self._changed.wait_for(lambda: self._version != version, timeout=poll)
+
+    # -- worker side -------------------------------------------------------
+
+    def _notify(self) -> None:
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    def _enqueue(self, item_ids: List[int]) -> None:
+        with self._lock:
+            pool = self._pool
+        if pool is None:
+            return  # picked up by resume() once the queue starts
+        for item_id in item_ids:
+            pool.submit(self._run_item, item_id)
+
+    def _claim(self, item_id: int):
+        with SessionLocal() as db:
+            item = db.get(JobItem, item_id)
+            if item is None or item.status != "queued":
+                return None
+            job = item.job
+            if job.status in TERMINAL:
+                return None
+            now = time.time()
+            item.status, item.started_at = "running", now
+            if job.status == "queued":
+                job.status = "running"
+            job.updated_at = now
+            db.commit()
+            return job.id, dict(item.payload or {}), dict(job.options or {})
+
+    def _run_item(self, item_id: int) -> None:
+        try:
+            claimed = self._claim(item_id)
+        except Exception as e:
+            logger.warning("claim %s failed: %s", item_id, e)
+            return
+        if claimed is None:
+            return
+        job_id, payload, options = claimed
+        self._notify()
+
+        result, error = None, None
+        try:
+            result = _jsonable(self.handler(payload, options))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("%s item %s failed", job_id, item_id)
+
+        try:
+            self._finish(job_id, item_id, result, error)
+        except Exception as e:
+            logger.warning("%s item %s could not be saved: %s", job_id, item_id, e)
+        self._notify()
+
+    def _finish(self, job_id: str, item_id: int, result: Any, error: Optional[str]) -> None:
+        now = time.time()
+        with SessionLocal() as db:
+            db.execute(
+                update(JobItem)
+                .where(JobItem.id == item_id)
+                .values(status="failed" if error else "done", result=result, error=error, finished_at=now)
+            )
+            counter = Job.failed if error else Job.done
+            db.execute(update(Job).where(Job.id == job_id).values({counter: counter + 1, "updated_at": now}))
+            job = db.get(Job, job_id)
+            if job.status not in TERMINAL and job.done + job.failed >= job.total:
+                job.status = "failed" if job.done == 0 else "done"
+                if job.failed:
+                    job.error = f"{job.failed} of {job.total} items failed"
+            db.commit()
@@ -0,0 +1,129 @@
+"""
+Multi-pattern substring matching for keyword blocklists.
+
+KeywordMatcher compiles its keywords into an Aho–Corasick automaton once,
+so checking a string costs one pass over its characters no matter how many
+keywords there are. Matching is plain lowercase substring matching, the
+same as `kw in text` for each keyword.
+"""
+import json
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class KeywordMatcher:
+    __slots__ = ("keywords", "_goto", "_fail", "_out")
+
+    def __init__(self, keywords: Iterable[str]):
+        kws: List[str] = []
+        seen = set()
+        for kw in keywords:
+            kw = (kw or "").strip().lower()
+            if kw and kw not in seen:
+                seen.add(kw)
+                kws.append(kw)
+        self.keywords = kws
+
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Optional[int]] = [None]
+        for idx, kw in enumerate(kws):
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(None)
+                state = nxt
+            if out[state] is None:
+                out[state] = idx
+
+        # Breadth-first failure links; each state inherits the output of its
+        # failure state so a single lookup tells whether any keyword ends here.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch) != nxt else 0
+                if out[nxt] is None:
+                    out[nxt] = out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first keyword found in `text` (earliest end), or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = out[state]
+            if hit is not None:
+                return self.keywords[hit]
+        return None
+
+    def find_all(self, text: str) -> List[str]:
+        """Every distinct keyword occurring in `text`, in order of first occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Dict[int, None] = {}
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            s = state
+            while s and out[s] is not None:
+                # walk the failure chain to collect shorter overlapping keywords
+                if out[s] not in found:
+                    found[out[s]] = None
+                s = fail[s]
+        return [self.keywords[i] for i in found]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+class KeywordRegistry:
+    """
+    A default keyword set plus optional per-tenant additions.
+
+    Each tenant's matcher (default + tenant keywords) is compiled once, when
+    the tenant is registered, and reused for every candidate afterwards.
+    """
+
+    def __init__(self, default_keywords: Iterable[str]):
+        self._default = list(default_keywords)
+        self.default = KeywordMatcher(self._default)
+        self._tenants: Dict[str, KeywordMatcher] = {}
+        self._lock = threading.Lock()
+
+    def register(self, tenant: str, keywords: Iterable[str], extend_default: bool = True) -> KeywordMatcher:
+        kws = list(keywords)
+        matcher = KeywordMatcher(self._default + kws if extend_default else kws)
+        with self._lock:
+            self._tenants[tenant] = matcher
+        return matcher
+
+    def load(self, path: str) -> None:
+        """Register tenants from a JSON file shaped {"tenant": ["kw", ...], ...}."""
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        for tenant, kws in data.items():
+            self.register(tenant, kws)
+
+    def matcher_for(self, tenant: Optional[str] = None) -> KeywordMatcher:
+        if tenant:
+            matcher = self._tenants.get(tenant)
+            if matcher is not None:
+                return matcher
+        return self.default
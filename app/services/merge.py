@@ -1,5 +1,12 @@
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+from app.services import dedupe
+from app.services.candidate import derive
+from app.services.geo import grid_cell, haversine_miles, neighbor_cells
+
+# Proximity-blocking cell size: ~30 m, so close duplicates share or neighbor a cell
+COORD_CELL_MILES = 0.02
 
 def _norm(s: str) -> str:
     if not s: return ""
@@ -10,11 +17,12 @@ def _norm(s: str) -> str:
     return s
 
 def _coord_bucket(v: dict) -> str:
-    # bucket lat/lng to ~30m grid to coalesce close duplicates
+    # bucket lat/lng to ~30m grid cell (geo.grid_cell) to coalesce close duplicates
     lat, lng = v.get("lat"), v.get("lng")
     if lat is None or lng is None:
         return ""
-    return f"{round(lat, 4)}:{round(lng, 4)}"
+    row, col = grid_cell(lat, lng, COORD_CELL_MILES)
+    return f"{row}:{col}"
 
 def _key(v: dict) -> Tuple[str, str]:
     name = _norm(v.get("name",""))
@@ -27,33 +35,80 @@ def _key(v: dict) -> Tuple[str, str]:
         return (name, cb)
     return (name, _norm(v.get("city","")))
 
+def merge_key(v: dict) -> str:
+    """Stable identity for the venues table: Google place_id, else the merge key."""
+    if v.get("place_id"):
+        return "place:" + v["place_id"]
+    return "key:" + "|".join(_key(v))
+
+def _merge(a: dict, b: dict) -> dict:
+    out = derive(a)
+    # Prefer Google’s IDs if present
+    for k in ["place_id","yelp_id","lat","lng","source"]:
+        out[k] = out.get(k) or b.get(k)
+    # Fill blanks from b
+    for k in ["address","website_url","booking_url","phone","availability_status","educationality","distance_miles","category"]:
+        out[k] = out.get(k) or b.get(k)
+    # Keep shorter distance if available
+    if out.get("distance_miles") is None and b.get("distance_miles") is not None:
+        out["distance_miles"] = b["distance_miles"]
+    elif out.get("distance_miles") is not None and b.get("distance_miles") is not None:
+        out["distance_miles"] = min(out["distance_miles"], b["distance_miles"])
+    return out
+
+class _CellIndex:
+    """(normalized name, grid cell) -> merge key, for proximity lookups."""
+
+    def __init__(self):
+        self._cells: Dict[Tuple[str, int, int], List[Tuple[str, str]]] = {}
+
+    def add(self, v: dict, key: Tuple[str, str]) -> None:
+        lat, lng = v.get("lat"), v.get("lng")
+        if lat is None or lng is None:
+            return
+        row, col = grid_cell(lat, lng, COORD_CELL_MILES)
+        self._cells.setdefault((key[0], row, col), []).append(key)
+
+    def near(self, v: dict, merged: Dict[Tuple[str, str], dict]) -> Optional[Tuple[str, str]]:
+        lat, lng = v.get("lat"), v.get("lng")
+        if lat is None or lng is None:
+            return None
+        name = _norm(v.get("name", ""))
+        for row, col in neighbor_cells(lat, lng, COORD_CELL_MILES, COORD_CELL_MILES):
+            for key in self._cells.get((name, row, col), ()):
+                other = merged[key]
+                if haversine_miles(lat, lng, other["lat"], other["lng"]) <= COORD_CELL_MILES:
+                    return key
+        return None
+
 def merge_candidates(google_list: List[dict], yelp_list: List[dict]) -> List[dict]:
-    merged: Dict[Tuple[str,str], dict] = {}
+    return merge_candidates_with_report(google_list, yelp_list)[0]
 
-    def _merge(a: dict, b: dict) -> dict:
-        out = dict(a)
-        # Prefer Google’s IDs if present
-        for k in ["place_id","yelp_id","lat","lng","source"]:
-            out[k] = out.get(k) or b.get(k)
-        # Fill blanks from b
-        for k in ["address","website_url","booking_url","phone","availability_status","educationality","distance_miles","category"]:
-            out[k] = out.get(k) or b.get(k)
-        # Keep shorter distance if available
-        if out.get("distance_miles") is None and b.get("distance_miles") is not None:
-            out["distance_miles"] = b["distance_miles"]
-        elif out.get("distance_miles") is not None and b.get("distance_miles") is not None:
-            out["distance_miles"] = min(out["distance_miles"], b["distance_miles"])
-        return out
+def merge_candidates_with_report(google_list: List[dict], yelp_list: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """
+    Exact-key and proximity merge, then fuzzy near-duplicate clustering
+    (app.services.dedupe) across all providers.
+
+    Returns (candidates, report) where the report lists which records were
+    folded into which kept record.
+    """
+    merged: Dict[Tuple[str,str], dict] = {}
+    cells = _CellIndex()
 
     for g in google_list:
-        merged[_key(g)] = g
+        k = _key(g)
+        merged[k] = g
+        cells.add(g, k)
 
     for y in yelp_list:
         k = _key(y)
+        if k not in merged:
+            # same name within ~30 m of an existing venue: treat as that venue
+            k = cells.near(y, merged) or k
         if k in merged:
             merged[k] = _merge(merged[k], y)
         else:
             merged[k] = y
+            cells.add(y, k)
 
-    return list(merged.values())
-
+    return dedupe.dedupe(list(merged.values()), _merge)
@@ -0,0 +1,219 @@
+"""
+In-process metrics with Prometheus text exposition (GET /metrics).
+
+Counters and histograms are plain dicts keyed by label tuples behind one
+lock each; an observation is a perf_counter delta, a bisect and two dict
+updates, so instrumenting the hot path costs microseconds.
+
+Request-scoped timings: inside `collect_timings()`, every `timed(...,
+timing=name)` block is also recorded for that request, and
+`server_timing()` renders them as a Server-Timing header.
+"""
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# seconds; covers cache hits (sub-ms) through slow provider fan-outs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: Dict[str, "_Metric"] = {}
+_registry_lock = threading.Lock()
+_timings: ContextVar[Optional[List[Tuple[str, float, Optional[str]]]]] = ContextVar("timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return super().render() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-1] += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            row = self._values.get(labels)
+            return int(sum(row[:-1])) if row else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((k, list(v)) for k, v in self._values.items())
+        lines = super().render()
+        for labels, row in values:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets + (math.inf,), row[:-1]):
+                cumulative += n
+                le = f'le="{_fmt(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_fmt(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(row[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_fmt(cumulative)}")
+        return lines
+
+
+class Callback(_Metric):
+    """Values read at scrape time from fn() -> {label values tuple: value}."""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...], kind: str, fn: Callable[[], Dict]):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            values = sorted(self.fn().items())
+        except Exception as e:
+            logger.warning("%s callback failed: %s", self.name, e)
+            return []
+        return super().render() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in values]
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+
+def callback(name: str, help: str, labelnames: Tuple[str, ...], fn: Callable[[], Dict], kind: str = "gauge") -> None:
+    _register(Callback(name, help, labelnames, kind, fn))
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = [_registry[k] for k in sorted(_registry)]
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Timing helpers
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def collect_timings() -> Iterator[List[Tuple[str, float, Optional[str]]]]:
+    """Collect (name, seconds, desc) for every timed(..., timing=...) in this context."""
+    entries: List[Tuple[str, float, Optional[str]]] = []
+    token = _timings.set(entries)
+    try:
+        yield entries
+    finally:
+        _timings.reset(token)
+
+
+def record_timing(name: str, seconds: float, desc: Optional[str] = None) -> None:
+    entries = _timings.get()
+    if entries is not None:
+        entries.append((name, seconds, desc))
+
+
+@contextmanager
+def timed(
+    hist: Histogram,
+    *labels: str,
+    errors: Optional[Counter] = None,
+    timing: Optional[str] = None,
+) -> Iterator[None]:
+    """Observe the block's duration in `hist`; count exceptions in `errors`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        if errors is not None:
+            errors.inc(*labels)
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        hist.observe(elapsed, *labels)
+        if timing is not None:
+            record_timing(timing, elapsed)
+
+
+def server_timing(entries: List[Tuple[str, float, Optional[str]]]) -> str:
+    """'discover;dur=812.3, score;desc="hit";dur=0.0' (durations in ms)."""
+    parts = []
+    for name, seconds, desc in entries:
+        part = name
+        if desc:
+            part += f';desc="{desc}"'
+        parts.append(f"{part};dur={seconds * 1000:.1f}")
+    return ", ".join(parts)
@@ -0,0 +1,120 @@
+"""
+Top-K selection and cursor pagination over a ranked venue list.
+
+The score stage already returns venues best-first, so the default order
+("score" descending, or "index") is a plain slice. Any other sort key
+selects only the rows up to the end of the requested page with a bounded
+heap (heapq.nsmallest/nlargest) instead of sorting the whole list.
+
+Sort keys are the UI table's data-sort-key columns. Values compare the
+way the table does: numbers numerically, anything else as
+case-insensitive text, and missing values last in either direction. Ties
+keep ranking order.
+
+A cursor is an opaque token holding the offset of the next page, the sort
+it was taken under and the ranking it belongs to; a cursor from another
+search or sort is rejected rather than silently paging something else.
+"""
+import base64
+import heapq
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+SORT_KEYS = (
+    "index", "name", "room_name", "category", "city", "state", "distance_miles", "score", "source",
+    "educationality", "availability_score", "capacity_score", "amenities_score", "logistics_score",
+)
+ORDERS = ("asc", "desc")
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 500
+
+
+def _value_key(value: Any) -> Optional[Tuple[int, Any]]:
+    """Comparable key for one cell, or None when it sorts as missing."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return None if isinstance(value, float) and math.isnan(value) else (0, value)
+    text = str(value).strip()
+    try:
+        num = float(text)
+    except ValueError:
+        return (1, text.casefold())
+    return None if math.isnan(num) else (0, num)
+
+
+def select(rows: List[Dict[str, Any]], sort: str, order: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+    """rows[offset:offset + limit] as if `rows` were sorted by `sort`."""
+    stop = offset + limit
+    if sort == "index" or (sort == "score" and order == "desc"):
+        if order == "desc" and sort == "index":
+            n = len(rows)
+            return rows[max(0, n - stop):max(0, n - offset)][::-1]
+        return rows[offset:stop]
+
+    present: List[Tuple[Tuple[int, Any], Dict[str, Any]]] = []
+    missing: List[Dict[str, Any]] = []
+    for row in rows:
+        k = _value_key(row.get(sort))
+        if k is None:
+            missing.append(row)
+        else:
+            present.append((k, row))
+
+    pick = heapq.nsmallest if order == "asc" else heapq.nlargest
+    top = [row for _, row in pick(stop, present, key=lambda p: p[0])]
+    if len(top) < stop:
+        top.extend(missing[: stop - len(top)])
+    return top[offset:stop]
+
+
+def encode_cursor(ranking: str, sort: str, order: str, offset: int) -> str:
+    raw = json.dumps({"r": ranking[:16], "s": sort, "o": order, "n": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ranking: str, sort: str, order: str) -> int:
+    """Offset a cursor points at; ValueError if it is malformed or from another ranking or sort."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(data["n"])
+        same = (data["r"], data["s"], data["o"]) == (ranking[:16], sort, order)
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("malformed cursor") from None
+    if not same:
+        raise ValueError("cursor belongs to a different search or sort order")
+    if offset < 0:
+        raise ValueError("malformed cursor")
+    return offset
+
+
+def page(
+    rows: List[Dict[str, Any]],
+    ranking: str,
+    sort: str = "score",
+    order: str = "desc",
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    One page of `rows` under (sort, order): {"results", "total", "sort",
+    "order", "offset", "next_cursor"}. `ranking` identifies the list
+    (the score stage cache key) so cursors cannot cross searches.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"unknown sort key {sort!r}")
+    if order not in ORDERS:
+        raise ValueError(f"unknown sort order {order!r}")
+    limit = max(1, min(limit, MAX_LIMIT))
+    offset = decode_cursor(cursor, ranking, sort, order) if cursor else 0
+    results = select(rows, sort, order, offset, limit)
+    stop = offset + len(results)
+    return {
+        "results": results,
+        "total": len(rows),
+        "sort": sort,
+        "order": order,
+        "offset": offset,
+        "next_cursor": encode_cursor(ranking, sort, order, stop) if stop < len(rows) else None,
+    }
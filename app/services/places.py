@@ -1,11 +1,33 @@
+import asyncio
+import logging
 import os
-import requests
-from typing import Any, Dict, List
+import queue
+import time
+from typing import Any, Callable, Dict, Iterator, List, MutableMapping, Optional, Tuple
 
-from app.services.geo import geocode, haversine_miles
+import httpx
+
+from app.services import httpclient, metrics, quota, replay
+from app.services.candidate import record
+from app.services.geo import TEXTSEARCH_URL, geocode, geocode_async, nearest_anchor
+from app.settings import settings
 
 API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 
+logger = logging.getLogger(__name__)
+DROPPED_TOTAL = metrics.counter(
+    "venue_places_dropped_searches_total", "(anchor, query) searches skipped to stay within quota", ("query",)
+)
+
+# (target, query, candidates) for one finished (anchor, query) search
+Batch = Tuple[str, str, List[Dict[str, Any]]]
+# (target, anchor) pairs from geocoding
+Resolved = List[Tuple[str, Dict[str, Any]]]
+# (target, query) -> True when every page of that search came back OK/ZERO_RESULTS
+Searches = Dict[Tuple[str, str], bool]
+
+# Ordered by value: when a search's request budget cannot cover every
+# (anchor, query) pair, queries are dropped from the end of this list first.
 # We still bias discovery toward these query concepts,
 # but we will NOT use them as the final category label.
 QUERY_BASES = [
@@ -69,100 +91,438 @@ def _educationality_from_types(types: List[str]) -> float:
     return 0.5
 
 
-def discover(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """
-    Google Places Text Search with explicit location+radius.
-
-    - Uses QUERY_BASES (library, community college, etc.) to find candidates.
-    - For each result, we:
-        * compute distance via haversine
-        * HARD-FILTER by radius (miles)
-        * keep Google's own `types` list
-        * set `category` from the primary type (NOT from our query)
-        * derive an educationality score from the types
-    """
-    if not API_KEY:
-        return []
-
+def _search_plan(payload: Dict[str, Any]):
     cities = payload.get("cities") or []
     zips = payload.get("zips") or []
     radius_miles = int(payload.get("radius_miles", 6))
-    radius = _meters(radius_miles)
 
     # We either search by explicit cities or by ZIPs as free-form anchors
     targets = cities if cities else zips
-    out: List[Dict[str, Any]] = []
+    return targets, radius_miles, _meters(radius_miles)
+
+
+def resolve(targets: List[str], budget: Optional[quota.Budget] = None) -> Resolved:
+    """
+    Geocode every target at once on the shared provider I/O loop (serially
+    with PLACES_CONCURRENCY=1); targets without an anchor are left out.
+    Pass the result to discover(..., resolved=) so it is not looked up again.
+    """
+    if settings.places_concurrency <= 1:
+        found = [geocode(t, budget=budget) for t in targets]
+    else:
+        async def _all() -> List[Optional[Dict[str, Any]]]:
+            limit = asyncio.Semaphore(settings.places_concurrency)
+            c = httpclient.async_client()
+
+            async def _one(t: str) -> Optional[Dict[str, Any]]:
+                async with limit:
+                    return await geocode_async(t, c, budget=budget)
+
+            return await asyncio.gather(*(_one(t) for t in targets))
+
+        found = httpclient.run(_all())
+    return [(t, a) for t, a in zip(targets, found) if a]
+
+
+def _max_pages(payload: Dict[str, Any]) -> int:
+    """
+    Text Search pages to read per query: payload `max_pages`, else
+    settings.places_max_pages. Google serves at most 3 pages (60 results).
+    """
+    try:
+        n = int(payload.get("max_pages") or settings.places_max_pages)
+    except (TypeError, ValueError):
+        n = 1
+    return max(1, min(n, 3))
+
+
+def _search_params(q: str, anchor: Dict[str, Any], radius: int) -> Dict[str, Any]:
+    return {
+        "query": q,
+        "location": f"{anchor['lat']},{anchor['lng']}",
+        "radius": radius,
+        "key": API_KEY,
+    }
+
+
+def _page_params(token: str) -> Dict[str, Any]:
+    return {"pagetoken": token, "key": API_KEY}
+
+
+def _page_ok(data: Optional[Dict[str, Any]]) -> bool:
+    # None: budget/rate rejection or a failed call; other statuses are errors
+    return data is not None and data.get("status") in quota.CACHEABLE_STATUSES
+
+
+def _next_token(data: Dict[str, Any], batch: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Token for the following page, or None when we should stop: no token,
+    or every result on this page already fell outside the radius (results
+    come back roughly nearest-first, so later pages will only be farther).
+    """
+    token = data.get("next_page_token")
+    if not token:
+        return None
+    if data.get("results") and not batch:
+        return None
+    return token
 
-    for target in targets:
-        anchor = geocode(target)
-        if not anchor:
+
+def _planned_queries(budget: quota.Budget, n_anchors: int) -> List[str]:
+    """
+    The QUERY_BASES this search can afford: the first-page request of every
+    (anchor, query) pair must fit in what is left of the budget. Always at
+    least the top query; its anchors then run until the budget is spent.
+    """
+    left = budget.remaining()
+    if left is None or not n_anchors:
+        return list(QUERY_BASES)
+    k = max(1, min(len(QUERY_BASES), left // n_anchors))
+    if k < len(QUERY_BASES):
+        logger.warning(
+            "request budget %d covers %d of %d queries for %d anchors; dropping %s",
+            budget.limit,
+            k,
+            len(QUERY_BASES),
+            n_anchors,
+            ", ".join(QUERY_BASES[k:]),
+        )
+        for q in QUERY_BASES[k:]:
+            DROPPED_TOTAL.inc(q, amount=n_anchors)
+    return list(QUERY_BASES[:k])
+
+
+def _candidates_from_results(
+    data: Dict[str, Any],
+    target: str,
+    q: str,
+    anchors: List[Dict[str, Any]],
+    radius_miles: int,
+) -> List[MutableMapping[str, Any]]:
+    """
+    Turn one Text Search page into candidates (candidate.record()).
+
+    Distances are measured to the nearest of *all* search anchors in one
+    vectorized pass, and the radius filter keeps anything within
+    radius_miles of any anchor, not just the one whose query found it.
+    """
+    items = data.get("results", [])
+    out: List[MutableMapping[str, Any]] = []
+    if not items:
+        return out
+
+    coords = [item.get("geometry", {}).get("location", {}) for item in items]
+    lats = [c.get("lat") if c.get("lat") is not None else float("nan") for c in coords]
+    lngs = [c.get("lng") if c.get("lng") is not None else float("nan") for c in coords]
+    dists, _ = nearest_anchor(lats, lngs, anchors)
+
+    for item, c, dist in zip(items, coords, dists.tolist()):
+        # HARD FILTER: must be within radius_miles (NaN = no coordinates)
+        if not dist <= radius_miles:
             continue
 
-        lat, lng = anchor["lat"], anchor["lng"]
-
-        for q in QUERY_BASES:
-            url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-            params = {
-                "query": q,
-                "location": f"{lat},{lng}",
-                "radius": radius,
-                "key": API_KEY,
-            }
-            try:
-                r = requests.get(url, params=params, timeout=10)
-                r.raise_for_status()
-                data = r.json()
-            except Exception as e:
-                print(f"[places] error {e}")
-                continue
-
-            for item in data.get("results", []):
-                geo = item.get("geometry", {}).get("location", {})
-                vlat = geo.get("lat")
-                vlng = geo.get("lng")
-                dist = None
-                if vlat is not None and vlng is not None:
-                    dist = haversine_miles(lat, lng, vlat, vlng)
-
-                # HARD FILTER: must be within radius_miles
-                if dist is None or dist > radius_miles:
-                    continue
-
-                # Use Google's own place types for classification
-                types = item.get("types") or []
-                if not isinstance(types, list):
-                    types = []
-
-                primary_type = types[0] if types else None
-
-                # IMPORTANT: category is based on Google's types,
-                # NOT on the query (q).
-                category = primary_type
-
-                educationality = _educationality_from_types(types)
-
-                out.append(
-                    {
-                        "name": item.get("name"),
-                        "address": item.get("formatted_address"),
-                        "place_id": item.get("place_id"),
-                        "lat": vlat,
-                        "lng": vlng,
-                        "city": target,
-                        "category": category,          # what Google thinks it is
-                        "types": types,                # full type list from Google
-                        "query_category": q,           # which search query found it
-                        "website_url": None,
-                        "phone": None,
-                        "availability_status": "unknown",
-                        "educationality": educationality,
-                        "distance_miles": round(dist, 2) if dist is not None else None,
-                        "source": "google",
-                    }
-                )
+        # Use Google's own place types for classification
+        types = item.get("types") or []
+        if not isinstance(types, list):
+            types = []
+
+        primary_type = types[0] if types else None
+
+        # IMPORTANT: category is based on Google's types,
+        # NOT on the query (q).
+        category = primary_type
+
+        educationality = _educationality_from_types(types)
+
+        out.append(
+            record(
+                name=item.get("name"),
+                address=item.get("formatted_address"),
+                place_id=item.get("place_id"),
+                lat=c.get("lat"),
+                lng=c.get("lng"),
+                city=target,
+                category=category,          # what Google thinks it is
+                types=types,                # full type list from Google
+                query_category=q,           # which search query found it
+                website_url=None,
+                phone=None,
+                availability_status="unknown",
+                educationality=educationality,
+                distance_miles=round(dist, 2),
+                source="google",
+            )
+        )
 
     return out
 
 
+def _get_json_serial(params: Dict[str, Any], budget: Optional[quota.Budget] = None) -> Optional[Dict[str, Any]]:
+    attempts = settings.places_page_token_retries + 1 if "pagetoken" in params else 1
+    for attempt in range(attempts):
+        data = quota.get_json(TEXTSEARCH_URL, params, budget=budget)
+        if data is None:
+            return None
+        # A fresh next_page_token is rejected until Google activates it
+        if data.get("status") == "INVALID_REQUEST" and attempt + 1 < attempts:
+            time.sleep(settings.places_page_token_delay)
+            continue
+        return data
+    return None
+
+
+def _iter_serial(
+    payload: Dict[str, Any], resolved: Optional[Resolved] = None, searches: Optional[Searches] = None
+) -> Iterator[Batch]:
+    targets, radius_miles, radius = _search_plan(payload)
+    max_pages = _max_pages(payload)
+    budget = quota.Budget()
+    if resolved is None:
+        resolved = [(t, a) for t, a in ((t, geocode(t, budget=budget)) for t in targets) if a]
+    anchors = [a for _, a in resolved]
+    queries = _planned_queries(budget, len(resolved))
+
+    for target, anchor in resolved:
+        for q in queries:
+            out: List[Dict[str, Any]] = []
+            complete = True
+            params = _search_params(q, anchor, radius)
+            for page in range(max_pages):
+                data = _get_json_serial(params, budget)
+                complete = complete and _page_ok(data)
+                if data is None:
+                    break
+
+                batch = _candidates_from_results(data, target, q, anchors, radius_miles)
+                out.extend(batch)
+
+                token = _next_token(data, batch)
+                if not token or page + 1 >= max_pages:
+                    break
+                params = _page_params(token)
+                time.sleep(settings.places_page_token_delay)
+            if searches is not None:
+                searches[(target, q)] = complete
+            yield target, q, out
+    _report_budget(budget)
+
+
+def _report_budget(budget: quota.Budget) -> None:
+    if budget.rejected:
+        logger.warning("request budget %d spent; %d calls skipped, results are partial", budget.limit, budget.rejected)
+
+
+def discover_serial(
+    payload: Dict[str, Any], resolved: Optional[Resolved] = None, searches: Optional[Searches] = None
+) -> List[Dict[str, Any]]:
+    """
+    Blocking, one-call-at-a-time discovery.
+
+    Kept as the reference implementation for discover_async(): both must
+    return the same candidates in the same order.
+    """
+    if not (API_KEY or replay.offline()):
+        return []
+    return [cand for _, _, batch in _iter_serial(payload, resolved, searches) for cand in batch]
+
+
+async def _get_json_async(
+    client: httpx.AsyncClient,
+    limit: asyncio.Semaphore,
+    params: Dict[str, Any],
+    budget: Optional[quota.Budget] = None,
+) -> Optional[Dict[str, Any]]:
+    attempts = settings.places_page_token_retries + 1 if "pagetoken" in params else 1
+    for attempt in range(attempts):
+        async with limit:
+            data = await quota.aget_json(TEXTSEARCH_URL, params, client=client, budget=budget)
+        if data is None:
+            return None
+        # The wait happens outside the semaphore so other queries keep going
+        if data.get("status") == "INVALID_REQUEST" and attempt + 1 < attempts:
+            await asyncio.sleep(settings.places_page_token_delay)
+            continue
+        return data
+    return None
+
+
+async def _search_query_async(
+    client: httpx.AsyncClient,
+    limit: asyncio.Semaphore,
+    target: str,
+    q: str,
+    anchor: Dict[str, Any],
+    anchors: List[Dict[str, Any]],
+    radius: int,
+    radius_miles: int,
+    max_pages: int,
+    budget: Optional[quota.Budget] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """One (anchor, query) search: its candidates and whether every page came back."""
+    out: List[Dict[str, Any]] = []
+    complete = True
+    params = _search_params(q, anchor, radius)
+    for page in range(max_pages):
+        data = await _get_json_async(client, limit, params, budget)
+        complete = complete and _page_ok(data)
+        if data is None:
+            break
+
+        batch = _candidates_from_results(data, target, q, anchors, radius_miles)
+        out.extend(batch)
+
+        token = _next_token(data, batch)
+        if not token or page + 1 >= max_pages:
+            break
+        params = _page_params(token)
+        await asyncio.sleep(settings.places_page_token_delay)
+    return out, complete
+
+
+async def discover_async(
+    payload: Dict[str, Any],
+    client: Optional[httpx.AsyncClient] = None,
+    concurrency: Optional[int] = None,
+    on_batch: Optional[Callable[[str, str, List[Dict[str, Any]]], None]] = None,
+    resolved: Optional[Resolved] = None,
+    searches: Optional[Searches] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Concurrent discovery engine.
+
+    All targets are geocoded in parallel (usually straight from geocache),
+    then every (anchor, query) search is fired together, so a search costs
+    roughly one geocode plus one Text Search round trip instead of their
+    sum. At most `concurrency` requests (default: settings.places_concurrency)
+    are in flight at once. Output order matches discover_serial().
+
+    With pagination enabled (see _max_pages) each query follows its own
+    next_page_token chain; the token activation delay only holds up that
+    chain, not the other queries.
 
+    `on_batch(target, query, candidates)` is called as each (anchor, query)
+    search completes, in completion order.
 
+    `resolved` (from resolve()) skips geocoding. `searches`, when given, is
+    filled with (target, query) -> whether that search ran to the end; a
+    query dropped for budget does not appear at all.
+
+    Every call draws on one quota.Budget and the process-wide rate limit;
+    searches are started highest-value query first, so under pressure it
+    is the tail of QUERY_BASES that gets dropped.
+    """
+    if not (API_KEY or replay.offline()):
+        return []
+
+    targets, radius_miles, radius = _search_plan(payload)
+    max_pages = _max_pages(payload)
+    limit = asyncio.Semaphore(max(1, concurrency or settings.places_concurrency))
+    budget = quota.Budget()
+
+    async def _geocode(c: httpx.AsyncClient, target: str) -> Optional[Dict[str, Any]]:
+        async with limit:
+            return await geocode_async(target, c, budget=budget)
+
+    async def _run(c: httpx.AsyncClient, resolved: Optional[Resolved]) -> List[Dict[str, Any]]:
+        if resolved is None:
+            found = await asyncio.gather(*(_geocode(c, t) for t in targets))
+            resolved = [(t, a) for t, a in zip(targets, found) if a]
+        anchors = [a for _, a in resolved]
+        queries = _planned_queries(budget, len(resolved))
+
+        async def _search(t: str, q: str, a: Dict[str, Any]) -> List[Dict[str, Any]]:
+            batch, complete = await _search_query_async(
+                c, limit, t, q, a, anchors, radius, radius_miles, max_pages, budget
+            )
+            if searches is not None:
+                searches[(t, q)] = complete
+            if on_batch is not None:
+                on_batch(t, q, batch)
+            return batch
+
+        # created query-major so the semaphore admits top queries first;
+        # results are still returned anchor-major like discover_serial()
+        tasks = {
+            (i, j): asyncio.ensure_future(_search(t, q, a))
+            for j, q in enumerate(queries)
+            for i, (t, a) in enumerate(resolved)
+        }
+        await asyncio.gather(*tasks.values())
+        _report_budget(budget)
+        return [
+            cand
+            for i in range(len(resolved))
+            for j in range(len(queries))
+            for cand in tasks[(i, j)].result()
+        ]
+
+    if client is not None:
+        return await _run(client, resolved)
+    if httpclient.on_io_loop():
+        return await _run(httpclient.async_client(), resolved)
+    async with httpclient.new_async_client() as c:
+        return await _run(c, resolved)
+
+
+def discover(
+    payload: Dict[str, Any], resolved: Optional[Resolved] = None, searches: Optional[Searches] = None
+) -> List[Dict[str, Any]]:
+    """
+    Google Places Text Search with explicit location+radius.
+
+    - Uses QUERY_BASES (library, community college, etc.) to find candidates.
+    - For each result, we:
+        * compute distance to the nearest anchor via haversine
+        * HARD-FILTER by radius (miles) of any anchor
+        * keep Google's own `types` list
+        * set `category` from the primary type (NOT from our query)
+        * derive an educationality score from the types
+    - Reads up to `max_pages` result pages per query (opt-in, default 1).
+
+    Calls are fanned out through discover_async() on the shared provider
+    I/O loop (app.services.httpclient); set PLACES_CONCURRENCY=1 to fall
+    back to the serial path.
+
+    `resolved` and `searches` are passed through to discover_async().
+    """
+    if settings.places_concurrency <= 1:
+        return discover_serial(payload, resolved, searches)
+    return httpclient.run(discover_async(payload, resolved=resolved, searches=searches))
+
+
+def iter_discover(
+    payload: Dict[str, Any], resolved: Optional[Resolved] = None, searches: Optional[Searches] = None
+) -> Iterator[Batch]:
+    """
+    Like discover(), but yields (target, query, candidates) batches as each
+    (anchor, query) search finishes instead of waiting for all of them.
+    """
+    if not (API_KEY or replay.offline()):
+        return
+    if settings.places_concurrency <= 1:
+        yield from _iter_serial(payload, resolved, searches)
+        return
+
+    batches: "queue.Queue[Any]" = queue.Queue()
+    done = object()
+
+    async def _produce() -> None:
+        try:
+            await discover_async(
+                payload, on_batch=lambda t, q, b: batches.put((t, q, b)), resolved=resolved, searches=searches
+            )
+        finally:
+            batches.put(done)
+
+    fut = httpclient.submit(_produce())
+    try:
+        while True:
+            item = batches.get()
+            if item is done:
+                break
+            yield item
+        fut.result()
+    finally:
+        # consumer went away early (e.g. client disconnected)
+        if not fut.done():
+            fut.cancel()
@@ -0,0 +1,309 @@
+"""
+Google Places quota: a process-wide token bucket plus a per-search budget.
+
+Every Text Search and geocode call goes through get_json()/aget_json():
+
+1. the search's Budget (if any) must have a request left;
+2. the shared TokenBucket hands out PLACES_QPS tokens per second (bursts
+   up to PLACES_BURST), waiting at most PLACES_QUOTA_WAIT for one;
+3. HTTP 429 or a body status of OVER_QUERY_LIMIT pauses the whole bucket
+   with exponential backoff, then the call is retried (each retry also
+   draws on the budget). Any success resets the backoff.
+
+A call that cannot get a budget slot or token, or is still throttled after
+PLACES_THROTTLE_RETRIES, returns None like any other provider failure.
+places.py then drops that search instead of failing the whole discovery.
+
+In front of all that, identical requests (same op, URL and parameters,
+API key aside) are coalesced: a successful answer is reused for
+PLACES_RESPONSE_TTL seconds, and a request that is already in flight, in
+any thread or on the I/O loop, is joined rather than repeated
+(cache.SingleFlight). Only the leader's call spends budget and tokens.
+Returned dicts are shared between callers and must not be modified.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+
+import httpx
+
+from app.services import httpclient, metrics
+from app.services.cache import MISSING, SingleFlight, TTLCache
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 429 is handled here (shared backoff), not by httpclient's per-call retry
+RETRY_STATUSES = frozenset(httpclient.RETRY_STATUSES - {429})
+
+THROTTLED_TOTAL = metrics.counter(
+    "venue_places_throttled_total", "Provider responses that were 429 or OVER_QUERY_LIMIT", ("op",)
+)
+REJECTED_TOTAL = metrics.counter(
+    "venue_places_quota_rejected_total", "Calls not made for lack of budget or rate-limit tokens", ("op", "reason")
+)
+COALESCED_TOTAL = metrics.counter(
+    "venue_places_coalesced_total", "Calls answered without a request of their own", ("op", "via")
+)
+# Google statuses worth reusing; errors and unactivated page tokens are not
+CACHEABLE_STATUSES = ("OK", "ZERO_RESULTS")
+
+
+class QuotaExceeded(RuntimeError):
+    """No budget or rate-limit token left for this call."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"places quota: {reason}")
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; rate <= 0 means unlimited. throttled() blocks
+    every caller until a backoff has passed, so one 429 slows the whole
+    process down instead of each request retrying on its own.
+    """
+
+    def __init__(self, rate: float, burst: int, backoff: float = 1.0, max_backoff: float = 30.0):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return 0, or return the seconds to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self.rate <= 0:
+                return 0.0
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def throttled(self) -> float:
+        """Record a rate-limit response; returns the pause applied to everyone."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                # sent before the current pause began: already accounted for
+                return self._blocked_until - now
+            self._strikes += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (self._strikes - 1))
+            delay += random.uniform(0, delay / 4)
+            self._blocked_until = now + delay
+            self._tokens = 0.0
+            return delay
+
+    def ok(self) -> None:
+        if self._strikes:
+            with self._lock:
+                self._strikes = 0
+
+
+class Budget:
+    """Request allowance for one search; limit <= 0 means unlimited."""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = settings.places_search_budget if limit is None else limit
+        self.used = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.limit > 0 and self.used >= self.limit:
+                self.rejected += 1
+                return False
+            self.used += 1
+            return True
+
+    def remaining(self) -> Optional[int]:
+        """Requests left, or None when unlimited."""
+        if self.limit <= 0:
+            return None
+        with self._lock:
+            return max(0, self.limit - self.used)
+
+
+bucket = TokenBucket(
+    settings.places_qps,
+    settings.places_burst,
+    backoff=settings.places_throttle_backoff,
+    max_backoff=settings.places_throttle_max_backoff,
+)
+
+
+def _take_budget(budget: Optional[Budget], op: str) -> None:
+    if budget is not None and not budget.take():
+        REJECTED_TOTAL.inc(op, "budget")
+        raise QuotaExceeded("search budget spent")
+
+
+def _throttled(r: httpx.Response, data: Dict[str, Any]) -> bool:
+    return r.status_code == 429 or data.get("status") == "OVER_QUERY_LIMIT"
+
+
+def _decode(r: httpx.Response) -> Dict[str, Any]:
+    if r.status_code == 429:
+        return {}
+    r.raise_for_status()
+    return r.json()
+
+
+def _on_throttle(op: str, tries_left: int) -> None:
+    THROTTLED_TOTAL.inc(op)
+    delay = bucket.throttled()
+    if tries_left:
+        logger.info("%s throttled, pausing provider calls %.1fs", op, delay)
+
+
+_responses = TTLCache(maxsize=settings.places_response_cache_size, ttl=settings.places_response_ttl)
+_flights = SingleFlight()
+
+
+def _request_key(op: str, url: str, params: Dict[str, Any]) -> Hashable:
+    return op, url, tuple(sorted((k, str(v)) for k, v in params.items() if k != "key"))
+
+
+def _remember(key: Hashable, data: Dict[str, Any]) -> None:
+    if settings.places_response_ttl > 0 and data.get("status") in CACHEABLE_STATUSES:
+        _responses.set(key, data, ttl=settings.places_response_ttl)
+
+
+def _cached(key: Hashable, op: str) -> Any:
+    if settings.places_response_ttl <= 0:
+        return MISSING
+    data = _responses.get(key)
+    if data is not MISSING:
+        COALESCED_TOTAL.inc(op, "cache")
+    return data
+
+
+def clear_responses() -> None:
+    _responses.clear()
+
+
+def get_json(url: str, params: Dict[str, Any], budget: Optional[Budget] = None, op: str = "textsearch") -> Optional[Dict[str, Any]]:
+    """Blocking provider GET under the quota; parsed JSON, or None if it failed or was not allowed."""
+    key = _request_key(op, url, params)
+    data = _cached(key, op)
+    if data is not MISSING:
+        return data
+    data, shared = _flights.do(key, lambda: _fetch(key, url, params, budget, op))
+    if shared:
+        COALESCED_TOTAL.inc(op, "in_flight")
+    return data
+
+
+async def aget_json(
+    url: str,
+    params: Dict[str, Any],
+    client: Optional[httpx.AsyncClient] = None,
+    budget: Optional[Budget] = None,
+    op: str = "textsearch",
+) -> Optional[Dict[str, Any]]:
+    """Async twin of get_json()."""
+    key = _request_key(op, url, params)
+    data = _cached(key, op)
+    if data is not MISSING:
+        return data
+    data, shared = await _flights.ado(key, lambda: _afetch(key, url, params, client, budget, op))
+    if shared:
+        COALESCED_TOTAL.inc(op, "in_flight")
+    return data
+
+
+def _fetch(key: Hashable, url: str, params: Dict[str, Any], budget: Optional[Budget], op: str) -> Optional[Dict[str, Any]]:
+    tries = settings.places_throttle_retries
+    while True:
+        try:
+            _take_budget(budget, op)
+            if not bucket.acquire(settings.places_quota_wait):
+                REJECTED_TOTAL.inc(op, "rate")
+                raise QuotaExceeded("no rate-limit token in time")
+            r = httpclient.get(url, params=params, op=op, retry_statuses=RETRY_STATUSES)
+            data = _decode(r)
+        except QuotaExceeded as e:
+            logger.info("%s skipped: %s", op, e.reason)
+            return None
+        except Exception as e:
+            logger.warning("%s failed: %s", op, e)
+            return None
+        if _throttled(r, data):
+            _on_throttle(op, tries)
+            if tries <= 0:
+                logger.warning("%s still throttled after %d retries", op, settings.places_throttle_retries)
+                return None
+            tries -= 1
+            continue
+        bucket.ok()
+        _remember(key, data)
+        return data
+
+
+async def _afetch(
+    key: Hashable,
+    url: str,
+    params: Dict[str, Any],
+    client: Optional[httpx.AsyncClient],
+    budget: Optional[Budget],
+    op: str,
+) -> Optional[Dict[str, Any]]:
+    tries = settings.places_throttle_retries
+    while True:
+        try:
+            _take_budget(budget, op)
+            if not await bucket.acquire_async(settings.places_quota_wait):
+                REJECTED_TOTAL.inc(op, "rate")
+                raise QuotaExceeded("no rate-limit token in time")
+            r = await httpclient.aget(url, params=params, client=client, op=op, retry_statuses=RETRY_STATUSES)
+            data = _decode(r)
+        except QuotaExceeded as e:
+            logger.info("%s skipped: %s", op, e.reason)
+            return None
+        except Exception as e:
+            logger.warning("%s failed: %s", op, e)
+            return None
+        if _throttled(r, data):
+            _on_throttle(op, tries)
+            if tries <= 0:
+                logger.warning("%s still throttled after %d retries", op, settings.places_throttle_retries)
+                return None
+            tries -= 1
+            continue
+        bucket.ok()
+        _remember(key, data)
+        return data
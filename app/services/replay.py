@@ -0,0 +1,239 @@
+"""
+Provider record/replay for offline runs, regression checks and benchmarks.
+
+PROVIDER_MODE selects the httpx transport that httpclient builds its
+clients with:
+
+- live   - plain network transport (default)
+- record - network transport that also writes each response to a fixture
+           file under PROVIDER_FIXTURES
+- replay - no network: responses are read back from the fixtures, after
+           an injected PROVIDER_REPLAY_LATENCY (+/- PROVIDER_REPLAY_JITTER)
+
+A fixture is keyed on method, host name (not port), path and the sorted
+query string with the API key removed, so fixtures recorded against one
+key or one mock-server port replay under another. Recording the same
+request again overwrites the file; the last response wins, which is the
+one that ended a page-token or 5xx retry loop. A request with no fixture
+gets a 404 so callers take their normal error path.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MODES = ("live", "record", "replay")
+# query parameters that never go into a fixture or its key
+REDACTED_PARAMS = {"key"}
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "location")
+
+_lock = threading.Lock()
+_loaded: Dict[str, Optional[Dict[str, Any]]] = {}
+_counters: Dict[str, int] = {"recorded": 0, "replayed": 0, "missing": 0}
+
+
+def mode() -> str:
+    m = (settings.provider_mode or "live").lower()
+    if m not in MODES:
+        raise ValueError(f"PROVIDER_MODE must be one of {MODES}, got {m!r}")
+    return m
+
+
+def offline() -> bool:
+    """True when provider calls are answered from fixtures (no API key needed)."""
+    return mode() == "replay"
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def _clean_query(url: httpx.URL) -> str:
+    pairs = sorted((k, v) for k, v in url.params.multi_items() if k not in REDACTED_PARAMS)
+    return urlencode(pairs)
+
+
+def fixture_key(request: httpx.Request) -> Tuple[str, str]:
+    """(host directory, file stem) for a request."""
+    url = request.url
+    raw = f"{request.method} {url.host}{url.path}?{_clean_query(url)}"
+    return url.host or "_", hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def fixture_path(request: httpx.Request) -> str:
+    host, stem = fixture_key(request)
+    return os.path.join(settings.provider_fixtures, host, f"{stem}.json")
+
+
+def clear_loaded() -> None:
+    """Forget fixtures read so far (e.g. after re-recording)."""
+    with _lock:
+        _loaded.clear()
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+def _save(request: httpx.Request, response: httpx.Response) -> None:
+    body = response.content
+    try:
+        text: Optional[str] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        text = None
+    url = request.url
+    fixture = {
+        "method": request.method,
+        "url": f"{url.scheme}://{url.host}{url.path}?{_clean_query(url)}",
+        "status": response.status_code,
+        "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+        "body": text,
+        "body_b64": None if text is not None else base64.b64encode(body).decode("ascii"),
+        "recorded_at": time.time(),
+    }
+    path = fixture_path(request)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.part"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(fixture, fh, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    with _lock:
+        _loaded[path] = fixture
+    _count("recorded")
+
+
+def _load(request: httpx.Request) -> Optional[Dict[str, Any]]:
+    path = fixture_path(request)
+    with _lock:
+        if path in _loaded:
+            return _loaded[path]
+    try:
+        with open(path, encoding="utf-8") as fh:
+            fixture = json.load(fh)
+    except FileNotFoundError:
+        fixture = None
+    except Exception as e:
+        logger.warning("unreadable fixture %s: %s", path, e)
+        fixture = None
+    with _lock:
+        _loaded[path] = fixture
+    return fixture
+
+
+def _recorded(request: httpx.Request, response: httpx.Response) -> httpx.Response:
+    # the body has been decoded already, so drop content-encoding/length
+    try:
+        _save(request, response)
+    except Exception as e:
+        logger.warning("could not record %s%s: %s", request.url.host, request.url.path, e)
+    headers = {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers}
+    return httpx.Response(response.status_code, headers=headers, content=response.content, request=request)
+
+
+def _replayed(request: httpx.Request) -> httpx.Response:
+    fixture = _load(request)
+    if fixture is None:
+        _count("missing")
+        logger.warning("no fixture for %s %s%s?%s", request.method, request.url.host, request.url.path, _clean_query(request.url))
+        return httpx.Response(
+            404, json={"status": "NOT_FOUND", "error_message": "no replay fixture"}, request=request
+        )
+    _count("replayed")
+    body = fixture["body"].encode("utf-8") if fixture.get("body") is not None else base64.b64decode(fixture["body_b64"])
+    return httpx.Response(fixture["status"], headers=fixture.get("headers") or {}, content=body, request=request)
+
+
+def _delay() -> float:
+    latency = settings.provider_replay_latency
+    if latency <= 0:
+        return 0.0
+    jitter = settings.provider_replay_jitter
+    return max(0.0, latency * (1 + random.uniform(-jitter, jitter))) if jitter else latency
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+
+
+class RecordTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport):
+        self.inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.inner.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        return _recorded(request, response)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class AsyncRecordTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        return _recorded(request, response)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay = _delay()
+        if delay:
+            time.sleep(delay)
+        return _replayed(request)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = _delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return _replayed(request)
+
+
+def transport(is_async: bool, **network: Any):
+    """
+    Transport for the current PROVIDER_MODE, or None for httpx's default.
+    `network` (http2, limits) configures the real transport in record mode.
+    """
+    m = mode()
+    if m == "replay":
+        return AsyncReplayTransport() if is_async else ReplayTransport()
+    if m == "record":
+        if is_async:
+            return AsyncRecordTransport(httpx.AsyncHTTPTransport(**network))
+        return RecordTransport(httpx.HTTPTransport(**network))
+    return None
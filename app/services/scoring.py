@@ -1,3 +1,8 @@
+import numpy as np
+import pandas as pd
+
+from app.services.candidate import columns
+
 EDU_WEIGHTS = {
     "library": 1.0,
     "community_college": 0.9,
@@ -63,3 +68,152 @@ def score(v: dict):
     comps = {"educationality": edu, "availability": avail, "capacity_fit": cap, "amenities": am, "logistics": log}
     reason = f"Edu:{edu:.2f} Avail:{avail:.2f} Cap:{cap:.2f} Ams:{am:.2f} Log:{log:.2f}"
     return total, reason, comps
+
+# ---------------------------------------------------------------------------
+# Batch scoring
+# ---------------------------------------------------------------------------
+
+AVAILABILITY_SCORES = {"available": 1.0, "maybe": 0.6, "not_available": 0.0}
+AMENITY_KEYS = ["projector", "screen_tv", "wifi", "tables_chairs"]
+COMPONENT_COLUMNS = ["educationality", "availability", "capacity_fit", "amenities", "logistics"]
+# venue fields the vectorized scorer reads
+INPUT_COLUMNS = ["category", "educationality", "availability_status", "amenities",
+                 "rooms", "parking_notes", "distance_miles"]
+
+
+def _components(venues: list):
+    """(n, 5) float array of score components, columns in COMPONENT_COLUMNS order."""
+    # columns() gives None for a missing key, as v.get() does; from_records
+    # would give NaN, which is truthy where score() tests `x or {}`
+    cols = pd.DataFrame(columns(venues, INPUT_COLUMNS), columns=INPUT_COLUMNS)
+    return components_from_columns(cols)
+
+
+def components_from_columns(cols: pd.DataFrame):
+    """_components() over a frame that already holds the INPUT_COLUMNS."""
+    n = len(cols)
+
+    # Educationality: explicit value unless missing/zero, then category weight
+    edu = pd.to_numeric(cols["educationality"], errors="coerce").to_numpy(dtype=float)
+    fallback = (
+        cols["category"].fillna("").str.lower().map(EDU_WEIGHTS).fillna(0.5).to_numpy(dtype=float)
+    )
+    edu = np.where(np.isnan(edu) | (edu == 0.0), fallback, edu)
+
+    avail = cols["availability_status"].map(AVAILABILITY_SCORES).fillna(0.5).to_numpy(dtype=float)
+
+    ams = [a or {} for a in cols["amenities"].tolist()]
+    am_raw = pd.DataFrame.from_records(ams, columns=AMENITY_KEYS, nrows=n).to_numpy(dtype=object)
+    am_hits = ~pd.isna(am_raw) & am_raw.astype(bool)
+    am_present = np.fromiter((bool(a) for a in ams), dtype=bool, count=n)
+    am = np.where(am_present, np.minimum(1.0, 0.25 * am_hits.sum(axis=1)), 0.0)
+
+    # Rooms flattened to one row each, then max-reduced back onto their venue
+    room_lists = [r or [] for r in cols["rooms"].tolist()]
+    counts = np.fromiter((len(r) for r in room_lists), dtype=np.int64, count=n)
+    cap = np.zeros(n, dtype=float)
+    if counts.sum():
+        rooms = pd.DataFrame.from_records(
+            [r for rs in room_lists for r in rs], columns=["capacity_classroom", "capacity_theater"]
+        )
+        c_class = pd.to_numeric(rooms["capacity_classroom"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        c_theater = pd.to_numeric(rooms["capacity_theater"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        room_score = np.where(
+            (c_class >= 20) & (c_class <= 30), 1.0, np.where(c_theater >= 26, 0.7, 0.0)
+        )
+        np.maximum.at(cap, np.repeat(np.arange(n), counts), room_score)
+
+    parking = cols["parking_notes"].fillna("").astype(bool).to_numpy()
+    dist = cols["distance_miles"].to_numpy(dtype=object)
+    # mirror `distance_miles or 999`: None, NaN and 0 all count as unknown
+    dist = pd.to_numeric(pd.Series(dist), errors="coerce").replace(0, np.nan).fillna(999).to_numpy(dtype=float)
+    log = np.minimum(1.0, 0.6 + np.where(parking, 0.2, 0.0) + np.where(dist <= 6, 0.2, 0.0))
+
+    return np.column_stack([edu, avail, cap, am, log])
+
+
+def _combos(components):
+    """
+    The components only take a handful of distinct values, so totals (with
+    Python's round(), to stay bit-identical with score()) and reason strings
+    are computed once per distinct combination and broadcast back.
+
+    Returns (inverse, [(total, reason, comps), ...]) with one entry per combo.
+    """
+    n = components.shape[0]
+    key = np.zeros(n, dtype=np.int64)
+    for j in range(components.shape[1]):
+        codes, uniques = pd.factorize(components[:, j])
+        # re-factorize each step so the combined key never overflows
+        key = pd.factorize(key * (len(uniques) + 1) + codes)[0]
+    inverse = key
+    _, first = np.unique(inverse, return_index=True)
+
+    combos = []
+    for e, a, c, m, l in components[first].tolist():
+        total = round(e*0.35 + a*0.25 + c*0.20 + m*0.15 + l*0.05, 4)
+        reason = f"Edu:{e:.2f} Avail:{a:.2f} Cap:{c:.2f} Ams:{m:.2f} Log:{l:.2f}"
+        comps = {"educationality": e, "availability": a, "capacity_fit": c, "amenities": m, "logistics": l}
+        combos.append((total, reason, comps))
+    return inverse, combos
+
+
+def score_frame(venues: list):
+    """
+    Score many venues at once with NumPy/pandas column operations.
+
+    Returns a DataFrame (one row per venue, same order) with the five
+    component columns, `total` and `reason_text`, matching score().
+    """
+    components = _components(venues)
+    df = pd.DataFrame(components, columns=COMPONENT_COLUMNS)
+    if len(df):
+        inverse, combos = _combos(components)
+        df["total"] = np.array([t for t, _, _ in combos], dtype=float)[inverse]
+        df["reason_text"] = np.array([r for _, r, _ in combos], dtype=object)[inverse]
+    else:
+        df["total"] = np.empty(0)
+        df["reason_text"] = np.empty(0, dtype=object)
+    return df
+
+
+def score_columns(cols: pd.DataFrame):
+    """Score a frame of INPUT_COLUMNS: (inverse, combos) as described in _combos()."""
+    return _combos(components_from_columns(cols))
+
+
+def score_combos(venues: list):
+    """score_batch() without the per-row tuples: (inverse, combos) as described in _combos()."""
+    return _combos(_components(venues))
+
+
+def output_fields(combos: list) -> list:
+    """
+    Per (total, reason, comps) combo, the fields the ranking writes onto a
+    venue: score, score_reason and the component columns under the names
+    the UI shows. Missing components (a failed score) come out as None.
+    """
+    return [
+        {
+            "score": total,
+            "score_reason": reason,
+            "educationality": comps.get("educationality"),
+            "availability_score": comps.get("availability"),
+            "capacity_score": comps.get("capacity_fit"),
+            "amenities_score": comps.get("amenities"),
+            "logistics_score": comps.get("logistics"),
+        }
+        for total, reason, comps in combos
+    ]
+
+
+def score_batch(venues: list) -> list:
+    """Batch counterpart of score(): a list of (total, reason, comps) tuples."""
+    if not venues:
+        return []
+    inverse, combos = _combos(_components(venues))
+    out = []
+    for i in inverse.tolist():
+        total, reason, comps = combos[i]
+        out.append((total, reason, dict(comps)))
+    return out
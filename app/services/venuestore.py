@@ -0,0 +1,214 @@
+"""
+Bulk persistence of pipeline venues into the venues/rooms tables.
+
+upsert_venues() writes candidates keyed on merge.merge_key() (the Google
+place_id when there is one) in batches of PERSIST_BATCH rows:
+
+- SQLite and Postgres: one executemany INSERT ... ON CONFLICT (merge_key)
+  DO UPDATE per batch. A stored value is only replaced by a non-null one,
+  so a sparse later source never blanks what an earlier one found.
+- Other databases: look up the batch's existing keys, then executemany an
+  INSERT for the new rows and an UPDATE for the rest.
+
+Venues that carry a "rooms" list get their rooms replaced in bulk as well.
+
+That is the one write path for venue rows: app.services.catalog stores
+discovery candidates with it, and crawled fields and rooms go through
+app.services.enrichstore. Ranked output only updates scores
+(save_scores()), because by then extract.enrich() has filled in defaults,
+among them a placeholder room, that must not overwrite stored data.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.deps import engine, ensure_table
+from app.db.models import Room, Venue
+from app.services.merge import merge_key
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+VENUES = Venue.__table__
+ROOMS = Room.__table__
+# everything a candidate may carry; id, merge_key and the enrichment bookkeeping are ours
+VENUE_COLUMNS = [c.name for c in VENUES.columns if c.name not in ("id", "merge_key", "content_hash", "enriched_at")]
+ROOM_COLUMNS = [c.name for c in ROOMS.columns if c.name not in ("id", "venue_id")]
+# rank._score_stage output names -> venues columns / score component names
+SCORE_ALIASES = {"score_total": "score", "reason_text": "score_reason"}
+COMPONENT_ALIASES = {
+    "educationality": "educationality",
+    "availability": "availability_score",
+    "capacity_fit": "capacity_score",
+    "amenities": "amenities_score",
+    "logistics": "logistics_score",
+}
+
+_lock = threading.Lock()
+_tables_ready = False
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _ensure_tables() -> bool:
+    global _tables_ready
+    if _tables_ready:
+        return True
+    with _lock:
+        if not _tables_ready:
+            try:
+                ensure_table(VENUES)
+                ensure_table(ROOMS)
+                _tables_ready = True
+            except Exception as e:
+                logger.warning("tables unavailable: %s", e)
+    return _tables_ready
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def venue_row(v: Dict[str, Any]) -> Dict[str, Any]:
+    row = {c: v.get(c) for c in VENUE_COLUMNS}
+    for col, key in SCORE_ALIASES.items():
+        if row[col] is None:
+            row[col] = v.get(key)
+    if row["score_components"] is None and "score" in v:
+        row["score_components"] = {comp: v.get(key) for comp, key in COMPONENT_ALIASES.items()}
+    row["name"] = row["name"] or v.get("website_url") or ""
+    row["merge_key"] = merge_key(v)
+    return row
+
+
+def _upsert_statement(dialect: str):
+    mod = sqlite if dialect == "sqlite" else postgresql
+    stmt = mod.insert(VENUES)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[VENUES.c.merge_key],
+        set_={c: func.coalesce(excluded[c], VENUES.c[c]) for c in VENUE_COLUMNS},
+    )
+
+
+def _upsert_generic(conn, rows: List[Dict[str, Any]]) -> None:
+    keys = [r["merge_key"] for r in rows]
+    existing = set(conn.execute(select(VENUES.c.merge_key).where(VENUES.c.merge_key.in_(keys))).scalars())
+    new = [r for r in rows if r["merge_key"] not in existing]
+    old = [dict(r, _key=r["merge_key"]) for r in rows if r["merge_key"] in existing]
+    if new:
+        conn.execute(insert(VENUES), new)
+    if old:
+        stmt = update(VENUES).where(VENUES.c.merge_key == bindparam("_key")).values(
+            {c: bindparam(c) for c in VENUE_COLUMNS}
+        )
+        conn.execute(stmt, old)
+
+
+def _replace_rooms(conn, ids: Dict[str, int], rooms_by_key: Dict[str, List[Dict[str, Any]]]) -> int:
+    venue_ids = [ids[k] for k in rooms_by_key if k in ids]
+    for id_chunk in _chunks(venue_ids, 500):
+        conn.execute(delete(ROOMS).where(ROOMS.c.venue_id.in_(id_chunk)))
+    rows = [
+        dict({c: r.get(c) for c in ROOM_COLUMNS}, venue_id=ids[k])
+        for k, rooms in rooms_by_key.items()
+        if k in ids
+        for r in rooms
+    ]
+    if rows:
+        conn.execute(insert(ROOMS), rows)
+    return len(rows)
+
+
+def upsert_venues(venues: List[Dict[str, Any]], batch: Optional[int] = None) -> Dict[str, int]:
+    """
+    Insert or update `venues` (and their rooms) in bulk.
+
+    Returns {"venues": rows written, "rooms": rooms written}. Later
+    duplicates of the same merge key in one call win.
+    """
+    if not venues or not _ensure_tables():
+        return {"venues": 0, "rooms": 0}
+    by_key: Dict[str, Dict[str, Any]] = {}
+    rooms_by_key: Dict[str, List[Dict[str, Any]]] = {}
+    for v in venues:
+        row = venue_row(v)
+        by_key[row["merge_key"]] = row
+        if isinstance(v.get("rooms"), list):
+            rooms_by_key[row["merge_key"]] = v["rooms"]
+        else:
+            rooms_by_key.pop(row["merge_key"], None)
+
+    rows = list(by_key.values())
+    dialect = engine.dialect.name
+    upsert = _upsert_statement(dialect) if dialect in ("sqlite", "postgresql") else None
+    n_rooms = 0
+    for chunk in _chunks(rows, batch or settings.persist_batch):
+        with engine.begin() as conn:
+            if upsert is not None:
+                conn.execute(upsert, chunk)
+            else:
+                _upsert_generic(conn, chunk)
+            keys = [r["merge_key"] for r in chunk if r["merge_key"] in rooms_by_key]
+            if keys:
+                ids = dict(
+                    conn.execute(select(VENUES.c.merge_key, VENUES.c.id).where(VENUES.c.merge_key.in_(keys))).all()
+                )
+                n_rooms += _replace_rooms(conn, ids, {k: rooms_by_key[k] for k in keys})
+    return {"venues": len(rows), "rooms": n_rooms}
+
+
+def _score_row(v: Dict[str, Any]) -> Dict[str, Any]:
+    # bind names must differ from the column names an UPDATE sets
+    return {
+        "_key": merge_key(v),
+        "_score": v.get("score"),
+        "_reason": v.get("score_reason"),
+        "_components": {comp: v.get(key) for comp, key in COMPONENT_ALIASES.items()},
+    }
+
+
+def save_scores(venues: List[Dict[str, Any]], batch: Optional[int] = None) -> int:
+    """
+    Write score_total, reason_text and score_components of ranked venues
+    onto their stored rows (matched on merge_key). Nothing else is
+    touched and no rows are created. Returns the venues submitted.
+    """
+    if not venues or not _ensure_tables():
+        return 0
+    rows = list({r["_key"]: r for r in map(_score_row, venues)}.values())
+    stmt = update(VENUES).where(VENUES.c.merge_key == bindparam("_key")).values(
+        score_total=bindparam("_score"),
+        reason_text=bindparam("_reason"),
+        score_components=bindparam("_components"),
+    )
+    for chunk in _chunks(rows, batch or settings.persist_batch):
+        with engine.begin() as conn:
+            conn.execute(stmt, chunk)
+    return len(rows)
+
+
+def _save_scores_logged(venues: List[Dict[str, Any]]) -> int:
+    try:
+        return save_scores(venues)
+    except Exception as e:
+        logger.warning("score update failed: %s", e)
+        return 0
+
+
+def submit(fn: Callable[..., Any], *args: Any) -> Future:
+    """Run `fn` on the single catalog writer thread (writes stay in order)."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="venuestore")
+    return _pool.submit(fn, *args)
+
+
+def persist_scores_in_background(venues: List[Dict[str, Any]]) -> Future:
+    """Queue save_scores() on the writer thread so requests do not wait on it."""
+    return submit(_save_scores_logged, venues)
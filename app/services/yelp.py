@@ -1,6 +1,7 @@
 # TEMPORARY: Yelp integration disabled.
 # This stub keeps the rest of the app working, but returns no Yelp venues.
-# We will replace this later with a geo-filtered Yelp implementation.
+# We will replace this later with a geo-filtered Yelp implementation,
+# making its calls through app.services.httpclient like the Google providers.
 
 def search(*args, **kwargs):
     """Return no Yelp venues (stub)."""
@@ -10,6 +10,92 @@ class Settings(BaseSettings):
     smtp_user: str | None = Field(default=None, alias="SMTP_USER")
     smtp_pass: str | None = Field(default=None, alias="SMTP_PASS")
 
+    # Max in-flight Google Places requests per discovery run (1 = serial)
+    places_concurrency: int = Field(default=8, alias="PLACES_CONCURRENCY")
+    # Text Search pages per query (1-3); payload "max_pages" overrides
+    places_max_pages: int = Field(default=1, alias="PLACES_MAX_PAGES")
+    # next_page_token is only valid a couple of seconds after it is issued
+    places_page_token_delay: float = Field(default=2.0, alias="PLACES_PAGE_TOKEN_DELAY")
+    places_page_token_retries: int = Field(default=3, alias="PLACES_PAGE_TOKEN_RETRIES")
+    # Process-wide Places/geocode rate limit (app/services/quota.py; 0 = unlimited)
+    places_qps: float = Field(default=50.0, alias="PLACES_QPS")
+    places_burst: int = Field(default=100, alias="PLACES_BURST")
+    # Longest a call waits for a rate-limit token before its search drops it (seconds)
+    places_quota_wait: float = Field(default=10.0, alias="PLACES_QUOTA_WAIT")
+    # Google requests one discovery may make, geocodes and pages included (0 = unlimited)
+    places_search_budget: int = Field(default=250, alias="PLACES_SEARCH_BUDGET")
+    # Shared pause after a 429/OVER_QUERY_LIMIT, doubled per repeat (seconds)
+    places_throttle_backoff: float = Field(default=1.0, alias="PLACES_THROTTLE_BACKOFF")
+    places_throttle_max_backoff: float = Field(default=30.0, alias="PLACES_THROTTLE_MAX_BACKOFF")
+    places_throttle_retries: int = Field(default=3, alias="PLACES_THROTTLE_RETRIES")
+    # Identical Places calls share one request while in flight and reuse its answer this long (seconds; 0 = off)
+    places_response_ttl: float = Field(default=60.0, alias="PLACES_RESPONSE_TTL")
+    places_response_cache_size: int = Field(default=2048, alias="PLACES_RESPONSE_CACHE_SIZE")
+
+    # Shared provider HTTP pool (app/services/httpclient.py)
+    http_max_connections: int = Field(default=100, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive: int = Field(default=20, alias="HTTP_MAX_KEEPALIVE")
+    http_keepalive_expiry: float = Field(default=30.0, alias="HTTP_KEEPALIVE_EXPIRY")
+    http_per_host_limit: int = Field(default=16, alias="HTTP_PER_HOST_LIMIT")
+    http_timeout: float = Field(default=10.0, alias="HTTP_TIMEOUT")
+    http_connect_timeout: float = Field(default=5.0, alias="HTTP_CONNECT_TIMEOUT")
+    http_retries: int = Field(default=2, alias="HTTP_RETRIES")
+    http_backoff: float = Field(default=0.25, alias="HTTP_BACKOFF")
+
+    # Per-tenant blocklist additions, JSON {"tenant": ["keyword", ...]}
+    excluded_keywords_file: str | None = Field(default=None, alias="EXCLUDED_KEYWORDS_FILE")
+
+    # /rank/preview stage cache (entries across all stages, seconds)
+    preview_cache_size: int = Field(default=256, alias="PREVIEW_CACHE_SIZE")
+    preview_cache_ttl: int = Field(default=900, alias="PREVIEW_CACHE_TTL")
+    # Run filter -> enrich -> score on a columnar candidate table (app/services/columnar.py)
+    rank_columnar: bool = Field(default=False, alias="RANK_COLUMNAR")
+    # Discovery builds slotted Candidate records instead of dicts (app/services/candidate.py)
+    candidate_records: bool = Field(default=False, alias="CANDIDATE_RECORDS")
+
+    # Website enrichment crawler (app/services/crawler.py)
+    crawl_enabled: bool = Field(default=True, alias="CRAWL_ENABLED")
+    crawl_workers: int = Field(default=8, alias="CRAWL_WORKERS")
+    crawl_per_domain: int = Field(default=2, alias="CRAWL_PER_DOMAIN")
+    crawl_domain_delay: float = Field(default=0.5, alias="CRAWL_DOMAIN_DELAY")
+    crawl_venue_budget: float = Field(default=8.0, alias="CRAWL_VENUE_BUDGET")
+    crawl_max_pages: int = Field(default=4, alias="CRAWL_MAX_PAGES")
+    crawl_user_agent: str = Field(default="venue-agent/0.1", alias="CRAWL_USER_AGENT")
+    # Stored enrichment younger than this is reused without crawling (seconds)
+    enrich_ttl: int = Field(default=7 * 24 * 3600, alias="ENRICH_TTL")
+
+    # Write ranked scores onto stored venue rows (app/services/venuestore.py)
+    persist_enabled: bool = Field(default=True, alias="PERSIST_ENABLED")
+    persist_batch: int = Field(default=1000, alias="PERSIST_BATCH")
+
+    # gzip/brotli for complete responses at least this large (bytes; 0 = off)
+    compress_min_size: int = Field(default=1024, alias="COMPRESS_MIN_SIZE")
+    compress_gzip_level: int = Field(default=5, alias="COMPRESS_GZIP_LEVEL")
+    compress_brotli_quality: int = Field(default=4, alias="COMPRESS_BROTLI_QUALITY")
+
+    # Where POST /rank/run writes venues_ranked.{csv,xlsx,parquet}
+    export_dir: str = Field(default="exports", alias="EXPORT_DIR")
+
+    # Background ranking jobs (app/services/jobs.py)
+    jobs_workers: int = Field(default=4, alias="JOBS_WORKERS")
+    jobs_resume: bool = Field(default=True, alias="JOBS_RESUME")
+
+    # Serve discovery from stored venues where a fresh live search covered the area
+    catalog_enabled: bool = Field(default=True, alias="CATALOG_ENABLED")
+    catalog_ttl: int = Field(default=7 * 24 * 3600, alias="CATALOG_TTL")
+
+    # Geocode cache (in-process LRU in front of the geocode_cache table)
+    geocode_cache_size: int = Field(default=1024, alias="GEOCODE_CACHE_SIZE")
+    geocode_cache_ttl: int = Field(default=30 * 24 * 3600, alias="GEOCODE_CACHE_TTL")
+    geocode_negative_ttl: int = Field(default=24 * 3600, alias="GEOCODE_NEGATIVE_TTL")
+
+    # Provider record/replay (app/services/replay.py): live, record or replay
+    provider_mode: str = Field(default="live", alias="PROVIDER_MODE")
+    provider_fixtures: str = Field(default="fixtures/providers", alias="PROVIDER_FIXTURES")
+    # Injected delay per replayed response (seconds), varied by +/- jitter fraction
+    provider_replay_latency: float = Field(default=0.0, alias="PROVIDER_REPLAY_LATENCY")
+    provider_replay_jitter: float = Field(default=0.0, alias="PROVIDER_REPLAY_JITTER")
+
     class Config:
         env_file = ".env"
         extra = "ignore"
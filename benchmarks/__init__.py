@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Benchmarks never touch the developer's local.db
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="venue-bench-"), "bench.db"))
+# They also repeat identical searches on purpose; the Places response cache
+# would answer those (bench_coalesce turns it back on)
+os.environ.setdefault("PLACES_RESPONSE_TTL", "0")
@@ -0,0 +1,119 @@
+"""
+Plain dict candidates vs slotted Candidate records through the rank
+pipeline's enrich and score stages.
+
+The same --n synthetic discovery results are run both ways. Dicts take
+the old path: a dict(v) copy per venue in each stage. Candidates take
+derive(), which copies only their value list. Per representation:
+
+- memory - bytes still allocated once discovery output, enrich output and
+           score output are all held (as the stage cache holds them),
+           measured under tracemalloc
+- time   - build, enrich stage, score stage and encoding the ranking to
+           JSON (Candidates become dicts there), in a second run without
+           tracemalloc
+
+Results are checked equal field for field.
+
+    python -m benchmarks.bench_candidate [--n 100000]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from app.settings import settings
+
+settings.crawl_enabled = False
+settings.persist_enabled = False
+
+from app.routers import rank  # noqa: E402
+from app.services import fastjson  # noqa: E402
+from app.services.candidate import Candidate  # noqa: E402
+
+TYPES = [["library", "point_of_interest", "establishment"], ["lodging", "establishment"],
+         ["community_center", "point_of_interest"], ["restaurant", "food", "establishment"]]
+
+
+def discovered(n, seed=11):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        types = rnd.choice(TYPES)
+        out.append({
+            "name": f"Venue {i}",
+            "address": f"{rnd.randint(100, 9999)} Main St, Raleigh, NC 27601, USA",
+            "place_id": f"ChIJ{i:020d}",
+            "lat": 35.7 + rnd.random() / 10,
+            "lng": -78.6 - rnd.random() / 10,
+            "city": "Raleigh, NC",
+            "category": types[0],
+            "types": types,
+            "query_category": "event venue",
+            "website_url": None,
+            "phone": None,
+            "availability_status": rnd.choice(["unknown", "available"]),
+            "educationality": rnd.choice([None, 0.6, 1.0]),
+            "distance_miles": round(rnd.uniform(0, 6), 2),
+            "source": "google",
+        })
+    return out
+
+
+def stages(make):
+    t = {}
+    t0 = time.perf_counter()
+    found = make()
+    t["build"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    enriched = rank._enrich_stage(found, {})
+    t["enrich"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    scored = rank._score_stage(enriched, {})
+    t["score"] = time.perf_counter() - t0
+    return (found, enriched, scored), t
+
+
+def run(label, make):
+    # memory: everything the three stage outputs hold
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept, _ = stages(make)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del kept
+
+    # time, without tracemalloc
+    gc.collect()
+    (_, _, scored), t = stages(make)
+    t0 = time.perf_counter()
+    body = fastjson.dumps({"results": scored})
+    t["json"] = time.perf_counter() - t0
+    total = sum(t.values())
+    print(
+        f"{label:10s} {held / 2**20:8.1f} "
+        + " ".join(f"{t[k] * 1000:8.0f}" for k in ("build", "enrich", "score", "json"))
+        + f" {total * 1000:8.0f}"
+    )
+    return scored, body
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    args = ap.parse_args()
+
+    raw = discovered(args.n)
+    print(f"{args.n} candidates\n")
+    print(f"{'record':10s} {'held MB':>8s} {'build ms':>8s} {'enrich':>8s} {'score':>8s} {'json':>8s} {'total':>8s}")
+    old, old_body = run("dict", lambda: [dict(v) for v in raw])
+    new, new_body = run("Candidate", lambda: [Candidate(v) for v in raw])
+    assert [dict(v) for v in old] == [v.to_dict() for v in new]
+    assert len(old_body) == len(new_body)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Catalog-backed discovery (app.services.catalog) vs live Places calls.
+
+0. off    - catalog disabled, cold geocode cache: the plain live search,
+            for comparison with the cold catalog run (anchors are geocoded
+            concurrently either way)
+1. cold   - nothing stored: every anchor is searched live (mock server) and
+            the results are written to the catalog
+2. warm   - same search again: answered from the venues table, zero calls,
+            same venues and distances as the live run
+3. mixed  - one new city added: only that anchor goes live
+   partial - a request budget too small for every query: no coverage is
+            written, so the next search goes live again
+4. scale  - N stored venues spread over the state; one regional search
+
+    python -m benchmarks.bench_catalog [--latency 0.08] [--cities 4] [--n 100000]
+"""
+import argparse
+import os
+import random
+import time
+
+from benchmarks.mock_places import MockPlacesServer
+
+
+def spread(n, seed=11):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Stored Venue {i}",
+            "place_id": f"scale-{i}",
+            "lat": rng.uniform(33.8, 36.6),
+            "lng": rng.uniform(-84.3, -75.5),
+            "category": "library",
+            "types": ["library"],
+            "source": "google",
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", type=float, default=0.08)
+    ap.add_argument("--cities", type=int, default=4)
+    ap.add_argument("--n", type=int, default=100_000)
+    args = ap.parse_args()
+
+    with MockPlacesServer(latency=args.latency) as server:
+        os.environ["GOOGLE_PLACES_API_KEY"] = "bench"
+        os.environ["GOOGLE_PLACES_URL"] = server.url
+        from app.services import catalog, places, venuestore
+        from app.services.geo import haversine_miles
+        from app.settings import settings
+
+        def drain():
+            venuestore.submit(lambda: None).result()
+
+        def run(label, payload):
+            server.calls = 0
+            before = catalog.stats()
+            t0 = time.perf_counter()
+            out = catalog.discover(payload)
+            ms = (time.perf_counter() - t0) * 1000
+            drain()
+            after = catalog.stats()
+            delta = {k: after[k] - before[k] for k in after}
+            print(f"{label:6s}: {ms:8.1f} ms  {server.calls:3d} calls  {len(out):5d} candidates  {delta}")
+            return out, server.calls
+
+        settings.catalog_enabled = False
+        run("off", {"cities": [f"Town {i}, NC" for i in range(args.cities)], "radius_miles": 6})
+        settings.catalog_enabled = True
+
+        payload = {"cities": [f"City {i}, NC" for i in range(args.cities)], "radius_miles": 6}
+        live, calls = run("cold", payload)
+        assert calls > 0
+
+        warm, calls = run("warm", payload)
+        assert calls == 0, calls
+        best = {}
+        for c in live:
+            best[c["place_id"]] = min(best.get(c["place_id"], 1e9), c["distance_miles"])
+        assert {c["place_id"]: c["distance_miles"] for c in warm} == best
+
+        mixed_payload = dict(payload, cities=payload["cities"] + ["City new, NC"])
+        mixed, calls = run("mixed", mixed_payload)
+        assert calls == len(places.QUERY_BASES) + 1, calls  # one geocode + one search per query
+        assert {c["place_id"] for c in warm} <= {c["place_id"] for c in mixed}
+
+        partial_payload = {"cities": ["Village 1, NC", "Village 2, NC"], "radius_miles": 6}
+        budget = settings.places_search_budget
+        settings.places_search_budget = 3  # one query per anchor fits
+        run("partial", partial_payload)
+        settings.places_search_budget = budget
+        _, calls = run("again", partial_payload)
+        assert calls == 2 * len(places.QUERY_BASES), calls  # not served from a trimmed coverage row
+
+        t0 = time.perf_counter()
+        venuestore.upsert_venues(spread(args.n))
+        print(f"stored {args.n} spread venues in {time.perf_counter() - t0:.1f} s")
+
+        anchor = {"lat": 35.6, "lng": -77.4}
+        t0 = time.perf_counter()
+        reps = 50
+        for _ in range(reps):
+            near = catalog.query([("Greenville, NC", anchor)], [anchor], 10)
+        t_query = (time.perf_counter() - t0) / reps
+        brute = [
+            v for v in spread(args.n) if haversine_miles(anchor["lat"], anchor["lng"], v["lat"], v["lng"]) <= 10
+        ]
+        assert {c["place_id"] for c in near} >= {v["place_id"] for v in brute}
+        print(f"scale : {t_query * 1000:8.2f} ms  bbox+haversine over {args.n} stored -> {len(near)} within 10 mi")
+
+
+if __name__ == "__main__":
+    main()
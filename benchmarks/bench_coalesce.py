@@ -0,0 +1,121 @@
+"""
+Coalescing of identical Places calls (quota.get_json/aget_json).
+
+--operators searches start at the same moment, each over --per-op cities
+drawn from a pool of --pool, so their areas overlap. Half run the
+concurrent engine on the I/O loop (asyncio), half the serial engine on
+their own threads, so coalescing is exercised across both.
+
+1. off       - no single-flight, no response cache: every search sends
+               its own requests
+2. coalesced - single-flight on: identical in-flight requests share one
+               call; results must match run 1. Serial searches drift
+               apart in time, so some of their repeats are no longer in
+               flight and still go out
+3. + cache   - the same burst again with PLACES_RESPONSE_TTL on, answered
+               from the response cache
+
+    python -m benchmarks.bench_coalesce [--operators 12] [--pool 4] [--per-op 3] [--latency 0.15]
+"""
+import argparse
+import os
+import random
+import threading
+import time
+
+from benchmarks.mock_places import MockPlacesServer
+
+
+class NoFlight:
+    """Stand-in for cache.SingleFlight that never shares a call."""
+
+    def do(self, key, fn):
+        return fn(), False
+
+    async def ado(self, key, fn):
+        return await fn(), False
+
+
+def forget_geocodes():
+    from app.db.deps import SessionLocal, ensure_table
+    from app.db.models import GeocodeCacheEntry
+    from app.services import geocache
+
+    geocache.clear_memory()
+    ensure_table(GeocodeCacheEntry.__table__)
+    with SessionLocal() as db:
+        db.query(GeocodeCacheEntry).delete()
+        db.commit()
+
+
+def burst(label, server, payloads):
+    from app.services import places
+
+    forget_geocodes()
+    server.calls = 0
+    results = [None] * len(payloads)
+    latency = [0.0] * len(payloads)
+    start = threading.Barrier(len(payloads))
+
+    def operator(i):
+        payload = payloads[i]
+        start.wait()
+        t0 = time.perf_counter()
+        # odd operators use the serial engine on this thread, even ones the async engine
+        out = places.discover_serial(payload) if i % 2 else places.discover(payload)
+        latency[i] = (time.perf_counter() - t0) * 1000
+        results[i] = sorted((c["place_id"], c["distance_miles"]) for c in out)
+
+    threads = [threading.Thread(target=operator, args=(i,)) for i in range(len(payloads))]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = (time.perf_counter() - t0) * 1000
+    lat = sorted(latency)
+    print(
+        f"{label:10s}: {server.calls:4d} calls | wall {wall:7.1f} ms | per search p50 {lat[len(lat) // 2]:7.1f} ms "
+        f"max {lat[-1]:7.1f} ms | {sum(len(r) for r in results)} candidates"
+    )
+    return results, server.calls
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--operators", type=int, default=12)
+    ap.add_argument("--pool", type=int, default=4)
+    ap.add_argument("--per-op", type=int, default=3)
+    ap.add_argument("--latency", type=float, default=0.15)
+    args = ap.parse_args()
+
+    rng = random.Random(5)
+    pool = [f"Overlap {i}, NC" for i in range(args.pool)]
+    payloads = [{"cities": rng.sample(pool, args.per_op), "radius_miles": 6} for _ in range(args.operators)]
+
+    with MockPlacesServer(latency=args.latency) as server:
+        os.environ["GOOGLE_PLACES_API_KEY"] = "bench"
+        os.environ["GOOGLE_PLACES_URL"] = server.url
+        os.environ["PLACES_QPS"] = "0"
+        from app.services import quota
+        from app.settings import settings
+
+        flights = quota._flights
+        quota._flights = NoFlight()
+        off, calls_off = burst("off", server, payloads)
+
+        quota._flights = flights
+        on, calls_on = burst("coalesced", server, payloads)
+        assert on == off, "coalesced results differ"
+        assert calls_on < calls_off, calls_on
+
+        settings.places_response_ttl = 60
+        burst("prime", server, payloads)
+        cached, calls_cached = burst("+ cache", server, payloads)
+        # geocache was cleared too, but the geocode responses are cached as well
+        assert cached == off and calls_cached == 0, calls_cached
+        print(f"duplicate requests removed: {calls_off - calls_on} of {calls_off}")
+
+
+if __name__ == "__main__":
+    main()
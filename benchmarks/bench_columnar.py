@@ -0,0 +1,115 @@
+"""
+Row-wise vs columnar (RANK_COLUMNAR) filter -> enrich -> score on one
+state's worth of candidates.
+
+--n synthetic discovery results spread over a state's cities (a share
+outside the state, in other cities, or blocklisted) go through rank's
+filter, enrich and score stages both ways, with a state + cities payload.
+Merge runs inside the filter stage in both modes and is timed on its own
+too. Rankings are checked equal venue for venue, key order included.
+
+    python -m benchmarks.bench_columnar [--n 200000] [--reps 3]
+"""
+import argparse
+import random
+import time
+
+from app.settings import settings
+
+settings.crawl_enabled = False
+settings.persist_enabled = False
+
+from app.routers import rank  # noqa: E402
+from app.services import merge  # noqa: E402
+
+CITIES = [("Raleigh", "27601"), ("Durham", "27701"), ("Greensboro", "27401"), ("Charlotte", "28202"),
+          ("Wilmington", "28401"), ("Asheville", "28801"), ("Fayetteville", "28301"), ("Boone", "28607")]
+TYPES = [["library", "point_of_interest", "establishment"], ["lodging", "establishment"],
+         ["community_center", "point_of_interest"], ["restaurant", "food", "establishment"],
+         ["church", "place_of_worship"], ["school", "establishment"]]
+NAMES = ["Public Library", "Community Center", "Hotel & Conference", "Event Hall", "Grill",
+         "Senior Living", "Church", "Day Care", "Meeting Rooms", "Civic Center"]
+
+
+def discovered(n, seed=11):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        city, zip_code = rnd.choice(CITIES)
+        state = "NC" if rnd.random() < 0.9 else "SC"
+        types = rnd.choice(TYPES)
+        v = {
+            "name": f"{city} {rnd.choice(NAMES)} {i}",
+            "address": f"{rnd.randint(100, 9999)} Main St, {city}, {state} {zip_code}, USA",
+            "place_id": f"ChIJ{i:020d}",
+            "lat": 35.0 + rnd.random() * 1.5,
+            "lng": -82.0 + rnd.random() * 4,
+            "city": f"{city}, {state}",
+            "category": types[0],
+            "types": types,
+            "query_category": "event venue",
+            "website_url": None,
+            "phone": None,
+            "availability_status": rnd.choice(["unknown", "available", "maybe"]),
+            "educationality": rnd.choice([None, 0.6, 1.0]),
+            "distance_miles": round(rnd.uniform(0, 9), 2),
+            "source": "google",
+        }
+        if rnd.random() < 0.3:
+            v["amenities"] = {k: rnd.random() < 0.5 for k in ("projector", "wifi", "tables_chairs")}
+        if rnd.random() < 0.3:
+            v["rooms"] = [{"room_name": "A", "capacity_classroom": rnd.randint(10, 40), "capacity_theater": rnd.randint(20, 80)}]
+        if rnd.random() < 0.2:
+            v["parking_notes"] = "Free lot"
+        out.append(v)
+    return out
+
+
+def run(found, payload, columnar):
+    settings.rank_columnar = columnar
+    t = {}
+    t0 = time.perf_counter()
+    filtered = rank._filter_stage(found, payload)
+    t["filter"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    enriched = rank._enrich_stage(filtered, payload)
+    t["enrich"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    scored = rank._score_stage(enriched, payload)
+    t["score"] = time.perf_counter() - t0
+    return scored, t
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--reps", type=int, default=3)
+    args = ap.parse_args()
+
+    found = discovered(args.n)
+    payload = {"state": "NC", "city": "Raleigh", "cities": [c for c, _ in CITIES[:6]]}
+
+    t0 = time.perf_counter()
+    merge.merge_candidates_with_report(found, [])
+    merge_ms = (time.perf_counter() - t0) * 1000
+    print(f"{args.n} candidates, merge {merge_ms:.0f} ms (inside filter, both modes)\n")
+    print(f"{'mode':10s} {'filter ms':>10s} {'enrich':>8s} {'score':>8s} {'total':>8s} {'ranked':>8s}")
+
+    results = {}
+    for label, columnar in (("rows", False), ("columnar", True)):
+        best = None
+        for _ in range(args.reps):
+            scored, t = run(found, payload, columnar)
+            if best is None or sum(t.values()) < sum(best.values()):
+                best = t
+        results[label] = scored
+        print(
+            f"{label:10s} {best['filter'] * 1000:10.0f} {best['enrich'] * 1000:8.0f} {best['score'] * 1000:8.0f}"
+            f" {sum(best.values()) * 1000:8.0f} {len(scored):8d}"
+        )
+    assert [list(v.items()) for v in results["rows"]] == [list(v.items()) for v in results["columnar"]]
+    print("\nrankings identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Incremental re-enrichment against local static sites.
+
+Enriches the same venues three times:
+
+1. cold    - every site is crawled, parsed and stored
+2. fresh   - within ENRICH_TTL nothing is fetched at all
+3. refresh - TTL expired and --changed sites edited their rentals page;
+             unchanged sites cost a 304 and an enriched_at bump, only the
+             edited pages are parsed and only those venues rewritten
+
+    python -m benchmarks.bench_enrich_incremental [--sites 40] [--changed 4]
+"""
+import argparse
+import time
+
+from benchmarks.static_sites import RENTALS, StaticSites
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sites", type=int, default=40)
+    ap.add_argument("--changed", type=int, default=4)
+    args = ap.parse_args()
+
+    from app.services import crawler, enrichstore, extract
+    from app.settings import settings
+
+    with StaticSites(args.sites, slow_seconds=0) as sites:
+
+        def venues():
+            return [{"name": f"Venue {i}", "place_id": f"bench-{i}", "website_url": u} for i, u in enumerate(sites.urls)]
+
+        def run(label, **kw):
+            c = crawler.Crawler(workers=16, domain_delay=0.05)
+            before = enrichstore.stats()
+            t0 = time.perf_counter()
+            out = extract.enrich_many(venues(), crawl=c, **kw)
+            ms = (time.perf_counter() - t0) * 1000
+            after = enrichstore.stats()
+            delta = {k: after[k] - before[k] for k in after}
+            print(f"{label:8s}: {ms:7.1f} ms  store={delta}  crawl={c.stats}")
+            return out, delta, c.stats
+
+        cold, d, st = run("cold")
+        assert d["changed"] == args.sites and st["parsed"] == st["fetched"] > 0
+
+        fresh, d, st = run("fresh")
+        assert fresh == cold and d["fresh"] == args.sites and st["fetched"] == st["not_modified"] == 0
+
+        for n in range(args.changed):
+            sites.rewrite(n, "rentals.html", RENTALS.format(cap=500 + n, cls=20 + n % 10))
+        settings.enrich_ttl = 0
+        refreshed, d, st = run("refresh")
+        assert d == {"fresh": 0, "unchanged": args.sites - args.changed, "changed": args.changed}, d
+        assert st["parsed"] == args.changed and st["fetched"] == args.changed
+        for n, v in enumerate(refreshed):
+            cap = v["rooms"][0]["capacity_theater"]
+            assert cap == (500 + n if n < args.changed else 30 + n), (n, cap)
+
+        full, _, st = run("full", refresh=True)
+        print(f"refresh parsed {args.changed} of {st['parse_skipped'] + st['parsed']} pages visited")
+        assert full == refreshed
+
+
+if __name__ == "__main__":
+    main()
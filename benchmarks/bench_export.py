@@ -0,0 +1,127 @@
+"""
+Streaming exports (app.services.export) vs building a DataFrame first.
+
+Exports a synthetic ranking of --venues venues with two rooms each (so
+2x rows) from a generator, and reports wall time plus the tracemalloc
+peak of a second, traced run (the XLSX peak is traced on a tenth of the
+data: openpyxl under tracemalloc is very slow, and write-only memory does
+not grow with rows anyway). The baseline materializes every row in a
+pandas DataFrame and calls to_csv. Files are read back and checked.
+
+    python -m benchmarks.bench_export [--venues 50000]
+"""
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+def venues(n):
+    for i in range(n):
+        yield {
+            "name": f"Venue {i}",
+            "category": "library",
+            "educationality": 1.0,
+            "address": f"{i} Main St, Greenville, NC 27834",
+            "city": "Greenville, NC",
+            "distance_miles": round((i % 600) / 100, 2),
+            "website_url": f"https://venue{i}.example.org/",
+            "phone": "(252) 555-0100",
+            "availability_status": "unknown",
+            "amenities": {"projector": True, "wifi": i % 2 == 0},
+            "parking_notes": "Free parking behind the building.",
+            "disclosure_needed": False,
+            "image_allowed": True,
+            "score": 100.0 - i / n,
+            "score_reason": "Educational venue; Capacity fit 100%",
+            "rooms": [
+                {"room_name": "Community Room", "capacity_classroom": 24, "capacity_theater": 40, "fees_hour": 50.0},
+                {"room_name": "Board Room", "capacity_theater": 12},
+            ],
+        }
+
+
+def measure(fn, traced=None):
+    t0 = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    (traced or fn)()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--venues", type=int, default=50_000)
+    args = ap.parse_args()
+    rows = 2 * args.venues
+
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    from app.services import export
+
+    tmp = tempfile.mkdtemp(prefix="venue-export-")
+
+    def report(label, elapsed, peak, path=None):
+        size = f"{os.path.getsize(path) / 1e6:6.1f} MB" if path else ""
+        print(f"{label:14s}: {elapsed:6.2f} s  peak {peak / 1e6:7.1f} MB  {size}")
+
+    def stream_csv():
+        n = 0
+        for chunk in export.stream("csv", venues(args.venues)):
+            n += len(chunk)
+        return n
+
+    _, t, peak = measure(stream_csv)
+    report("csv stream", t, peak)
+
+    path = os.path.join(tmp, "ranked.csv")
+    _, t, peak = measure(lambda: export.write("csv", venues(args.venues), path))
+    report("csv file", t, peak, path)
+    with open(path, newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader)
+        first = next(reader)
+        count = 1 + sum(1 for _ in reader)
+    with open(os.path.join("exports", "venues_ranked.csv")) as fh:
+        assert header == next(csv.reader(fh)) == export.EXPORT_COLUMNS
+    assert count == rows and first[0] == "1" and first[header.index("room_name")] == "Community Room"
+
+    def dataframe_csv():
+        df = pd.DataFrame(list(export.iter_rows(venues(args.venues))), columns=export.EXPORT_COLUMNS)
+        buf = io.StringIO()
+        df.to_csv(buf, index=False)
+        return len(buf.getvalue())
+
+    _, t, peak = measure(dataframe_csv)
+    report("csv DataFrame", t, peak)
+
+    path = os.path.join(tmp, "ranked.xlsx")
+    small = os.path.join(tmp, "small.xlsx")
+    _, t, peak = measure(
+        lambda: export.write("xlsx", venues(args.venues), path),
+        traced=lambda: export.write("xlsx", venues(args.venues // 10), small),
+    )
+    report("xlsx file", t, peak, path)
+    ws = load_workbook(path, read_only=True).active
+    assert sum(1 for _ in ws.iter_rows(values_only=True)) == rows + 1
+
+    if export.parquet_available():
+        import pyarrow.parquet as pq
+
+        path = os.path.join(tmp, "ranked.parquet")
+        _, t, peak = measure(lambda: export.write("parquet", venues(args.venues), path))
+        report("parquet file", t, peak, path)
+        assert pq.ParquetFile(path).metadata.num_rows == rows
+    else:
+        print("parquet       : skipped (pyarrow not installed)")
+
+
+if __name__ == "__main__":
+    main()
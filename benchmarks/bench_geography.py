@@ -0,0 +1,198 @@
+"""
+Compiled geography filter (app.services.geography) vs the original
+substring predicate, on synthetic NC candidates.
+
+Both run over the same --candidates venues for a few typical payloads:
+
+- speed  - per-candidate substring checks vs GeographyMatcher.filter()
+- answer - candidates the two disagree on, by kind. The old check let
+           "nc" match "Lincoln" or "Francis", "275" match a street
+           number, and rejected "St. Louis" for "Saint Louis" or any
+           city of a multi-city search but the first
+
+    python -m benchmarks.bench_geography [--candidates 100000]
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+from app.services.geography import GeographyMatcher, _parse_address, _parse_full, _parse_tail
+
+CITIES = [("Raleigh", "27601"), ("Durham", "27701"), ("Cary", "27511"), ("Greenville", "27834"),
+          ("Lincolnton", "28092"), ("Winston-Salem", "27101"), ("Washington", "27889")]
+OTHER = [("Lincoln", "NE", "68508"), ("Greenville", "SC", "29601"), ("St. Louis", "MO", "63101"),
+         ("Saint Francis", "KS", "67756")]
+STREETS = ["Main St", "Oak Ave", "Church Rd", "Lincoln Blvd", "Franklin St"]
+
+PAYLOADS = [
+    ("city+state", {"city": "Raleigh", "state": "NC"}),
+    ("cities list", {"city": "Raleigh", "cities": ["Raleigh, NC", "Durham, NC", "Cary, NC"], "state": "NC"}),
+    ("zip prefix", {"zip_codes": "275,277", "city": "Raleigh", "state": "NC"}),
+    ("state only", {"state": "NC"}),
+    ("saint", {"city": "Saint Louis", "state": "MO"}),
+]
+
+
+# --- rank.matches_geography as it was before app.services.geography --------
+
+def _normalize_str(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+def _legacy_zip_list(raw: Any) -> List[str]:
+    if raw is None:
+        return []
+
+    items: List[str] = []
+
+    if isinstance(raw, str):
+        for part in raw.replace(";", ",").split(","):
+            part = part.strip()
+            if part:
+                items.append(part)
+    elif isinstance(raw, Iterable) and not isinstance(raw, (bytes, bytearray)):
+        for v in raw:
+            if v is None:
+                continue
+            s = str(v)
+            for part in s.replace(";", ",").split(","):
+                part = part.strip()
+                if part:
+                    items.append(part)
+    else:
+        items.append(str(raw).strip())
+
+    zips: List[str] = []
+    for val in items:
+        if not val:
+            continue
+        if "-" in val and len(val) > 5:
+            val = val.split("-", 1)[0]
+        val = val.strip()
+        if len(val) >= 3:
+            zips.append(val.lower())
+    return zips
+
+
+def legacy_matches(candidate: Dict[str, Any], payload: Dict[str, Any]) -> bool:
+    city_q = _normalize_str(
+        payload.get("city") or payload.get("City") or payload.get("locality")
+    )
+    state_q = _normalize_str(
+        payload.get("state") or payload.get("State") or payload.get("state_code")
+    )
+
+    zip_raw = (
+        payload.get("zip_codes")
+        or payload.get("zipcodes")
+        or payload.get("zips")
+        or payload.get("postal_codes")
+        or payload.get("zip")
+        or payload.get("zipcode")
+    )
+    zips_q = _legacy_zip_list(zip_raw)
+
+    addr_bits: List[str] = []
+    for key in (
+        "formatted_address",
+        "address",
+        "vicinity",
+        "city",
+        "locality",
+        "state",
+        "state_code",
+        "region",
+        "postal_code",
+        "zipcode",
+        "zip",
+    ):
+        val = candidate.get(key)
+        if val:
+            addr_bits.append(str(val))
+
+    address = _normalize_str(" ".join(addr_bits))
+
+    if state_q:
+        if state_q not in address:
+            return False
+
+    if zips_q:
+        zip_match = any(z in address for z in zips_q)
+        if not zip_match:
+            if city_q and city_q not in address:
+                return False
+    else:
+        if city_q and city_q not in address:
+            return False
+
+    return True
+
+
+# ---------------------------------------------------------------------------
+
+
+def synthetic(n, rnd):
+    """Candidates shaped like places.discover() output: full address plus the search target."""
+    out = []
+    for i in range(n):
+        number = rnd.choice([str(rnd.randint(100, 999)), str(rnd.randint(27500, 27799))])
+        street = rnd.choice(STREETS)
+        if i % 4 == 0:
+            city, state, z = rnd.choice(OTHER)
+        else:
+            (city, z), state = rnd.choice(CITIES), rnd.choice(["NC", "NC", "North Carolina"])
+        if rnd.random() < 0.3:
+            city = city.replace("Saint ", "St. ")
+        target = rnd.choice([f"{city}, {state}", z]) if state != "North Carolina" else f"{city}, NC"
+        out.append({
+            "name": f"Venue {i}",
+            "address": f"{number} {street}, {city}, {state} {z}, USA",
+            "city": target,
+        })
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--candidates", type=int, default=100_000)
+    args = ap.parse_args()
+
+    cands = synthetic(args.candidates, random.Random(11))
+    print(f"{args.candidates} candidates\n")
+    print(f"{'payload':12s} {'legacy ms':>10s} {'cold ms':>8s} {'warm ms':>8s} {'kept old/new':>14s}  disagreements")
+    for label, payload in PAYLOADS:
+        t0 = time.perf_counter()
+        old = [c for c in cands if legacy_matches(c, payload)]
+        t_old = time.perf_counter() - t0
+
+        _parse_address.cache_clear()
+        _parse_full.cache_clear()
+        _parse_tail.cache_clear()
+        t0 = time.perf_counter()
+        new = GeographyMatcher.from_payload(payload).filter(cands)
+        t_cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = GeographyMatcher.from_payload(payload).filter(cands)
+        t_warm = time.perf_counter() - t0
+
+        old_ids, new_ids = {id(c) for c in old}, {id(c) for c in new}
+        diff = Counter()
+        for c in cands:
+            a, b = id(c) in old_ids, id(c) in new_ids
+            if a != b:
+                city = c["address"].split(", ")[1]
+                diff[("+" if b else "-") + city] += 1
+        top = ", ".join(f"{k} {v}" for k, v in diff.most_common(4)) or "none"
+        print(
+            f"{label:12s} {t_old * 1000:10.0f} {t_cold * 1000:8.0f} {t_warm * 1000:8.0f} "
+            f"{len(old):6d}/{len(new):<6d}  {top}"
+        )
+    print("\n(+ kept only by the compiled filter, - dropped only by it; cold = address cache empty)")
+
+
+if __name__ == "__main__":
+    main()
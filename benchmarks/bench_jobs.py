@@ -0,0 +1,100 @@
+"""
+Background ranking jobs (app.services.jobs, /jobs router).
+
+1. end to end - POST /jobs with --metros ranking payloads against the mock
+                Places server; the 202 comes back at once, progress streams
+                over /jobs/{id}/events, results are read from /jobs/{id}/results
+2. resume     - a queue is shut down mid-job (as on a restart) and a new
+                queue picks up the remaining items; every item runs once
+
+    python -m benchmarks.bench_jobs [--metros 40] [--latency 0.08]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from benchmarks.mock_places import MockPlacesServer
+
+
+def end_to_end(args):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        body = {"base": {"radius_miles": 6}, "items": [{"cities": [f"Metro {i}, NC"]} for i in range(args.metros)]}
+        t0 = time.perf_counter()
+        r = client.post("/jobs", json=body)
+        t_submit = time.perf_counter() - t0
+        assert r.status_code == 202, r.text
+        job = r.json()
+
+        events = []
+        with client.stream("GET", f"/jobs/{job['id']}/events?format=ndjson") as s:
+            for line in s.iter_lines():
+                if line:
+                    events.append(json.loads(line)["data"])
+        t_total = time.perf_counter() - t0
+        final = events[-1]
+        assert final["status"] == "done" and final["done"] == args.metros, final
+        assert [e["done"] for e in events] == sorted(e["done"] for e in events)
+
+        items = client.get(f"/jobs/{job['id']}/results").json()["items"]
+        assert len(items) == args.metros and all(i["result"]["count"] > 0 for i in items)
+        print(
+            f"end to end: submit {t_submit * 1000:6.1f} ms | {args.metros} metros done in {t_total:5.2f} s "
+            f"| {len(events)} progress events | {sum(i['result']['count'] for i in items)} ranked venues"
+        )
+
+
+def resume(items=12, delay=0.1):
+    from app.services import jobs
+
+    calls = {}
+    lock = threading.Lock()
+
+    def handler(payload, options):
+        with lock:
+            calls[payload["n"]] = calls.get(payload["n"], 0) + 1
+        time.sleep(delay)
+        return {"n": payload["n"]}
+
+    first = jobs.JobQueue(handler, workers=2, kind="bench-resume")
+    first.start()
+    job_id = first.submit([{"n": n} for n in range(items)])
+    while first.get(job_id)["done"] < 4:
+        time.sleep(0.01)
+    first.shutdown(wait=True)  # "restart": queued items never ran
+    halfway = first.get(job_id)
+    assert halfway["status"] == "running" and halfway["done"] < items, halfway
+
+    second = jobs.JobQueue(handler, workers=4, kind="bench-resume")
+    resumed = second.start()
+    for state in second.events(job_id, poll=0.05):
+        pass
+    assert state["status"] == "done" and state["done"] == items, state
+    assert sorted(calls) == list(range(items)) and set(calls.values()) == {1}, calls
+    results = [i["result"]["n"] for i in second.results(job_id)]
+    assert results == list(range(items))
+    second.shutdown()
+    print(f"resume    : {halfway['done']} of {items} done before restart, {resumed} resumed, each item ran once")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--metros", type=int, default=40)
+    ap.add_argument("--latency", type=float, default=0.08)
+    args = ap.parse_args()
+
+    with MockPlacesServer(latency=args.latency) as server:
+        os.environ["GOOGLE_PLACES_API_KEY"] = "bench"
+        os.environ["GOOGLE_PLACES_URL"] = server.url
+        os.environ["CRAWL_ENABLED"] = "false"
+        end_to_end(args)
+    resume()
+
+
+if __name__ == "__main__":
+    main()
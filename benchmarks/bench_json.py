@@ -0,0 +1,100 @@
+"""
+Response encoding for ranked venues: FastAPI's default path vs
+FastJSONResponse, full venues vs ?fields=table, identity vs gzip/brotli.
+
+For 1k and 10k synthetic ranked venues (full enrich/score output, with
+rooms, types and crawl fields), each row reports:
+
+- encode ms - building the body: jsonable_encoder + json.dumps (what a
+              returned dict costs), or fastjson.dumps on the venues
+- bytes     - body size uncompressed, gzip and brotli (when installed)
+              at the middleware's default levels
+
+    python -m benchmarks.bench_json [--reps 5]
+"""
+import argparse
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.services import compression, fastjson
+
+
+def synthetic_venues(n, seed=11):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        out.append({
+            "place_id": f"ChIJ{rnd.getrandbits(96):024x}",
+            "name": f"Venue {i}",
+            "category": rnd.choice(["library", "community center", "hotel", "restaurant", "church"]),
+            "types": rnd.sample(["library", "point_of_interest", "establishment", "lodging", "restaurant", "food"], 4),
+            "query_category": rnd.choice(["library", "event venue", "hotel meeting room"]),
+            "address": f"{rnd.randint(100, 9999)} Main St, Raleigh, NC 27601, USA",
+            "city": "Raleigh, NC",
+            "state": "NC",
+            "lat": 35.7 + rnd.random() / 10,
+            "lng": -78.6 - rnd.random() / 10,
+            "distance_miles": round(rnd.uniform(0, 6), 2),
+            "rating": round(rnd.uniform(3, 5), 1),
+            "user_ratings_total": rnd.randint(0, 2000),
+            "website": f"https://venue{i}.example.com",
+            "phone": f"(919) 555-{rnd.randint(0, 9999):04d}",
+            "source": "google",
+            "educationality": rnd.choice([None, 0.5, 0.85, 1.0]),
+            "amenities": {k: rnd.random() < 0.5 for k in ("av", "wifi", "parking", "accessible", "catering")},
+            "rooms": [
+                {"name": f"Room {j}", "capacity_classroom": rnd.randint(10, 80), "capacity_theater": rnd.randint(20, 150)}
+                for j in range(rnd.randint(0, 3))
+            ],
+            "parking_notes": rnd.choice([None, "Free lot", "Street parking"]),
+            "availability_status": rnd.choice(["available", "unknown"]),
+            "score": rnd.random(),
+            "score_reason": "edu 0.85, capacity fit, parking, within radius",
+            "availability_score": rnd.random(),
+            "capacity_score": rnd.random(),
+            "amenities_score": rnd.random(),
+            "logistics_score": rnd.random(),
+        })
+    return out
+
+
+def best_ms(fn, reps):
+    best = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reps", type=int, default=5)
+    args = ap.parse_args()
+
+    encoders = "orjson" if fastjson.available() else "stdlib (orjson not installed)"
+    br = "brotli" if compression.brotli is not None else "brotli n/a"
+    print(f"fast path encoder: {encoders}; {br}\n")
+    print(f"{'venues':>6s} {'path':34s} {'encode ms':>10s} {'KB':>8s} {'gzip KB':>8s} {'br KB':>8s}")
+    table = fastjson.FIELD_SETS["table"]
+    for n in (1_000, 10_000):
+        venues = synthetic_venues(n)
+        cases = [
+            ("default (jsonable_encoder + json)",
+             lambda: json.dumps(jsonable_encoder({"results": venues}), ensure_ascii=False, separators=(",", ":")).encode()),
+            ("FastJSONResponse", lambda: fastjson.dumps({"results": venues})),
+            ("FastJSONResponse ?fields=table", lambda: fastjson.dumps({"results": fastjson.project(venues, table)})),
+        ]
+        for label, fn in cases:
+            ms, body = best_ms(fn, args.reps)
+            gz = len(compression.compress(body, "gzip"))
+            brs = f"{len(compression.compress(body, 'br')) / 1024:8.0f}" if compression.brotli is not None else f"{'-':>8s}"
+            print(f"{n:6d} {label:34s} {ms:10.1f} {len(body) / 1024:8.0f} {gz / 1024:8.0f} {brs}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
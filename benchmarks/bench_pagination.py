@@ -0,0 +1,61 @@
+"""
+Recall and latency of next_page_token pagination against multi-page mock
+fixtures (with a realistic token activation delay).
+
+    python -m benchmarks.bench_pagination [--latency 0.08] [--token-delay 0.3]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.mock_places import MockPlacesServer
+
+
+def _run(places, payload):
+    t0 = time.perf_counter()
+    out = asyncio.run(places.discover_async(payload))
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", type=float, default=0.08)
+    ap.add_argument("--token-delay", type=float, default=0.3)
+    ap.add_argument("--anchors", type=int, default=3)
+    args = ap.parse_args()
+
+    os.environ["PLACES_PAGE_TOKEN_DELAY"] = str(args.token_delay / 2)
+    payload = {"cities": [f"City {i}, NC" for i in range(args.anchors)], "radius_miles": 6}
+
+    with MockPlacesServer(latency=args.latency, pages=3, token_delay=args.token_delay) as server:
+        os.environ["GOOGLE_PLACES_API_KEY"] = "bench"
+        os.environ["GOOGLE_PLACES_URL"] = server.url
+        from app.services import places
+
+        _run(places, payload)  # warm the geocode cache
+        base, t_base = _run(places, dict(payload, max_pages=1))
+        server.calls = server.rejected_tokens = 0
+        paged, t_paged = _run(places, dict(payload, max_pages=3))
+        print(
+            f"1 page : {len(base):4d} candidates in {t_base * 1000:7.1f} ms\n"
+            f"3 pages: {len(paged):4d} candidates in {t_paged * 1000:7.1f} ms "
+            f"({server.calls} calls, {server.rejected_tokens} early tokens retried)"
+        )
+        assert len(paged) > len(base)
+
+        serial = places.discover_serial(dict(payload, max_pages=3))
+        assert serial == paged, "paginated async discovery diverged from serial path"
+
+        # Pages 2+ land far outside the radius: each chain should stop after page 2
+        server.far_from_page = 1
+        server.token_delay = 0.0
+        server.calls = 0
+        _run(places, dict(payload, max_pages=3))
+        searches = args.anchors * len(places.QUERY_BASES)
+        print(f"early stop: {server.calls} calls for {searches} searches (pages beyond radius skipped)")
+        assert server.calls == 2 * searches
+
+
+if __name__ == "__main__":
+    main()
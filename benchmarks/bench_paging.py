@@ -0,0 +1,101 @@
+"""
+Paged /rank/preview response vs the old full double-list response.
+
+For a synthetic ranking of --venues scored venues:
+
+- select - paging.page() (slice or bounded heap) vs sorting the whole list
+           by the same column
+- json   - bytes and json.dumps time of one page vs {"results": all,
+           "candidates": all}
+
+The selected page is checked against the full sort for every sort key.
+
+    python -m benchmarks.bench_paging [--venues 20000]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.services import paging
+from app.services.paging import _value_key
+
+CATEGORIES = ["library", "community center", "hotel", "restaurant", "church", None]
+CITIES = ["Raleigh", "Durham", "Cary", "Apex", None]
+
+
+def synthetic_ranking(n, seed=11):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        out.append({
+            "name": f"Venue {rnd.randint(0, n)}",
+            "room_name": rnd.choice(["Hall A", "Board Room", "", None]),
+            "category": rnd.choice(CATEGORIES),
+            "city": rnd.choice(CITIES),
+            "state": "NC",
+            "distance_miles": rnd.choice([None, round(rnd.uniform(0, 6), 2)]),
+            "source": "google",
+            "score": round(rnd.random(), 4),
+            "educationality": rnd.choice([None, 0.5, 0.85, 1.0]),
+            "availability_score": rnd.random(),
+            "capacity_score": rnd.random(),
+            "amenities_score": rnd.random(),
+            "logistics_score": rnd.random(),
+            "address": f"{rnd.randint(100, 9999)} Main St, Raleigh, NC 27601, USA",
+            "website": f"https://venue{i}.example.com",
+            "rooms": [{"name": "Hall A", "capacity_classroom": 30}] * rnd.randint(0, 3),
+        })
+    out.sort(key=lambda v: v["score"], reverse=True)
+    return out
+
+
+def full_sort(rows, key, order):
+    """What the UI used to do: sort everything, missing values last."""
+    if key == "index":
+        return rows if order == "asc" else rows[::-1]
+    present = [r for r in rows if _value_key(r.get(key)) is not None]
+    missing = [r for r in rows if _value_key(r.get(key)) is None]
+    return sorted(present, key=lambda r: _value_key(r.get(key)), reverse=order == "desc") + missing
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--venues", type=int, default=20_000)
+    args = ap.parse_args()
+
+    rows = synthetic_ranking(args.venues)
+    for key in paging.SORT_KEYS:
+        for order in paging.ORDERS:
+            expected = full_sort(rows, key, order)
+            got, cursor = [], None
+            for _ in range(3):
+                p = paging.page(rows, "ranking", key, order, 25, cursor)
+                got.extend(p["results"])
+                cursor = p["next_cursor"]
+            assert [id(r) for r in got] == [id(r) for r in expected[:75]], (key, order)
+
+    print(f"{args.venues} ranked venues, pages of {paging.DEFAULT_LIMIT}\n")
+    print(f"{'sort':20s} {'full sort ms':>12s} {'page ms':>8s}")
+    for key, order in (("score", "desc"), ("score", "asc"), ("distance_miles", "asc"), ("name", "asc")):
+        t0 = time.perf_counter()
+        full_sort(rows, key, order)[:paging.DEFAULT_LIMIT]
+        t_full = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        paging.page(rows, "ranking", key, order)
+        t_page = time.perf_counter() - t0
+        print(f"{key + ' ' + order:20s} {t_full * 1000:12.1f} {t_page * 1000:8.1f}")
+
+    t0 = time.perf_counter()
+    old = json.dumps({"results": rows, "candidates": rows}, default=str)
+    t_old = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = json.dumps(paging.page(rows, "ranking"), default=str)
+    t_new = time.perf_counter() - t0
+    print(f"\n{'response':20s} {'KB':>12s} {'json ms':>8s}")
+    print(f"{'results+candidates':20s} {len(old) / 1024:12.0f} {t_old * 1000:8.1f}")
+    print(f"{'first page':20s} {len(new) / 1024:12.1f} {t_new * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Bulk upsert of venues and rooms (app.services.venuestore).
+
+Inserts N synthetic venues with two rooms each, then upserts them all again
+(every row conflicts), and compares with adding the same venues one ORM
+object at a time on a slice of the data.
+
+    python -m benchmarks.bench_persist [--n 100000] [--orm 5000]
+"""
+import argparse
+import random
+import time
+
+
+def synthetic(n, seed=7):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        out.append(
+            {
+                "name": f"Venue {i}",
+                "address": f"{i} Main St, Greenville, NC",
+                "place_id": f"bench-place-{i}" if i % 4 else None,
+                "lat": 35.6 + rng.random() / 10,
+                "lng": -77.4 + rng.random() / 10,
+                "city": "Greenville, NC",
+                "category": rng.choice(["library", "church", "school", "community_center"]),
+                "educationality": rng.random(),
+                "distance_miles": round(rng.random() * 6, 2),
+                "website_url": f"https://venue{i}.example.org/" if i % 3 else None,
+                "phone": None,
+                "score": round(rng.random() * 100, 2),
+                "score_reason": "synthetic",
+                "rooms": [
+                    {"room_name": "Community Room", "capacity_classroom": 20, "capacity_theater": 40},
+                    {"room_name": "Board Room", "capacity_theater": 12},
+                ],
+            }
+        )
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--orm", type=int, default=5_000)
+    args = ap.parse_args()
+
+    from sqlalchemy import func, select
+
+    from app.db.deps import SessionLocal, engine
+    from app.db.models import Room, Venue
+    from app.services import venuestore
+    from app.services.merge import merge_key
+
+    venues = synthetic(args.n)
+
+    def counts():
+        with engine.connect() as conn:
+            return (
+                conn.execute(select(func.count()).select_from(Venue.__table__)).scalar(),
+                conn.execute(select(func.count()).select_from(Room.__table__)).scalar(),
+            )
+
+    t0 = time.perf_counter()
+    written = venuestore.upsert_venues(venues)
+    t_insert = time.perf_counter() - t0
+    assert written == {"venues": args.n, "rooms": 2 * args.n}, written
+    assert counts() == (args.n, 2 * args.n)
+    print(f"insert : {t_insert:6.2f} s  {args.n / t_insert:9.0f} venues/s  {written}")
+
+    # second pass: every row conflicts; a null phone must not blank a stored one
+    for v in venues:
+        v["score"] += 1
+    venues[0]["phone"] = "(252) 555-0100"
+    venuestore.upsert_venues(venues[:1])
+    venues[0]["phone"] = None
+    t0 = time.perf_counter()
+    venuestore.upsert_venues(venues)
+    t_update = time.perf_counter() - t0
+    assert counts() == (args.n, 2 * args.n)
+    with SessionLocal() as db:
+        row = db.query(Venue).filter(Venue.merge_key == merge_key(venues[0])).one()
+        assert row.phone == "(252) 555-0100" and row.score_total == venues[0]["score"], (row.phone, row.score_total)
+        assert sorted(r.room_name for r in row.rooms) == ["Board Room", "Community Room"]
+    print(f"upsert : {t_update:6.2f} s  {args.n / t_update:9.0f} venues/s  (all conflicts)")
+
+    # the generic path (no ON CONFLICT) must agree
+    sample = [dict(v, score=v["score"] + 1) for v in venues[:500]]
+    with engine.begin() as conn:
+        venuestore._upsert_generic(conn, [venuestore.venue_row(v) for v in sample])
+    with SessionLocal() as db:
+        row = db.query(Venue).filter(Venue.merge_key == merge_key(sample[5])).one()
+        assert row.score_total == sample[5]["score"]
+    assert counts()[0] == args.n
+
+    # baseline: one ORM object per venue, same room shape, fresh keys
+    orm = [dict(v, place_id=f"orm-{i}") for i, v in enumerate(venues[: args.orm])]
+    t0 = time.perf_counter()
+    with SessionLocal() as db:
+        for v in orm:
+            row = venuestore.venue_row(v)
+            obj = Venue(**row)
+            obj.rooms = [Room(**r) for r in v["rooms"]]
+            db.add(obj)
+            db.flush()
+        db.commit()
+    t_orm = time.perf_counter() - t0
+    bulk_rate, orm_rate = args.n / t_insert, args.orm / t_orm
+    print(f"orm    : {t_orm:6.2f} s  {orm_rate:9.0f} venues/s  ({args.orm} rows, flush per venue)")
+    print(f"bulk insert is x{bulk_rate / orm_rate:.1f} the ORM rate")
+
+
+if __name__ == "__main__":
+    main()
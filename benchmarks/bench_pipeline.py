@@ -0,0 +1,178 @@
+"""
+End-to-end /rank/preview benchmark on recorded provider fixtures.
+
+1. record - every payload in the grid runs once against the mock Places
+            server with PROVIDER_MODE=record, writing fixtures to a temp dir
+            (or --fixtures; pass --replay-only to reuse a recorded set,
+            e.g. one captured from the real API)
+2. replay - the mock server is gone; PROVIDER_MODE=replay answers from the
+            fixtures with --latency (+/- --jitter) injected per call. Each
+            payload is posted --reps times with bypass_cache=true and the
+            Server-Timing header gives per-stage timings
+3. allocs - each stage is run once under tracemalloc: peak bytes above
+            the stage's starting point, and the net change in allocated
+            blocks when it returns (negative when it drops its input)
+
+The grid is anchor kind (cities, zips) x anchor count x radius. Cities win
+over ZIPs in a payload, so each payload uses one kind.
+
+    python -m benchmarks.bench_pipeline [--counts 1,4,16] [--radii 3,10] [--reps 20] [--latency 0.05]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.mock_places import MockPlacesServer
+
+STAGES = ("discover", "merge", "filter", "enrich", "score", "total")
+
+
+def grid(counts, radii):
+    for kind in ("cities", "zips"):
+        for n in counts:
+            targets = [f"Bench City {i}, NC" for i in range(n)] if kind == "cities" else [str(27800 + i) for i in range(n)]
+            for r in radii:
+                yield f"{kind:6s} x{n:<3d} r{r:<3d}", {kind: targets, "radius_miles": r}
+
+
+def pct(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    i = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[i]
+
+
+def parse_server_timing(header):
+    out = {}
+    for part in header.split(","):
+        fields = [f.strip() for f in part.split(";")]
+        name = fields[0]
+        for f in fields[1:]:
+            if f.startswith("dur="):
+                out[name] = float(f[4:])
+    return out
+
+
+def record(client, payloads):
+    from app.services import replay
+
+    t0 = time.perf_counter()
+    for _, payload in payloads:
+        r = client.post("/rank/preview?bypass_cache=true", json=payload)
+        assert r.status_code == 200, r.text
+    s = replay.stats()
+    print(f"record : {s['recorded']} fixtures written in {time.perf_counter() - t0:.1f} s")
+
+
+def replay_timings(client, payloads, reps):
+    print(
+        f"\n{'payload':18s} {'venues':>6s} {'req/s':>7s} | "
+        + " | ".join(f"{s:>20s}" for s in STAGES)
+        + f"\n{'':18s} {'':6s} {'':7s} | "
+        + " | ".join(f"{'p50/p95/p99 ms':>20s}" for _ in STAGES)
+    )
+    for label, payload in payloads:
+        per_stage = {s: [] for s in STAGES}
+        count = 0
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            r = client.post("/rank/preview?bypass_cache=true", json=payload)
+            assert r.status_code == 200, r.text
+            count = r.json()["total"]
+            for stage, ms in parse_server_timing(r.headers["Server-Timing"]).items():
+                per_stage.setdefault(stage, []).append(ms)
+        rps = reps / (time.perf_counter() - t0)
+        cells = []
+        for s in STAGES:
+            v = per_stage.get(s) or []
+            cells.append(f"{pct(v, 50):6.1f}/{pct(v, 95):6.1f}/{pct(v, 99):6.1f}")
+        print(f"{label:18s} {count:6d} {rps:7.1f} | " + " | ".join(cells))
+
+
+def allocations(payloads):
+    from app.routers import rank
+
+    # filter includes merge here (the stage function does both)
+    print(f"\n{'payload':18s} " + " | ".join(f"{s:>20s}" for s in ("discover", "merge+filter", "enrich", "score")))
+    print(f"{'':18s} " + " | ".join(f"{'peak KB / net blocks':>20s}" for _ in range(4)))
+    for label, payload in payloads:
+        steps = [
+            ("discover", lambda _: rank._discover_stage(payload)),
+            ("filter", lambda data: rank._filter_stage(data, payload)),
+            ("enrich", lambda data: rank._enrich_stage(data, payload)),
+            ("score", lambda data: rank._score_stage(data, payload)),
+        ]
+        cells = []
+        data = None
+        tracemalloc.start()
+        try:
+            for _, fn in steps:
+                before = sys.getallocatedblocks()
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                data = fn(data)
+                _, peak = tracemalloc.get_traced_memory()
+                cells.append(f"{(peak - base) / 1024:9.0f} / {sys.getallocatedblocks() - before:8d}")
+        finally:
+            tracemalloc.stop()
+        print(f"{label:18s} " + " | ".join(cells))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", default="1,4,16")
+    ap.add_argument("--radii", default="3,10")
+    ap.add_argument("--reps", type=int, default=20)
+    ap.add_argument("--latency", type=float, default=0.05, help="injected per-call latency on replay (s)")
+    ap.add_argument("--jitter", type=float, default=0.3)
+    ap.add_argument("--fixtures", default=None, help="fixture dir (default: a fresh temp dir)")
+    ap.add_argument("--replay-only", action="store_true", help="skip recording; replay --fixtures as is")
+    args = ap.parse_args()
+
+    payloads = list(grid([int(x) for x in args.counts.split(",")], [int(x) for x in args.radii.split(",")]))
+    fixtures = args.fixtures or tempfile.mkdtemp(prefix="venue-fixtures-")
+    os.environ.update(
+        GOOGLE_PLACES_API_KEY=os.environ.get("GOOGLE_PLACES_API_KEY", "bench"),
+        PROVIDER_FIXTURES=fixtures,
+        PROVIDER_MODE="replay" if args.replay_only else "record",
+        CRAWL_ENABLED="false",
+        CATALOG_ENABLED="false",
+        PERSIST_ENABLED="false",
+    )
+
+    from fastapi.testclient import TestClient
+
+    if not args.replay_only:
+        with MockPlacesServer(latency=0.0) as server:
+            os.environ["GOOGLE_PLACES_URL"] = server.url
+            from app.main import app
+
+            with TestClient(app) as client:
+                record(client, payloads)
+    else:
+        from app.main import app
+
+    from app.services import geocache, httpclient, replay
+    from app.settings import settings
+
+    # from here on nothing is listening: every provider answer is a fixture
+    settings.provider_mode = "replay"
+    settings.provider_replay_latency = args.latency
+    settings.provider_replay_jitter = args.jitter
+    geocache.clear_memory()
+    httpclient.shutdown()
+    print(f"replay : {fixtures}, {args.latency * 1000:.0f} ms +/- {args.jitter:.0%} per provider call")
+    with TestClient(app) as client:
+        replay_timings(client, payloads, args.reps)
+        settings.provider_replay_latency = 0.0
+        allocations(payloads)
+    missing = replay.stats()["missing"]
+    assert missing == 0, f"{missing} requests had no fixture"
+
+
+if __name__ == "__main__":
+    main()
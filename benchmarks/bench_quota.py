@@ -0,0 +1,98 @@
+"""
+Places quota handling (app.services.quota) under a rate-limited provider.
+
+The mock server refuses calls beyond --server-qps per second with
+OVER_QUERY_LIMIT. --users threads each run places.discover() for
+--cities cities at once:
+
+1. baseline  - unlimited server: the candidates a full search returns
+2. no limiter - limiter off and no throttle retries: refused calls are
+                simply lost, like the old swallow-and-print behaviour
+3. limiter   - token bucket just under the server quota (small burst, as
+                the server counts a sliding second), shared backoff on
+                OVER_QUERY_LIMIT
+
+Geocodes are cached after the baseline, so runs 2 and 3 only search.
+4. budget    - one 16-city search with a 40-request budget: lower-value
+                QUERY_BASES are dropped, the top query still runs
+
+    python -m benchmarks.bench_quota [--users 6] [--cities 4] [--server-qps 40]
+"""
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.mock_places import MockPlacesServer
+
+
+def run_users(label, server, users, cities):
+    from app.services import places, quota
+
+    server.calls = server.throttled = 0
+    throttled_before = sum(quota.THROTTLED_TOTAL.value(op) for op in ("textsearch", "geocode"))
+    found = [0] * users
+
+    def user(u):
+        payload = {"cities": [f"City {u}-{c}, NC" for c in range(cities)], "radius_miles": 6}
+        found[u] = len(places.discover(payload))
+
+    threads = [threading.Thread(target=user, args=(u,)) for u in range(users)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    throttled = sum(quota.THROTTLED_TOTAL.value(op) for op in ("textsearch", "geocode")) - throttled_before
+    print(
+        f"{label:11s}: {elapsed:5.2f} s  {server.calls:4d} calls  {server.throttled:4d} refused by server "
+        f"({throttled:.0f} seen)  candidates {sum(found):5d}  per user {found}"
+    )
+    return sum(found)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=6)
+    ap.add_argument("--cities", type=int, default=4)
+    ap.add_argument("--server-qps", type=float, default=40)
+    ap.add_argument("--latency", type=float, default=0.03)
+    args = ap.parse_args()
+
+    with MockPlacesServer(latency=args.latency) as server:
+        os.environ["GOOGLE_PLACES_API_KEY"] = "bench"
+        os.environ["GOOGLE_PLACES_URL"] = server.url
+        os.environ["CATALOG_ENABLED"] = "false"
+        from app.services import places, quota
+        from app.settings import settings
+
+        settings.places_search_budget = 0
+        full = run_users("baseline", server, args.users, args.cities)
+
+        server.quota_qps = args.server_qps
+        retries = settings.places_throttle_retries
+        settings.places_throttle_retries = 0
+        quota.bucket = quota.TokenBucket(0, 1, backoff=0.0)
+        lost = run_users("no limiter", server, args.users, args.cities)
+
+        settings.places_throttle_retries = retries
+        rate = args.server_qps * 0.9
+        quota.bucket = quota.TokenBucket(rate, 4, backoff=0.5)
+        time.sleep(1.0)  # let the server's one-second window drain
+        limited = run_users("limiter", server, args.users, args.cities)
+        assert limited == full, (limited, full)
+        print(f"             no limiter lost {full - lost} of {full} candidates; limiter lost {full - limited}")
+
+        server.quota_qps = None
+        settings.places_search_budget = 40
+        payload = {"cities": [f"Budget {c}, NC" for c in range(16)], "radius_miles": 6}
+        server.calls = 0
+        out = places.discover(payload)
+        queries = sorted({c["query_category"] for c in out}) if out and "query_category" in out[0] else []
+        print(f"budget 40  : {server.calls} calls for 16 cities, {len(out)} candidates, queries kept {queries}")
+        assert server.calls <= 40 and out
+
+
+if __name__ == "__main__":
+    main()
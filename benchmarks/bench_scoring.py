@@ -0,0 +1,78 @@
+"""
+Row-wise scoring.score() vs the vectorized scoring.score_batch(), and
+score_combos(), the column output rank's score stage reads.
+
+Equivalence with score() is covered by tests/test_scoring.py.
+
+    python -m benchmarks.bench_scoring [--venues 50000]
+"""
+import argparse
+import random
+import time
+
+from app.services import scoring
+
+CATEGORIES = list(scoring.EDU_WEIGHTS) + ["church", "museum", None, ""]
+STATUSES = ["available", "maybe", "not_available", "unknown", None]
+
+
+def synthetic_venues(n, seed=11):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        rooms = [
+            {
+                "capacity_classroom": rnd.choice([None, 0, 12, 20, 24, 30, 31, 60]),
+                "capacity_theater": rnd.choice([None, 0, 20, 26, 40, 120]),
+            }
+            for _ in range(rnd.randint(0, 4))
+        ]
+        out.append(
+            {
+                "category": rnd.choice(CATEGORIES),
+                "educationality": rnd.choice([None, 0.0, 0.5, 0.6, 0.85, 0.9, 1.0, 1]),
+                "availability_status": rnd.choice(STATUSES),
+                "amenities": {k: rnd.random() < 0.5 for k in scoring.AMENITY_KEYS} if rnd.random() < 0.7 else {},
+                "rooms": rooms,
+                "parking_notes": rnd.choice([None, "", "Free lot"]),
+                "distance_miles": rnd.choice([None, 0, 1.2, 5.99, 6, 6.01, 12.5]),
+            }
+        )
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--venues", type=int, default=50_000)
+    args = ap.parse_args()
+
+    venues = synthetic_venues(args.venues)
+    t0 = time.perf_counter()
+    for v in venues:
+        scoring.score(v)
+    t_row = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scoring.score_batch(venues)
+    t_batch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scoring.score_combos(venues)
+    t_combos = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scoring.score_frame(venues)
+    t_frame = time.perf_counter() - t0
+
+    n = len(venues)
+    print(
+        f"{n} venues\n"
+        f"  score() loop  : {t_row * 1000:8.1f} ms  {n / t_row:10.0f} venues/s\n"
+        f"  score_batch() : {t_batch * 1000:8.1f} ms  {n / t_batch:10.0f} venues/s\n"
+        f"  score_combos(): {t_combos * 1000:8.1f} ms  {n / t_combos:10.0f} venues/s\n"
+        f"  score_frame() : {t_frame * 1000:8.1f} ms  {n / t_frame:10.0f} venues/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
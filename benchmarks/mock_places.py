@@ -0,0 +1,167 @@
+"""
+Local stand-in for the Google Places Text Search endpoint.
+
+Serves deterministic fixtures with an injected per-request latency so the
+discovery engine can be benchmarked without a key or network access:
+
+- no `location` param  -> geocode-style answer (one result at a fixed point)
+- with `location`      -> RESULTS_PER_PAGE places scattered around it
+- with `pagetoken`     -> the next page of that search, rejected with
+                          INVALID_REQUEST until `token_delay` has passed
+
+Multi-page fixtures: `pages` sets how many pages each search has, and pages
+from `far_from_page` on are placed well outside any sane radius.
+
+Quota: with `quota_qps` set, requests beyond that many in any one-second
+window are refused, as HTTP 429 (`quota_style="429"`) or as Google's
+200 + OVER_QUERY_LIMIT body (`quota_style="status"`).
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RESULTS_PER_PAGE = 20
+
+
+def _seed(*parts: str) -> int:
+    return int(hashlib.sha1("|".join(parts).encode()).hexdigest()[:8], 16)
+
+
+def _anchor_for(query: str):
+    rnd = random.Random(_seed("anchor", query))
+    return {"lat": 35.0 + rnd.uniform(-1, 1), "lng": -77.0 + rnd.uniform(-1, 1)}
+
+
+def _places_for(query: str, location: str, page: int = 0, far: bool = False):
+    lat, lng = (float(x) for x in location.split(","))
+    rnd = random.Random(_seed(query, location, str(page)))
+    offset = 1.0 if far else 0.0
+    out = []
+    for i in range(RESULTS_PER_PAGE):
+        n = page * RESULTS_PER_PAGE + i
+        out.append(
+            {
+                "name": f"{query.title()} {n}",
+                "formatted_address": f"{100 + n} Main St, Greenville, NC 27834, USA",
+                "place_id": f"mock-{_seed(query, location, str(n)):x}",
+                "geometry": {
+                    "location": {
+                        "lat": lat + offset + rnd.uniform(-0.1, 0.1),
+                        "lng": lng + offset + rnd.uniform(-0.1, 0.1),
+                    }
+                },
+                "types": [query.replace(" ", "_"), "point_of_interest", "establishment"],
+            }
+        )
+    return out
+
+
+class MockPlacesServer:
+    """Threaded HTTP server; use as a context manager to get its base URL."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        pages: int = 1,
+        token_delay: float = 0.0,
+        far_from_page: int | None = None,
+        quota_qps: float | None = None,
+        quota_style: str = "status",
+    ):
+        self.latency = latency
+        self.pages = pages
+        self.token_delay = token_delay
+        self.far_from_page = far_from_page
+        self.quota_qps = quota_qps
+        self.quota_style = quota_style
+        self.calls = 0
+        self.rejected_tokens = 0
+        self.throttled = 0
+        self._window: list = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+            disable_nagle_algorithm = True
+
+            def do_GET(self):  # noqa: N802
+                with server._lock:
+                    server.calls += 1
+                time.sleep(server.latency)
+                qs = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                status = 200
+                if server.over_quota():
+                    data = {"status": "OVER_QUERY_LIMIT", "results": []}
+                    status = 429 if server.quota_style == "429" else 200
+                else:
+                    data = server.respond(qs)
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # the default backlog of 5 drops SYNs under a concurrent burst
+            request_queue_size = 256
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def over_quota(self) -> bool:
+        if not self.quota_qps:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            self._window = [t for t in self._window if now - t < 1.0]
+            if len(self._window) >= self.quota_qps:
+                self.throttled += 1
+                return True
+            self._window.append(now)
+            return False
+
+    def respond(self, qs: dict) -> dict:
+        token = qs.get("pagetoken")
+        if token:
+            query, location, page, issued = json.loads(token)
+            if time.time() - issued < self.token_delay:
+                with self._lock:
+                    self.rejected_tokens += 1
+                return {"status": "INVALID_REQUEST", "results": []}
+            return self._page(query, location, page)
+
+        query = qs.get("query", "")
+        location = qs.get("location")
+        if not location:
+            return {"status": "OK", "results": [{"name": query, "geometry": {"location": _anchor_for(query)}}]}
+        return self._page(query, location, 0)
+
+    def _page(self, query: str, location: str, page: int) -> dict:
+        far = self.far_from_page is not None and page >= self.far_from_page
+        data = {"status": "OK", "results": _places_for(query, location, page, far)}
+        if page + 1 < self.pages:
+            data["next_page_token"] = json.dumps([query, location, page + 1, time.time()])
+        return data
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/maps/api/place/textsearch/json"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
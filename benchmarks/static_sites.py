@@ -0,0 +1,96 @@
+"""
+Local static-file "venue websites" for exercising the crawler.
+
+Each site is a directory served by its own http.server on its own port
+(so per-domain politeness applies per site). SimpleHTTPRequestHandler
+sends Last-Modified and answers If-Modified-Since with 304, which is what
+the crawler's conditional GETs rely on. Paths under /slow/ stall for
+`slow_seconds` to exercise the per-venue time budget.
+"""
+import functools
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+HOME = """<html><body><h1>{name}</h1>
+<p>Welcome to {name}. Call us at (252) 555-{n:04d}.</p>
+<a href="/contact.html">Contact us</a> <a href="/rentals.html">Meeting Room Rentals</a>
+<a href="/private/staff.html">Staff room reservations</a> <a href="/slow/parking.html">Parking</a>
+</body></html>"""
+CONTACT = """<html><body><p>Email <a href="mailto:events{n}@example.org">our events team</a>.</p>
+<p>Free parking is available in the lot behind the building.</p></body></html>"""
+RENTALS = """<html><body><h2>Rooms</h2>
+<p>Community Room seats up to {cap} theater style or {cls} classroom.</p>
+<p>Board Room holds 12 people.</p></body></html>"""
+ROBOTS = "User-agent: *\nDisallow: /private/\n"
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    slow_seconds = 0.0
+
+    def do_GET(self):  # noqa: N802
+        if self.path.startswith("/slow/"):
+            time.sleep(self.slow_seconds)
+        return super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # The crawler abandons /slow/ requests at its budget; the resulting
+        # broken pipes are expected.
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class StaticSites:
+    def __init__(self, count: int, slow_seconds: float = 5.0):
+        self.root = tempfile.mkdtemp(prefix="venue-sites-")
+        self.servers = []
+        for n in range(count):
+            site = os.path.join(self.root, f"site{n}")
+            os.makedirs(os.path.join(site, "private"))
+            os.makedirs(os.path.join(site, "slow"))
+            files = {
+                "index.html": HOME.format(name=f"Venue {n}", n=n),
+                "contact.html": CONTACT.format(n=n),
+                "rentals.html": RENTALS.format(cap=30 + n, cls=20 + n % 10),
+                "robots.txt": ROBOTS,
+                "private/staff.html": "<p>staff only</p>",
+                "slow/parking.html": "<p>Parking garage on 3rd St.</p>",
+            }
+            for rel, body in files.items():
+                with open(os.path.join(site, rel), "w") as fh:
+                    fh.write(body)
+            handler = type("Handler", (_Handler,), {"slow_seconds": slow_seconds})
+            httpd = _Server(("127.0.0.1", 0), functools.partial(handler, directory=site))
+            self.servers.append(httpd)
+
+    def rewrite(self, n: int, rel: str, body: str) -> None:
+        """Change one page of site n; its mtime moves forward so 304s stop."""
+        path = os.path.join(self.root, f"site{n}", rel)
+        with open(path, "w") as fh:
+            fh.write(body)
+        later = time.time() + 60
+        os.utime(path, (later, later))
+
+    @property
+    def urls(self):
+        return [f"http://127.0.0.1:{s.server_address[1]}/" for s in self.servers]
+
+    def __enter__(self):
+        for s in self.servers:
+            threading.Thread(target=s.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        for s in self.servers:
+            s.shutdown()
+            s.server_close()
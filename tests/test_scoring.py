@@ -0,0 +1,107 @@
+"""score_batch() and the stage's column output must agree with score() venue for venue."""
+import math
+import random
+
+import pytest
+
+from app.services import scoring
+
+EDGE_CASES = {
+    "no lat/lng": {"name": "Library", "category": "library", "availability_status": "available"},
+    "lat/lng None": {"lat": None, "lng": None, "category": "community_center"},
+    "empty rooms": {"category": "library", "rooms": []},
+    "rooms None": {"category": "library", "rooms": None},
+    "room without capacities": {"rooms": [{"room_name": "A"}]},
+    "room capacities None": {"rooms": [{"capacity_classroom": None, "capacity_theater": None}]},
+    "classroom fit": {"rooms": [{"capacity_classroom": 20}, {"capacity_theater": 26}]},
+    "theater only": {"rooms": [{"capacity_classroom": 31, "capacity_theater": 26}]},
+    "no amenities key": {"category": "tech_school"},
+    "amenities empty": {"amenities": {}},
+    "amenities None": {"amenities": None},
+    "amenities partial": {"amenities": {"projector": True, "wifi": False}},
+    "amenities all": {"amenities": {k: True for k in scoring.AMENITY_KEYS}},
+    "availability unknown": {"availability_status": "unknown"},
+    "availability None": {"availability_status": None},
+    "availability missing": {"category": "library"},
+    "availability unrecognized": {"availability_status": "call ahead"},
+    "not available": {"availability_status": "not_available"},
+    "maybe": {"availability_status": "maybe"},
+    "educationality zero": {"educationality": 0.0, "category": "senior_center"},
+    "educationality set": {"educationality": 0.85, "category": "library"},
+    "category missing": {},
+    "category None": {"category": None},
+    "category mixed case": {"category": "Library"},
+    "distance missing": {"parking_notes": "Free lot"},
+    "distance zero": {"distance_miles": 0},
+    "distance boundary": {"distance_miles": 6},
+    "distance over": {"distance_miles": 6.01},
+    "parking empty": {"parking_notes": "", "distance_miles": 1.2},
+}
+
+
+def random_venues(n, seed=7):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        v = {
+            "category": rnd.choice(list(scoring.EDU_WEIGHTS) + ["church", None, ""]),
+            "educationality": rnd.choice([None, 0.0, 0.6, 1.0, 1]),
+            "availability_status": rnd.choice(["available", "maybe", "not_available", "unknown", None]),
+            "rooms": [
+                {
+                    "capacity_classroom": rnd.choice([None, 0, 12, 20, 30, 31]),
+                    "capacity_theater": rnd.choice([None, 0, 25, 26, 120]),
+                }
+                for _ in range(rnd.randint(0, 3))
+            ],
+            "parking_notes": rnd.choice([None, "", "Free lot"]),
+            "distance_miles": rnd.choice([None, 0, 1.2, 6, 6.01, 12.5]),
+        }
+        if rnd.random() < 0.7:
+            v["amenities"] = {k: rnd.random() < 0.5 for k in scoring.AMENITY_KEYS}
+        if rnd.random() < 0.5:
+            v["lat"], v["lng"] = 35.7 + rnd.random(), -78.6 - rnd.random()
+        out.append(v)
+    return out
+
+
+def assert_same(expected, got):
+    t, r, c = expected
+    bt, br, bc = got
+    assert math.isclose(t, bt, abs_tol=1e-9)
+    assert r == br
+    assert c.keys() == bc.keys()
+    for k, val in c.items():
+        assert math.isclose(val, bc[k], abs_tol=1e-9), k
+
+
+@pytest.mark.parametrize("venue", list(EDGE_CASES.values()), ids=list(EDGE_CASES))
+def test_score_batch_matches_score_on_edge_cases(venue):
+    (got,) = scoring.score_batch([venue])
+    assert_same(scoring.score(venue), got)
+
+
+def test_score_batch_matches_score_per_venue():
+    venues = list(EDGE_CASES.values()) + random_venues(2000)
+    for v, got in zip(venues, scoring.score_batch(venues)):
+        assert_same(scoring.score(v), got)
+
+
+def test_output_fields_match_score():
+    venues = list(EDGE_CASES.values()) + random_venues(500)
+    inverse, combos = scoring.score_combos(venues)
+    fields = scoring.output_fields(combos)
+    for v, j in zip(venues, inverse.tolist()):
+        total, reason, comps = scoring.score(v)
+        f = fields[j]
+        assert f["score"] == total
+        assert f["score_reason"] == reason
+        assert f["educationality"] == comps["educationality"]
+        assert f["availability_score"] == comps["availability"]
+        assert f["capacity_score"] == comps["capacity_fit"]
+        assert f["amenities_score"] == comps["amenities"]
+        assert f["logistics_score"] == comps["logistics"]
+
+
+def test_score_batch_empty():
+    assert scoring.score_batch([]) == []
@@ -0,0 +1,25 @@
+"""The preview stage cache keys only on what can change each stage's output."""
+from app.routers import rank
+
+BASE = {"cities": ["Raleigh, NC"], "state": "NC", "radius_miles": 6}
+
+
+def test_score_key_ignores_fields_the_scorer_does_not_read():
+    keys = rank._stage_keys(BASE)
+    other = rank._stage_keys({
+        **BASE,
+        "attendees": 80,
+        "preferred_slots": ["morning"],
+        "window_start": "09:00",
+        "window_end": "17:00",
+        "start_date": "2026-11-01",
+        "end_date": "2026-11-30",
+    })
+    assert other == keys
+
+
+def test_score_key_follows_the_enrich_key():
+    keys = rank._stage_keys(BASE)
+    moved = rank._stage_keys({**BASE, "cities": ["Durham, NC"]})
+    assert moved["enrich"] != keys["enrich"]
+    assert moved["score"] != keys["score"]